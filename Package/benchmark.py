@@ -0,0 +1,302 @@
+"""
+Benchmark cases for the PRS and ingestion pipelines, run in fresh processes at several corpus scales.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import platform
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not reported
+    resource = None
+
+from .match_loader import MatchLoader, load_yaml
+from .match_parser import MatchParser
+from .ingestion import MatchIngestor
+from .cricket_analyzer import CricketAnalyzer
+from .columnar_store import ColumnarStore
+from .db_writer import BulkWriter, TABLE_COLUMNS
+from .prm_store import save_prm_results
+
+
+DEFAULT_SCALES = (1, 10, 50)
+
+# Metrics compared by compare_results(); for both, higher is worse
+COMPARED_METRICS = ('wall_seconds', 'peak_rss_mb')
+
+
+class BenchContext:
+    """The base corpus of one benchmark process, with its derived forms built on first use.
+
+    Larger scales repeat the base corpus in memory (scale 10 = every match ten times),
+    so setup cost does not grow with the scale. workdir holds artefacts shared between
+    the case processes of one run (the raw YAML pickle and a columnar store).
+    """
+
+    def __init__(self, files: List[str], workdir: str):
+        self.files = files
+        self.workdir = Path(workdir)
+        self.loader = MatchLoader()
+        self._matches = None
+
+    @property
+    def matches(self) -> List[Dict]:
+        """MatchParser structures of the base files (through the parsed-match cache)."""
+        if self._matches is None:
+            self._matches = [self.loader.load(yaml_file) for yaml_file in self.files]
+        return self._matches
+
+    @property
+    def balls(self) -> int:
+        """Deliveries in the base corpus."""
+        return sum(len(innings['deliveries']) for match in self.matches for innings in match['innings'])
+
+    def raw_matches(self) -> List[Any]:
+        """The base files as loaded from YAML, kept as a pickle in workdir after the first case."""
+        cache = self.workdir / f'raw-{len(self.files)}.pickle'
+        if cache.exists():
+            with open(cache, 'rb') as file:
+                return pickle.load(file)
+        raw = [load_yaml(yaml_file) for yaml_file in self.files]
+        with open(cache, 'wb') as file:
+            pickle.dump(raw, file, protocol=pickle.HIGHEST_PROTOCOL)
+        return raw
+
+    def store(self) -> ColumnarStore:
+        """Columnar store of the base files, built into workdir by the first case that needs it."""
+        directory = self.workdir / f'columnar-{len(self.files)}'
+        if not directory.exists():
+            ColumnarStore.build(self.files, self.loader).save(str(directory))
+        return ColumnarStore.load(str(directory))
+
+
+@dataclass
+class BenchCase:
+    """setup(context) prepares untimed inputs; run(inputs, context, scale) is the timed part
+    and returns {'items': ..., 'balls': ...} plus optionally 'stages' (name -> seconds)."""
+    name: str
+    description: str
+    setup: Callable[[BenchContext], Any]
+    run: Callable[[Any, BenchContext, int], Dict[str, Any]]
+
+
+def _run_yaml(_, context: BenchContext, scale: int) -> Dict[str, Any]:
+    for _ in range(scale):
+        for yaml_file in context.files:
+            load_yaml(yaml_file)
+    return {'items': len(context.files) * scale}
+
+
+def _run_parser(raw: List[Any], _, scale: int) -> Dict[str, Any]:
+    parser = MatchParser()
+    for _ in range(scale):
+        for match in raw:
+            parser.parse_match(match)
+    return {'items': len(raw) * scale}
+
+
+def _run_ingestion(_, context: BenchContext, scale: int) -> Dict[str, Any]:
+    ingestor = MatchIngestor()
+    rows = 0
+    for _ in range(scale):
+        for yaml_file, match in zip(context.files, context.matches):
+            tables = ingestor.ingest_match(match, Path(yaml_file).stem)
+            rows += sum(len(table_rows) for table_rows in (tables or {}).values())
+    return {'items': len(context.files) * scale, 'rows': rows}
+
+
+def _run_prs(_, context: BenchContext, scale: int) -> Dict[str, Any]:
+    analyzer = CricketAnalyzer(profile=True)
+    errors = sum(error is not None for _, error in analyzer.process_match_files(context.files * scale))
+    stages = analyzer.timer.report()['stages']
+    return {'items': len(context.files) * scale, 'errors': errors,
+            'stages': {name: stage['wall_seconds'] for name, stage in stages.items()}}
+
+
+def _run_prs_store(store: ColumnarStore, _, scale: int) -> Dict[str, Any]:
+    analyzer = CricketAnalyzer(profile=True)
+    for _ in range(scale):
+        analyzer.process_store(store)
+    stages = analyzer.timer.report()['stages']
+    return {'items': len(store.matches) * scale,
+            'stages': {name: stage['wall_seconds'] for name, stage in stages.items()}}
+
+
+def _setup_writer(context: BenchContext) -> List[tuple]:
+    """Ingestion rows of the base corpus as (match_id, {table: rows})."""
+    ingestor = MatchIngestor()
+    prepared = []
+    for yaml_file, match in zip(context.files, context.matches):
+        tables = ingestor.ingest_match(match, Path(yaml_file).stem)
+        if tables is not None:
+            prepared.append((Path(yaml_file).stem, tables))
+    return prepared
+
+
+def _run_writer(prepared: List[tuple], context: BenchContext, scale: int) -> Dict[str, Any]:
+    db_path = _fresh_db(context, 'writer')
+    tables = list(prepared[0][1]) if prepared else []
+    match_id_columns = {table: TABLE_COLUMNS[table].index('match_id') for table in tables}
+    writer = BulkWriter(db_path)
+    writer.open(tables=tables)
+    for copy in range(scale):
+        for match_id, match_tables in prepared:
+            for table, rows in match_tables.items():
+                if copy:
+                    # Copies get their own match id so the primary keys stay unique
+                    column = match_id_columns[table]
+                    rows = [(*row[:column], f'{match_id}-{copy}', *row[column + 1:]) for row in rows]
+                writer.add_many(table, rows)
+    writer.close()
+    os.remove(db_path)
+    return {'items': writer.rows_written}
+
+
+def _setup_upsert(context: BenchContext) -> Dict[str, Dict[str, Any]]:
+    analyzer = CricketAnalyzer()
+    for _ in analyzer.process_match_files(context.files):
+        pass
+    return analyzer.final_results()
+
+
+def _run_upsert(results: Dict[str, Dict[str, Any]], context: BenchContext, scale: int) -> Dict[str, Any]:
+    # Scale multiplies the players: each copy upserts under its own names
+    scaled = {f'{player_name}#{copy}' if copy else player_name: stats
+              for copy in range(scale) for player_name, stats in results.items()}
+    db_path = _fresh_db(context, 'upsert')
+    save_prm_results(scaled, db_path=db_path)
+    # A second pass updates every row in place
+    save_prm_results(scaled, db_path=db_path)
+    os.remove(db_path)
+    return {'items': 2 * len(scaled)}
+
+
+def _fresh_db(context: BenchContext, name: str) -> str:
+    db_path = context.workdir / f'{name}-{os.getpid()}.db'
+    if db_path.exists():
+        db_path.unlink()
+    return str(db_path)
+
+
+BENCH_CASES = {case.name: case for case in (
+    BenchCase('yaml', 'Read and parse the YAML files (libyaml when available)', lambda context: None, _run_yaml),
+    BenchCase('parser', 'MatchParser.parse_match on already-loaded YAML', BenchContext.raw_matches, _run_parser),
+    BenchCase('ingestion', 'MatchIngestor visitors over parsed matches', lambda context: None, _run_ingestion),
+    BenchCase('prs', 'CricketAnalyzer over the match files (parsed-match cache warm)',
+              lambda context: context.matches, _run_prs),
+    BenchCase('prs_store', 'CricketAnalyzer.process_store over a columnar store', BenchContext.store, _run_prs_store),
+    BenchCase('db_writer', 'BulkWriter loading the ingestion tables into a new database', _setup_writer, _run_writer),
+    BenchCase('prm_upsert', 'save_prm_results upserting every player twice', _setup_upsert, _run_upsert)
+)}
+
+
+def run_case(name: str, scale: int, files: List[str], workdir: str, repeat: int = 1) -> Dict[str, Any]:
+    """Run one case in this process and measure it; the fastest of `repeat` runs is kept.
+
+    Peak RSS is the whole process's high-water mark, setup included, so every case
+    should run in a fresh process (see run_suite()).
+    """
+    case = BENCH_CASES[name]
+    context = BenchContext(files, workdir)
+    inputs = case.setup(context)
+    balls = context.balls * scale
+
+    best, outcome = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        outcome = case.run(inputs, context, scale)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {
+        'case': name,
+        'scale': scale,
+        'files': len(files) * scale,
+        'balls': balls,
+        'wall_seconds': round(best, 4),
+        'balls_per_sec': round(balls / best, 1) if best > 0 else 0.0,
+        'items_per_sec': round(outcome['items'] / best, 1) if best > 0 else 0.0,
+        'peak_rss_mb': peak_rss_mb()
+    }
+    result.update(outcome)
+    return result
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water resident set size of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_suite(command: List[str], cases: List[str], scales: List[int], workdir: str,
+              log: Callable[[str], None] = lambda message: None) -> List[Dict[str, Any]]:
+    """Run every case at every scale, each in a fresh process started as
+    command + [case, scale]; the process must print run_case()'s result as its last line."""
+    results = []
+    for scale in scales:
+        for name in cases:
+            completed = subprocess.run(command + [name, str(scale), '--workdir', workdir],
+                                       capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise RuntimeError(f"Benchmark {name} x{scale} failed:\n{completed.stderr.strip()}")
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            log(f"{name:<11} x{scale:<3} {result['wall_seconds']:>9.3f}s {result['balls_per_sec']:>13,.0f} balls/s "
+                f"{result['peak_rss_mb'] or 0:>8.1f} MB")
+            results.append(result)
+    return results
+
+
+def baseline_document(results: List[Dict[str, Any]], corpus: str, files: int) -> Dict[str, Any]:
+    """Wrap results with the environment they were measured in."""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'corpus': corpus,
+        'corpus_files': files,
+        'results': results
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Compare two baseline documents case by case and scale by scale.
+
+    Returns one row per (case, scale, metric) present in both, with the relative change;
+    'regression' is set when a metric grew by more than threshold (0.10 = 10%).
+    """
+    previous = {(result['case'], result['scale']): result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        before = previous.get((result['case'], result['scale']))
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            rows.append({
+                'case': result['case'],
+                'scale': result['scale'],
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change': round(change, 4),
+                'regression': change > threshold
+            })
+    return rows
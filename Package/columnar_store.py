@@ -0,0 +1,258 @@
+"""
+Columnar ball-by-ball store: one typed NumPy array per delivery field, memory-mapped on load.
+"""
+
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+import numpy as np
+from .match_loader import MatchLoader
+from .manifest import match_id_for
+
+
+STORE_VERSION = 1
+
+# Delivery columns: name -> (array typecode used while building, NumPy dtype on disk)
+DELIVERY_FIELDS = {
+    'match': ('l', np.int32),          # index into the matches table
+    'innings': ('b', np.int8),         # 1-based innings number
+    'over': ('h', np.int16),
+    'ball': ('h', np.int16),
+    'batter': ('l', np.int32),         # index into the players table
+    'bowler': ('l', np.int32),
+    'non_striker': ('l', np.int32),
+    'batter_runs': ('h', np.int16),
+    'extras': ('h', np.int16),
+    'total': ('h', np.int16),
+    'wides': ('h', np.int16),
+    'noballs': ('h', np.int16),
+    'wicket_kind': ('b', np.int8),     # index into the wicket_kinds table, -1 for no wicket
+    'player_out': ('l', np.int32),     # index into the players table, -1 for no wicket
+}
+
+# Innings columns: one entry per innings, in delivery order
+INNINGS_FIELDS = {
+    'innings_start': ('q', np.int64),  # first delivery index; innings_start[-1] is the delivery count
+    'innings_match': ('l', np.int32),
+    'innings_number': ('b', np.int8),
+    'innings_team': ('l', np.int32),   # index into the teams table
+}
+
+
+class _Dictionary:
+    """Assigns dense integer ids to strings in first-seen order."""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values = list(values or [])
+        self.ids = {value: i for i, value in enumerate(self.values)}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class ColumnarStore:
+    """All deliveries of a corpus as parallel arrays plus dictionary-encoded lookup tables.
+
+    Delivery i belongs to match `match[i]`; the deliveries of innings j are the slice
+    `innings_start[j]:innings_start[j + 1]`. Player, team and wicket-kind columns hold
+    integer ids into `players`, `teams` and `wicket_kinds`.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], tables: Dict[str, Any]):
+        self.columns = columns
+        self.tables = tables
+        self.players: List[str] = tables['players']
+        self.teams: List[str] = tables['teams']
+        self.wicket_kinds: List[str] = tables['wicket_kinds']
+        self.matches: List[Dict[str, Any]] = tables['matches']
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        columns = self.__dict__.get('columns', {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self) -> int:
+        return int(self.columns['innings_start'][-1])
+
+    @property
+    def innings_count(self) -> int:
+        return len(self.columns['innings_match'])
+
+    def innings_slice(self, innings_index: int) -> slice:
+        """Delivery index range of one innings."""
+        start = self.columns['innings_start']
+        return slice(int(start[innings_index]), int(start[innings_index + 1]))
+
+    def match_innings(self) -> Iterator[tuple]:
+        """Yield (match index, [innings indexes]) in store order."""
+        innings_match = self.columns['innings_match']
+        current, group = None, []
+        for j in range(len(innings_match)):
+            match_index = int(innings_match[j])
+            if match_index != current and group:
+                yield current, group
+                group = []
+            current = match_index
+            group.append(j)
+        if group:
+            yield current, group
+
+    def innings_deliveries(self, innings_index: int) -> List[Dict]:
+        """Rebuild the MatchParser delivery dicts of one innings (for per-ball consumers)."""
+        rows = self.innings_slice(innings_index)
+        c = {name: self.columns[name][rows].tolist() for name in DELIVERY_FIELDS}
+        players, kinds = self.players, self.wicket_kinds
+
+        deliveries = []
+        for i in range(rows.stop - rows.start):
+            extras = {}
+            if c['wides'][i]:
+                extras['wides'] = c['wides'][i]
+            if c['noballs'][i]:
+                extras['noballs'] = c['noballs'][i]
+            wicket = None
+            if c['wicket_kind'][i] >= 0:
+                wicket = {'kind': kinds[c['wicket_kind'][i]], 'player_out': players[c['player_out'][i]]}
+
+            deliveries.append({
+                'over': c['over'][i],
+                'ball': c['ball'][i],
+                'batsman': players[c['batter'][i]],
+                'bowler': players[c['bowler'][i]],
+                'non_striker': players[c['non_striker'][i]] if c['non_striker'][i] >= 0 else None,
+                'runs': {'batsman': c['batter_runs'][i], 'extras': c['extras'][i], 'total': c['total'][i]},
+                'wicket': wicket,
+                'extras': extras or None
+            })
+        return deliveries
+
+    def save(self, directory: str):
+        """Write one .npy file per column plus tables.json."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(path / f"{name}.npy", column)
+        with open(path / 'tables.json', 'w', encoding='utf-8') as file:
+            json.dump(self.tables, file)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'ColumnarStore':
+        """Open a saved store; with mmap=True the columns are memory-mapped, not read."""
+        path = Path(directory)
+        with open(path / 'tables.json', 'r', encoding='utf-8') as file:
+            tables = json.load(file)
+        if tables.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported columnar store version {tables.get('version')} in {directory}")
+
+        for record in tables['matches']:
+            # Stores built before undated matches were kept as null hold the text 'None'
+            if record['date'] == 'None':
+                record['date'] = None
+
+        mode = 'r' if mmap else None
+        columns = {name: np.load(path / f"{name}.npy", mmap_mode=mode)
+                   for name in (*DELIVERY_FIELDS, *INNINGS_FIELDS)}
+        return cls(columns, tables)
+
+    @classmethod
+    def build(cls, yaml_files: List[str], loader: Optional[MatchLoader] = None) -> 'ColumnarStore':
+        """Parse the given match files (through the match cache) into a store."""
+        builder = _StoreBuilder(loader or MatchLoader())
+        for yaml_file in yaml_files:
+            builder.add_match(yaml_file)
+        return builder.finish()
+
+
+class _StoreBuilder:
+    """Accumulates deliveries into compact stdlib arrays before the final NumPy conversion."""
+
+    def __init__(self, loader: MatchLoader):
+        self.loader = loader
+        self.buffers = {name: array(code) for name, (code, _) in {**DELIVERY_FIELDS, **INNINGS_FIELDS}.items()}
+        self.players = _Dictionary()
+        self.teams = _Dictionary()
+        self.wicket_kinds = _Dictionary()
+        self.matches: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, str]] = []
+
+    def add_match(self, yaml_file: str):
+        try:
+            match = self.loader.load(yaml_file)
+        except Exception as e:
+            self.errors.append({'file': yaml_file, 'error': str(e)})
+            return
+
+        info = match['info']
+        outcome = info.get('outcome', {})
+        date = info.get('dates', [None])[0]
+        match_index = len(self.matches)
+        self.matches.append({
+            'match_id': match_id_for(yaml_file),
+            'file': yaml_file,
+            'date': str(date) if date is not None else None,
+            'venue': info.get('venue'),
+            'city': info.get('city'),
+            'teams': info.get('teams', []),
+            'overs': info.get('overs', 20),
+            'balls_per_over': info.get('balls_per_over', 6),
+            'result': outcome.get('result'),
+            'winner': outcome.get('winner')
+        })
+
+        b = self.buffers
+        encode_player = self.players.encode
+        for innings in match['innings']:
+            b['innings_start'].append(len(b['match']))
+            b['innings_match'].append(match_index)
+            b['innings_number'].append(innings['innings_number'])
+            b['innings_team'].append(self.teams.encode(innings['team']))
+
+            for delivery in innings['deliveries']:
+                runs = delivery['runs']
+                extras = delivery.get('extras') or {}
+                wicket = delivery.get('wicket')
+
+                b['match'].append(match_index)
+                b['innings'].append(innings['innings_number'])
+                b['over'].append(delivery['over'])
+                b['ball'].append(delivery['ball'])
+                b['batter'].append(encode_player(delivery['batsman']))
+                b['bowler'].append(encode_player(delivery['bowler']))
+                b['non_striker'].append(encode_player(delivery.get('non_striker')))
+                b['batter_runs'].append(runs.get('batsman', 0))
+                b['extras'].append(runs.get('extras', 0))
+                b['total'].append(runs.get('total', 0))
+                b['wides'].append(extras.get('wides', 0))
+                b['noballs'].append(extras.get('noballs', 0))
+                b['wicket_kind'].append(self.wicket_kinds.encode(wicket.get('kind')) if wicket else -1)
+                b['player_out'].append(encode_player(wicket.get('player_out')) if wicket else -1)
+
+    def finish(self) -> ColumnarStore:
+        self.buffers['innings_start'].append(len(self.buffers['match']))
+
+        columns = {
+            name: np.frombuffer(self.buffers[name], dtype=_buffer_dtype(code)).astype(dtype)
+            for name, (code, dtype) in {**DELIVERY_FIELDS, **INNINGS_FIELDS}.items()
+        }
+        tables = {
+            'version': STORE_VERSION,
+            'players': self.players.values,
+            'teams': self.teams.values,
+            'wicket_kinds': self.wicket_kinds.values,
+            'matches': self.matches,
+            'errors': self.errors
+        }
+        return ColumnarStore(columns, tables)
+
+
+def _buffer_dtype(typecode: str) -> np.dtype:
+    """NumPy dtype matching a stdlib array typecode on this platform."""
+    return np.dtype(f"i{array(typecode).itemsize}")
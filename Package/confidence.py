@@ -0,0 +1,115 @@
+"""
+Confidence intervals for every player's batting and bowling PRS, computed for all players at once.
+"""
+
+from statistics import NormalDist
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from .prs_calculator import PRSCalculator
+
+
+CI_METHODS = ('analytic', 'bootstrap')
+
+# Bootstrap resamples are drawn in chunks of about this many deliveries to bound memory
+_BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+
+def prs_intervals(calculator: PRSCalculator, method: str = 'analytic', confidence: float = 0.95,
+                  samples: int = 1000, seed: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Confidence intervals on the PRS scale for every player in the calculator.
+
+    'analytic' uses the variance of the pressure-weighted mean (a ratio estimator) from the
+    calculator's running sums. 'bootstrap' resamples each player's deliveries with NumPy
+    and needs a calculator created with track_deliveries=True; seed makes it repeatable.
+
+    Returns {player: {'batting_prs_ci': [low, high] or None, 'bowling_prs_ci': ...}}; the
+    interval is None for a discipline with fewer than two deliveries.
+    """
+    if method not in CI_METHODS:
+        raise ValueError(f"Unknown confidence interval method: {method}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"Confidence must be between 0 and 1, got {confidence}")
+
+    intervals = {player_name: {'batting_prs_ci': None, 'bowling_prs_ci': None}
+                 for player_name in calculator.players}
+    rng = np.random.default_rng(seed)
+
+    for discipline in ('batting', 'bowling'):
+        if method == 'analytic':
+            names, low, high = _analytic_bounds(calculator, discipline, confidence)
+        else:
+            names, low, high = _bootstrap_bounds(calculator, discipline, confidence, samples, rng)
+
+        for player_name, low_prs, high_prs in zip(names, _to_prs(low), _to_prs(high)):
+            intervals[player_name][f'{discipline}_prs_ci'] = [low_prs, high_prs]
+
+    return intervals
+
+
+def _analytic_bounds(calculator: PRSCalculator, discipline: str,
+                     confidence: float) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Normal interval on the weighted mean score, from the delta-method variance
+    n/(n-1) * Σw²(s - m)² / (Σw)², expanded into the running sums."""
+    names, columns = [], []
+    for player_name, performance in calculator.players.items():
+        stats = getattr(performance, discipline)
+        if stats.deliveries >= 2:
+            names.append(player_name)
+            columns.append((stats.deliveries, stats.weighted_score_sum, stats.weight_sum, stats.weight_sq_sum,
+                            stats.weight_sq_score_sum, stats.weight_sq_score_sq_sum))
+    if not names:
+        return names, np.zeros(0), np.zeros(0)
+
+    n, weighted, weight, weight_sq, weight_sq_score, weight_sq_score_sq = np.array(columns).T
+    mean = weighted / weight
+    squared_deviations = np.maximum(weight_sq_score_sq - 2 * mean * weight_sq_score + mean * mean * weight_sq, 0)
+    standard_error = np.sqrt(squared_deviations * n / (n - 1)) / weight
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return names, mean - z * standard_error, mean + z * standard_error
+
+
+def _bootstrap_bounds(calculator: PRSCalculator, discipline: str, confidence: float, samples: int,
+                      rng: np.random.Generator) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Percentile interval of the weighted mean over resamples of each player's deliveries.
+
+    All players are resampled together: deliveries are laid out player by player in one
+    flat array, each resample draws every player's own number of indexes from inside
+    their segment, and np.add.reduceat sums the segments.
+    """
+    if not calculator.track_deliveries:
+        raise ValueError("Bootstrap intervals need the per-delivery scores: use track_deliveries=True")
+
+    names, scores, weights = [], [], []
+    for player_name, performance in calculator.players.items():
+        player_scores = getattr(performance, f'{discipline}_performances')
+        if len(player_scores) >= 2:
+            names.append(player_name)
+            scores.append(player_scores)
+            weights.append(getattr(performance, f'{discipline}_pressure_weights'))
+    if not names:
+        return names, np.zeros(0), np.zeros(0)
+
+    counts = np.array([len(player_scores) for player_scores in scores])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    scores, weights = np.concatenate(scores), np.concatenate(weights)
+    weighted = scores * weights
+    # For every flat position: the start and length of the segment it belongs to
+    segment_start, segment_length = np.repeat(starts, counts), np.repeat(counts, counts)
+
+    means = np.empty((samples, len(names)))
+    chunk = max(1, _BOOTSTRAP_CHUNK_ELEMENTS // len(scores))
+    for first in range(0, samples, chunk):
+        size = min(chunk, samples - first)
+        draws = segment_start + (rng.random((size, len(scores))) * segment_length).astype(np.int64)
+        means[first:first + size] = (np.add.reduceat(weighted[draws], starts, axis=1)
+                                     / np.add.reduceat(weights[draws], starts, axis=1))
+
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail], axis=0)
+    return names, low, high
+
+
+def _to_prs(weighted_means: np.ndarray) -> List[float]:
+    """Map weighted mean scores onto the PRS scale exactly as PRSCalculator.prs_from_totals does."""
+    return [round(max(0, min(100, 50 + mean * 10)), 1) for mean in weighted_means.tolist()]
@@ -1,123 +1,288 @@
 """
 Main cricket analyzer class that orchestrates the PRS calculation process.
 """
+import os
 import sys
-import yaml
 import json
-from typing import Dict, List, Any, Optional
+import time
+import signal
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from pathlib import Path
+from functools import partial
+from multiprocessing import Pool, Event
 from .match_parser import MatchParser
+from .match_loader import MatchLoader
 from .pressure_classifier import PressureClassifier
 from .delivery_scorer import DeliveryScorer
-from .prs_calculator import PRSCalculator
-from .results_formater import ResultsFormatter
+from .prs_calculator import PRSCalculator, PlayerPerformance
+from .results_formater import ResultsFormatter, STREAM_FORMATS
+from .columnar_store import ColumnarStore
+from .innings_state import InningsState
+from .stage_timer import StageTimer, NULL_TIMER
+
+
+@dataclass(frozen=True, slots=True)
+class MatchSummary:
+    """What the analyzer keeps of each processed match (not the info block, whose registry
+    and player lists would be held for every file of the run)."""
+    file: str
+    date: Optional[str] = None
+    venue: Optional[str] = None
+    teams: Tuple[str, ...] = ()
+    balls: int = 0
 
 
 class CricketAnalyzer:
     """Main analyzer class that coordinates all components."""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, track_deliveries: bool = False, profile: bool = False,
+                 memprofile: bool = False):
         self.parser = MatchParser()
+        self.loader = MatchLoader(use_cache=use_cache)
         self.pressure_classifier = PressureClassifier()
         self.scorer = DeliveryScorer()
-        self.calculator = PRSCalculator()
+        self.calculator = PRSCalculator(track_deliveries)
         self.formatter = ResultsFormatter()
-        self.processed_matches = []
+        self.processed_matches: List[MatchSummary] = []
+        # Per-stage timing for --profile (and tracemalloc memory for --memprofile);
+        # the null timer keeps unprofiled runs free of overhead
+        self.timer = StageTimer(memory=memprofile) if profile or memprofile else NULL_TIMER
+        self.loader.timer = self.timer
     
     def process_match_file(self, yaml_file: str):
         """Process a single YAML match file."""
-        try:
-            with open(yaml_file, 'r', encoding='utf-8') as file:
-                match_data = yaml.safe_load(file)
-        except Exception as e:
-            raise Exception(f"Failed to load YAML file: {e}")
+        match, partials = self.analyze_match_file(yaml_file)
+        self.add_match_result(match, partials)
+    
+    def analyze_match_file(self, yaml_file: str) -> Tuple[Dict, Dict[str, PlayerPerformance]]:
+        """Score one match file without touching the analyzer's totals.
+        
+        Returns the processed-match record ({'file', 'summary', 'context'}) and the
+        per-player partial performances for this match, ready to be merged with
+        add_match_result().
+        """
+        started = time.perf_counter() if self.timer.enabled else 0.0
         
-        # Parse match structure
-        match_info = self.parser.parse_match(match_data)
+        # Load the parsed match structure (from the cache when possible)
+        match_info = self.loader.load(yaml_file)
         
-        # Process each innings
+        # Process each innings into a calculator scoped to this match
+        calculator = PRSCalculator(self.calculator.track_deliveries)
+        first_innings = None
+        player_teams = {}
         for innings_data in match_info['innings']:
-            self._process_innings(innings_data, match_info)
+            state = self._process_innings(innings_data, match_info, calculator, first_innings)
+            if innings_data['innings_number'] == 1:
+                first_innings = state
+            deliveries = innings_data['deliveries']
+            _assign_teams(player_teams, [d['batsman'] for d in deliveries], [d['bowler'] for d in deliveries],
+                          innings_data['team'], match_info['info'].get('teams', []))
         
-        self.processed_matches.append({
+        info = match_info['info']
+        match_date = info.get('dates', [None])[0]
+        balls = sum(len(innings['deliveries']) for innings in match_info['innings'])
+        match = {
             'file': yaml_file,
-            'info': match_info['info']
-        })
+            'summary': MatchSummary(yaml_file, _date_text(match_date), info.get('venue'),
+                                    tuple(info.get('teams', ())), balls),
+            'context': _match_context(match_date, info.get('venue'), player_teams)
+        }
+        if self.timer.enabled:
+            self.timer.file_done(yaml_file, time.perf_counter() - started, balls)
+        return match, dict(calculator.players)
+    
+    def process_store(self, store: ColumnarStore):
+        """Process every match of a columnar store instead of reading YAML files."""
+        players = store.players
+        for match_index, innings_indexes in store.match_innings():
+            record = store.matches[match_index]
+            match_info = {'info': record}
+            started = time.perf_counter() if self.timer.enabled else 0.0
+            balls = 0
+            
+            calculator = PRSCalculator(self.calculator.track_deliveries)
+            first_innings = None
+            player_teams = {}
+            for innings_index in innings_indexes:
+                rows = store.innings_slice(innings_index)
+                batter = store.batter[rows]
+                innings_number = int(store.innings_number[innings_index])
+                target = self._get_target(innings_number, first_innings)
+                with self.timer.stage('state'):
+                    state = InningsState.from_columns(
+                        store.over[rows], store.total[rows], store.batter_runs[rows],
+                        store.wicket_kind[rows] >= 0, store.player_out[rows] == batter,
+                        record['overs'], record['balls_per_over'], target,
+                        store.wides[rows], store.noballs[rows]
+                    )
+                balls += len(state)
+                batsmen = [players[i] for i in batter.tolist()]
+                bowlers = [players[i] for i in store.bowler[rows].tolist()]
+                self._score_innings(state, batsmen, bowlers, record['overs'], calculator,
+                                    record['balls_per_over'])
+                if innings_number == 1:
+                    first_innings = state
+                _assign_teams(player_teams, batsmen, bowlers,
+                              store.teams[store.innings_team[innings_index]], record['teams'])
+            
+            match = {
+                'file': record['file'],
+                'summary': MatchSummary(record['file'], _date_text(record['date']), record['venue'],
+                                        tuple(record['teams']), balls),
+                'context': _match_context(record['date'], record['venue'], player_teams)
+            }
+            if self.timer.enabled:
+                self.timer.file_done(record['file'], time.perf_counter() - started, balls)
+            self.add_match_result(match, dict(calculator.players))
+    
+    def add_match_result(self, match: Dict, partials: Dict[str, PlayerPerformance]):
+        """Merge one match's partial performances into the running totals."""
+        with self.timer.stage('merge'):
+            self.calculator.merge(partials)
+        self.processed_matches.append(match['summary'])
+    
+    def process_match_files(self, yaml_files: List[str], workers: int = 1,
+                            shield_workers: bool = False) -> Iterator[Tuple[str, Optional[str]]]:
+        """Process many files, optionally across a process pool.
+        
+        Yields (file, error) for each file in input order, error being None on success.
+        Partial results are merged in input order, so the totals are identical to a
+        serial run whatever the number of workers. shield_workers is passed on to
+        analyze_match_files().
+        """
+        for yaml_file, result, error in self.analyze_match_files(yaml_files, workers, shield_workers):
+            if error is None:
+                self.add_match_result(*result)
+            yield yaml_file, error
+    
+    def analyze_match_files(self, yaml_files: List[str], workers: int = 1,
+                            shield_workers: bool = False) -> Iterator[Tuple[str, Optional[Tuple], Optional[str]]]:
+        """Analyze many files without merging them, optionally across a process pool.
+        
+        Yields (file, (match, partials), None) or (file, None, error) in input order.
+        With shield_workers the pool's workers ignore SIGTERM (a process-group shutdown
+        must not kill them mid-file) until this generator is closed; the caller handles
+        SIGTERM itself and closes the generator once it has saved its state.
+        """
+        if workers <= 1:
+            for yaml_file in yaml_files:
+                yield (yaml_file, *_analyze_safely(self, yaml_file))
+            return
+        
+        chunksize = max(1, min(32, len(yaml_files) // (workers * 4)))
+        stopping = Event() if shield_workers else None
+        with Pool(processes=workers, initializer=_init_worker,
+                  initargs=(self.loader.use_cache, self.calculator.track_deliveries,
+                            self.timer.enabled, self.timer.memory, stopping)) as pool:
+            try:
+                for yaml_file, (result, error, timings) in zip(yaml_files,
+                                                               pool.imap(_analyze_in_worker, yaml_files, chunksize)):
+                    # Each worker ships back the timings of the file it just analyzed
+                    self.timer.merge(timings)
+                    yield yaml_file, result, error
+            finally:
+                # Let the pool's terminate() through to the shielded workers
+                if stopping is not None:
+                    stopping.set()
     
-    def _process_innings(self, innings_data: Dict, match_info: Dict):
-        """Process a single innings."""
+    def _process_innings(self, innings_data: Dict, match_info: Dict, calculator: PRSCalculator,
+                         first_innings: Optional[InningsState] = None) -> InningsState:
+        """Process a single innings into the given calculator and return its state.
+        
+        first_innings is the state of the match's first innings, which sets the target
+        when this innings is the chase.
+        """
         deliveries = innings_data['deliveries']
-        total_overs = match_info['info'].get('overs', 20)
-        total_balls = total_overs * 6
+        info = match_info['info']
+        target = self._get_target(innings_data['innings_number'], first_innings)
         
-        # Track match state
-        current_score = 0
-        wickets_fallen = 0
-        recent_wickets = []
+        with self.timer.stage('state'):
+            state = InningsState.from_deliveries(deliveries, info.get('overs', 20),
+                                                 info.get('balls_per_over', 6), target)
+        self._score_innings(state, [d['batsman'] for d in deliveries], [d['bowler'] for d in deliveries],
+                            info.get('overs', 20), calculator, info.get('balls_per_over', 6))
+        return state
+    
+    def _score_innings(self, state: InningsState, batsmen: List[str], bowlers: List[str],
+                       total_overs: int, calculator: PRSCalculator, balls_per_over: int = 6):
+        """Classify and score a whole innings from its state arrays."""
+        if not len(state):
+            return
         
-        for i, delivery in enumerate(deliveries):
-            balls_remaining = total_balls - i - 1
-            
-            # Update match state
-            current_score += delivery['runs']['total']
-            if delivery.get('wicket'):
-                wickets_fallen += 1
-                recent_wickets.append(i)
-                # Keep only recent wickets (last 2 overs)
-                recent_wickets = [w for w in recent_wickets if i - w <= 12]
-            
-            # Calculate required run rate if target is known
-            target = self._get_target(match_info, innings_data['innings_number'])
-            rrr = None
-            if target and balls_remaining > 0:
-                runs_needed = target - current_score
-                overs_remaining = balls_remaining / 6
-                rrr = runs_needed / overs_remaining if overs_remaining > 0 else 0
-            
-            # Classify pressure for this delivery
-            pressure_context = self.pressure_classifier.classify_delivery(
-                delivery=delivery,
-                current_score=current_score,
-                wickets_fallen=wickets_fallen,
-                balls_remaining=balls_remaining,
-                total_overs=total_overs,
-                required_run_rate=rrr,
-                recent_wickets=len(recent_wickets)
-            )
-            
-            # Score the delivery
-            batting_score = self.scorer.score_batting_delivery(delivery, pressure_context)
-            bowling_score = self.scorer.score_bowling_delivery(delivery, pressure_context)
+        timer = self.timer
+        with timer.stage('classify'):
+            pressure = self.pressure_classifier.classify_innings(total_overs=total_overs,
+                                                                 balls_per_over=balls_per_over,
+                                                                 **state.classifier_inputs())
+        with timer.stage('score'):
+            batting_scores = self.scorer.score_batting_batch(
+                state.batter_runs, state.runs, state.striker_out, pressure['weight'])
+            bowling_scores = self.scorer.score_bowling_batch(
+                state.runs, state.is_wicket, pressure['weight'])
+        
+        with timer.stage('aggregate'):
+            # Legal balls as fractions of this match's overs, so economies stay right across formats
+            overs = state.legal / balls_per_over
+            calculator.add_level_totals('batting', batsmen, pressure['level'], batting_scores,
+                                        state.batter_runs, overs)
+            calculator.add_level_totals('bowling', bowlers, pressure['level'], bowling_scores,
+                                        state.bowler_runs, overs)
             
             # Add to calculator
-            self.calculator.add_delivery_performance(
-                batsman=delivery['batsman'],
-                bowler=delivery['bowler'],
-                batting_score=batting_score,
-                bowling_score=bowling_score,
-                pressure_weight=pressure_context['weight']
-            )
-    
-    def _get_target(self, match_info: Dict, innings_number: int) -> Optional[int]:
+            for batsman, bowler, batting_score, bowling_score, weight in zip(
+                    batsmen, bowlers, batting_scores.tolist(), bowling_scores.tolist(), pressure['weight'].tolist()):
+                calculator.add_delivery_performance(
+                    batsman=batsman,
+                    bowler=bowler,
+                    batting_score=batting_score,
+                    bowling_score=bowling_score,
+                    pressure_weight=weight
+                )
+    
+    def _get_target(self, innings_number: int, first_innings: Optional[InningsState]) -> Optional[int]:
         """Get the target score if this is the second innings."""
-        if innings_number != 2:
+        if innings_number != 2 or first_innings is None:
             return None
-        
-        # In a real implementation, you would track the first innings total
-        # For now, we'll return None as we don't have this information easily available
-        return None
+        return first_innings.chase_target()
+    
+    def final_results(self, intervals: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """The calculator's final scores; intervals, as returned by confidence.prs_intervals(),
+        adds batting_prs_ci and bowling_prs_ci to every player's results."""
+        return dict(self.iter_final_results(intervals))
+    
+    def iter_final_results(self, intervals: Optional[Dict[str, Dict[str, Any]]] = None
+                           ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """final_results() as (player_name, stats) pairs, each computed only when requested."""
+        for player_name, stats in self.calculator.iter_final_scores():
+            if intervals is not None:
+                stats.update(intervals[player_name])
+            yield player_name, stats
     
     def display_results(self, format_type: str = 'table', top_n: Optional[int] = None, 
-                       include_match_details: bool = False):
-        """Display the final PRS results."""
-        results = self.calculator.calculate_final_scores()
+                       include_match_details: bool = False,
+                       intervals: Optional[Dict[str, Dict[str, Any]]] = None,
+                       sort: Optional[str] = None):
+        """Display the final PRS results, with intervals when given (see final_results()).
+        
+        ndjson and csv are written player by player in calculator order, each player as
+        soon as its scores are computed, or by the SORT_KEYS order given as sort (with
+        top_n, only a bounded heap of the best is kept); table and detailed always sort
+        (overall by default). Display never writes to the database; see
+        prm_store.save_prm_results().
+        """
+        if format_type in STREAM_FORMATS:
+            players = self.formatter.select_players(self.iter_final_results(intervals), sort, top_n)
+            self.formatter.stream_results(players, format_type)
+            return
         
+        results = self.final_results(intervals)
         if format_type == 'json':
             print(json.dumps(results, indent=2))
         elif format_type == 'detailed':
-            self.formatter.print_detailed_results(results, top_n, include_match_details)
+            self.formatter.print_detailed_results(results, top_n, include_match_details, sort or 'overall')
         else:
-            self.formatter.print_table_results(results, top_n)
+            self.formatter.print_table_results(results, top_n, sort or 'overall')
         
         # Print summary statistics
         if format_type != 'json':
@@ -125,7 +290,7 @@ class CricketAnalyzer:
     
     def _print_summary(self):
         """Print analysis summary."""
-        total_deliveries = sum(len(p.batting_performances) + len(p.bowling_performances) 
+        total_deliveries = sum(p.batting.deliveries + p.bowling.deliveries
                               for p in self.calculator.players.values())
         print(f"\nAnalysis Summary:", file=sys.stderr if __name__ != '__main__' else None)
         print(f"Matches processed: {len(self.processed_matches)}")
@@ -145,5 +310,62 @@ class CricketAnalyzer:
         except Exception as e:
             print(f"Failed to process match {filename}: {e}")
 
+
+def _assign_teams(player_teams: Dict[str, Tuple], batsmen: List[str], bowlers: List[str],
+                  batting_team: Optional[str], teams: List[str]):
+    """Record (team, opponent) for the players of one innings, keeping earlier assignments."""
+    fielding_team = next((team for team in teams if team != batting_team), None)
+    for name in set(batsmen):
+        player_teams.setdefault(name, (batting_team, fielding_team))
+    for name in set(bowlers):
+        player_teams.setdefault(name, (fielding_team, batting_team))
+
+
+def _date_text(date: Any) -> Optional[str]:
+    return str(date) if date is not None else None
+
+
+def _match_context(date: Any, venue: Optional[str], player_teams: Dict[str, Tuple]) -> Dict[str, Any]:
+    """Keys stored with a match's PRS partials: date, season, venue and each player's team and opponent."""
+    date = str(date) if date is not None else ''
+    return {
+        'date': date if date[:4].isdigit() else None,
+        'season': date[:4] if date[:4].isdigit() else None,
+        'venue': venue,
+        'player_teams': player_teams
+    }
+
+
+# Each pool worker builds its own analyzer once (in _init_worker) and reuses it for every file.
+_worker_analyzer: Optional[CricketAnalyzer] = None
+
+
+def _analyze_safely(analyzer: CricketAnalyzer, yaml_file: str) -> Tuple:
+    """Run analyze_match_file, returning (result, None) or (None, error message)."""
+    try:
+        return analyzer.analyze_match_file(yaml_file), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _init_worker(use_cache: bool, track_deliveries: bool, profile: bool, memprofile: bool, stopping=None):
+    global _worker_analyzer
+    # Forked workers inherit any SIGTERM handler of the parent (see prm.py --checkpoint).
+    # Shielded workers ignore SIGTERM until the parent sets stopping and terminates the pool.
+    handler = signal.SIG_DFL if stopping is None else partial(_sigterm_when_stopping, stopping, os.getppid())
+    signal.signal(signal.SIGTERM, handler)
+    _worker_analyzer = CricketAnalyzer(use_cache=use_cache, track_deliveries=track_deliveries, profile=profile,
+                                       memprofile=memprofile)
+
+
+def _sigterm_when_stopping(stopping, parent_pid: int, signum, frame):
+    # Also exit when orphaned: a parent that died without closing the pool never sets stopping
+    if stopping.is_set() or os.getppid() != parent_pid:
+        os._exit(128 + signum)
+
+
+def _analyze_in_worker(yaml_file: str) -> Tuple:
+    return (*_analyze_safely(_worker_analyzer, yaml_file), _worker_analyzer.timer.drain())
+
 # cricket_analyzer.py
 
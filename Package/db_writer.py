@@ -0,0 +1,377 @@
+"""
+Buffered, transactional SQLite writer shared by the ingestion and PRS pipelines.
+"""
+
+import time
+import sqlite3
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Callable
+
+
+DB_FILE = "database.db"
+
+TABLE_SCHEMAS = {
+    'batsman_stats': '''
+        CREATE TABLE IF NOT EXISTS batsman_stats (
+            match_id TEXT,
+            player_id TEXT,
+            runs INTEGER,
+            fours INTEGER,
+            sixes INTEGER,
+            no_of_balls INTEGER,
+            dismissal_kind TEXT,
+            PRIMARY KEY (match_id, player_id)
+        )
+    ''',
+    'bowling_stats': '''
+        CREATE TABLE IF NOT EXISTS bowling_stats (
+            match_id TEXT,
+            player_id TEXT,
+            bowling_type TEXT,
+            wickets INTEGER,
+            hatrick INTEGER,
+            balls_played INTEGER,
+            maidens INTEGER,
+            runs_given INTEGER,
+            no_balls INTEGER,
+            wides INTEGER,
+            PRIMARY KEY (match_id, player_id)
+        )
+    ''',
+    'master_match': '''
+        CREATE TABLE IF NOT EXISTS master_match (
+            date DATE,
+            match_id TEXT,
+            venue TEXT,
+            city TEXT,
+            team_1 TEXT,
+            team_2 TEXT,
+            toss_winner TEXT,
+            toss_desicion TEXT,
+            team_1_score INTEGER,
+            team_2_score INTEGER,
+            winner TEXT,
+            man_of_the_match TEXT,
+            PRIMARY KEY (date, match_id)
+        )
+    ''',
+    'prm': '''
+        CREATE TABLE IF NOT EXISTS prm (
+            player_name TEXT,
+            batting_prs INTEGER,
+            bowling_prs INTEGER,
+            bat_balls INTEGER,
+            bowl_balls INTEGER,
+            batting_prs_low REAL,
+            batting_prs_high REAL,
+            bowling_prs_low REAL,
+            bowling_prs_high REAL,
+            PRIMARY KEY (player_name)
+        )
+    ''',
+    'ingest_manifest': '''
+        CREATE TABLE IF NOT EXISTS ingest_manifest (
+            pipeline TEXT,
+            file_path TEXT,
+            match_id TEXT,
+            content_hash TEXT,
+            mtime REAL,
+            size INTEGER,
+            status TEXT,
+            error TEXT,
+            ingested_at TEXT,
+            PRIMARY KEY (pipeline, file_path)
+        )
+    ''',
+    'prm_match_partials': '''
+        CREATE TABLE IF NOT EXISTS prm_match_partials (
+            match_id TEXT,
+            player_name TEXT,
+            bat_weighted_score REAL,
+            bat_weight REAL,
+            bat_balls INTEGER,
+            bowl_weighted_score REAL,
+            bowl_weight REAL,
+            bowl_balls INTEGER,
+            season TEXT,
+            venue TEXT,
+            team TEXT,
+            opponent TEXT,
+            match_date TEXT,
+            PRIMARY KEY (match_id, player_name)
+        )
+    ''',
+    'prm_match_pressure': '''
+        CREATE TABLE IF NOT EXISTS prm_match_pressure (
+            match_id TEXT,
+            player_name TEXT,
+            discipline TEXT,
+            level TEXT,
+            balls INTEGER,
+            score_sum REAL,
+            runs INTEGER,
+            overs REAL,
+            PRIMARY KEY (match_id, player_name, discipline, level)
+        )
+    ''',
+    'prm_pressure': '''
+        CREATE TABLE IF NOT EXISTS prm_pressure (
+            player_name TEXT,
+            discipline TEXT,
+            level TEXT,
+            balls INTEGER,
+            score_sum REAL,
+            runs INTEGER,
+            overs REAL,
+            PRIMARY KEY (player_name, discipline, level)
+        )
+    ''',
+    'prm_form': '''
+        CREATE TABLE IF NOT EXISTS prm_form (
+            player_name TEXT,
+            last_date TEXT,
+            bat_decayed_score REAL,
+            bat_decayed_weight REAL,
+            bowl_decayed_score REAL,
+            bowl_decayed_weight REAL,
+            rolling_matches INTEGER,
+            rolling_batting_prs REAL,
+            rolling_bowling_prs REAL,
+            decayed_batting_prs REAL,
+            decayed_bowling_prs REAL,
+            PRIMARY KEY (player_name)
+        )
+    '''
+}
+
+# Columns added after a table was first released: (column, type) pairs that open()
+# adds to existing databases with ALTER TABLE, leaving them NULL on the old rows.
+TABLE_MIGRATIONS = {
+    'prm': [('batting_prs_low', 'REAL'), ('batting_prs_high', 'REAL'),
+            ('bowling_prs_low', 'REAL'), ('bowling_prs_high', 'REAL')],
+    'prm_match_partials': [('season', 'TEXT'), ('venue', 'TEXT'), ('team', 'TEXT'), ('opponent', 'TEXT'),
+                           ('match_date', 'TEXT')],
+    'prm_match_pressure': [('overs', 'REAL')],
+    'prm_pressure': [('overs', 'REAL')]
+}
+
+TABLE_INDEXES = {
+    'prm_match_partials': [
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_partials_player ON prm_match_partials (player_name)',
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_partials_season ON prm_match_partials (season)',
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_partials_venue ON prm_match_partials (venue)',
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_partials_team ON prm_match_partials (team, opponent)',
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_partials_opponent ON prm_match_partials (opponent)',
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_partials_player_date '
+        'ON prm_match_partials (player_name, match_date)'
+    ],
+    'prm_match_pressure': [
+        'CREATE INDEX IF NOT EXISTS idx_prm_match_pressure_player ON prm_match_pressure (player_name)'
+    ]
+}
+
+TABLE_COLUMNS = {
+    'batsman_stats': ('match_id', 'player_id', 'runs', 'fours', 'sixes', 'no_of_balls', 'dismissal_kind'),
+    'bowling_stats': ('match_id', 'player_id', 'bowling_type', 'wickets', 'hatrick', 'balls_played',
+                      'maidens', 'runs_given', 'no_balls', 'wides'),
+    'master_match': ('date', 'match_id', 'venue', 'city', 'team_1', 'team_2', 'toss_winner', 'toss_desicion',
+                     'team_1_score', 'team_2_score', 'winner', 'man_of_the_match'),
+    'prm': ('player_name', 'batting_prs', 'bowling_prs', 'bat_balls', 'bowl_balls',
+            'batting_prs_low', 'batting_prs_high', 'bowling_prs_low', 'bowling_prs_high'),
+    'ingest_manifest': ('pipeline', 'file_path', 'match_id', 'content_hash', 'mtime', 'size',
+                        'status', 'error', 'ingested_at'),
+    'prm_match_partials': ('match_id', 'player_name', 'bat_weighted_score', 'bat_weight', 'bat_balls',
+                           'bowl_weighted_score', 'bowl_weight', 'bowl_balls',
+                           'season', 'venue', 'team', 'opponent', 'match_date'),
+    'prm_match_pressure': ('match_id', 'player_name', 'discipline', 'level', 'balls', 'score_sum', 'runs',
+                           'overs'),
+    'prm_pressure': ('player_name', 'discipline', 'level', 'balls', 'score_sum', 'runs', 'overs'),
+    'prm_form': ('player_name', 'last_date', 'bat_decayed_score', 'bat_decayed_weight',
+                 'bowl_decayed_score', 'bowl_decayed_weight', 'rolling_matches',
+                 'rolling_batting_prs', 'rolling_bowling_prs', 'decayed_batting_prs', 'decayed_bowling_prs')
+}
+
+# Tables whose rows are keyed state rather than facts, with their primary key: a new row
+# updates the existing one in place (ON CONFLICT DO UPDATE, so its rowid is kept).
+UPSERT_KEYS = {
+    'ingest_manifest': ('pipeline', 'file_path'),
+    'prm': ('player_name',),
+    'prm_pressure': ('player_name', 'discipline', 'level'),
+    'prm_form': ('player_name',)
+}
+
+# Bulk-load settings: keep the rollback journal in memory and skip fsyncs between batches.
+# journal_mode=MEMORY is not persisted in the file, so readers of database.db are unaffected.
+LOAD_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'cache_size': -65536,  # 64 MB
+    'temp_store': 'MEMORY'
+}
+
+
+def insert_statement(table: str) -> str:
+    """INSERT for every column of a table; an upsert on its primary key for UPSERT_KEYS tables."""
+    columns = TABLE_COLUMNS[table]
+    statement = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join('?' * len(columns))})")
+    if table in UPSERT_KEYS:
+        keys = UPSERT_KEYS[table]
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column not in keys)
+        statement += f" ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+    return statement
+
+
+class BulkWriter:
+    """Buffers rows and flushes them with executemany, one transaction per batch.
+
+    A batch holds every row and delete queued since the last flush, across all tables,
+    so rows written together (e.g. a match's stats and its manifest entry) commit together.
+    """
+
+    def __init__(self, db_path: str = DB_FILE, batch_size: int = 10000,
+                 pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.pragmas = LOAD_PRAGMAS if pragmas is None else pragmas
+        self.conn: Optional[sqlite3.Connection] = None
+        self.buffers: Dict[str, List[tuple]] = {}
+        self.deletes: List[Tuple[str, Dict[str, Any]]] = []
+        # Callables run as fn(conn) inside each batch's transaction, after its rows are written
+        self.on_flush: List[Callable[[sqlite3.Connection], None]] = []
+        self.pending = 0
+        # Columns added to existing tables by open(), as table -> [column names]
+        self.migrated: Dict[str, List[str]] = {}
+        # Tables that open() had to create
+        self.created: List[str] = []
+        self.rows_written = 0
+        self.rows_deleted = 0
+        self.batches_written = 0
+        self.write_seconds = 0.0
+        # The part of write_seconds spent in the row inserts and commits (rows_per_sec)
+        self.insert_seconds = 0.0
+        self._started = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.buffers.clear()
+            self.deletes.clear()
+            self._disconnect()
+
+    def open(self, tables: Optional[Iterable[str]] = None):
+        """Connect, apply the load-time pragmas and create the tables up front."""
+        self.conn = sqlite3.connect(self.db_path)
+        for name, value in self.pragmas.items():
+            self.conn.execute(f"PRAGMA {name} = {value}")
+
+        existing = {name for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        with self.conn:
+            for table in (tables if tables is not None else TABLE_SCHEMAS):
+                if table not in existing:
+                    self.created.append(table)
+                self.conn.execute(TABLE_SCHEMAS[table])
+                self._migrate(table)
+                for index in TABLE_INDEXES.get(table, []):
+                    self.conn.execute(index)
+
+        self._started = time.perf_counter()
+
+    def add(self, table: str, row: tuple):
+        """Queue a single row; the batch is flushed once it holds batch_size rows."""
+        self.buffers.setdefault(table, []).append(tuple(row))
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def add_many(self, table: str, rows: Iterable[tuple]):
+        """Queue several rows for the same table."""
+        for row in rows:
+            self.add(table, row)
+
+    def delete(self, table: str, **conditions: Any):
+        """Queue deletion of the rows matching all column=value conditions.
+
+        Deletes run at the start of the next flush, before that batch's inserts, so
+        delete-then-add replaces a match's rows atomically.
+        """
+        self.deletes.append((table, conditions))
+        self.pending += 1
+
+    def flush(self):
+        """Write every queued delete and row in a single transaction."""
+        if not self.pending:
+            return
+
+        started = time.perf_counter()
+        with self.conn:  # One transaction per batch; rolled back on error
+            for table, conditions in self.deletes:
+                where = ' AND '.join(f"{column} = ?" for column in conditions)
+                self.rows_deleted += self.conn.execute(
+                    f"DELETE FROM {table} WHERE {where}", tuple(conditions.values())
+                ).rowcount
+
+            inserting = time.perf_counter()
+            for table, rows in self.buffers.items():
+                if rows:
+                    self.conn.executemany(self._insert_statement(table), rows)
+                    self.rows_written += len(rows)
+            self.insert_seconds += time.perf_counter() - inserting
+
+            for callback in self.on_flush:
+                callback(self.conn)
+            committing = time.perf_counter()
+        # Leaving the with block committed the transaction
+        finished = time.perf_counter()
+        self.insert_seconds += finished - committing
+        self.write_seconds += finished - started
+
+        self.batches_written += 1
+        self.buffers = {}
+        self.deletes = []
+        self.pending = 0
+
+    def close(self):
+        """Flush the remaining rows and close the connection."""
+        try:
+            self.flush()
+        finally:
+            self._disconnect()
+
+    def report(self) -> Dict[str, Any]:
+        """Return rows written, elapsed and write seconds, and write throughput since open().
+
+        seconds is everything since open(), the caller's parsing included; write_seconds
+        is the time spent in flush() transactions. rows_per_sec only counts the inserts
+        and commits (insert_seconds), so it measures the writer and nothing else.
+        """
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            'rows': self.rows_written,
+            'deleted': self.rows_deleted,
+            'batches': self.batches_written,
+            'seconds': round(elapsed, 3),
+            'write_seconds': round(self.write_seconds, 3),
+            'insert_seconds': round(self.insert_seconds, 3),
+            'rows_per_sec': (round(self.rows_written / self.insert_seconds, 1)
+                             if self.insert_seconds > 0 else 0.0)
+        }
+
+    def _migrate(self, table: str):
+        existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        for column, column_type in TABLE_MIGRATIONS.get(table, []):
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                self.migrated.setdefault(table, []).append(column)
+
+    def _insert_statement(self, table: str) -> str:
+        return insert_statement(table)
+
+    def _disconnect(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
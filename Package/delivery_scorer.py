@@ -3,6 +3,7 @@ Scores individual deliveries based on performance and pressure context.
 """
 
 from typing import Dict, Any
+import numpy as np
 
 
 class DeliveryScorer:
@@ -79,6 +80,39 @@ class DeliveryScorer:
         
         return weighted_score
     
+    def score_batting_batch(self, batter_runs, total_runs, striker_out, pressure_weight) -> np.ndarray:
+        """Score many batting deliveries at once.
+        
+        Takes one array per column (runs off the bat, total runs, whether the striker was
+        dismissed, pressure weight) and returns the same scores as score_batting_delivery.
+        """
+        batter_runs = np.asarray(batter_runs)
+        weights = self.batting_weights
+        
+        base_score = (batter_runs * weights['runs_per_ball']
+                      + np.where(batter_runs >= 4, weights['boundary_bonus'], 0.0)
+                      + np.where(np.asarray(total_runs) == 0, weights['dot_ball_penalty'], 0.0)
+                      + np.where(striker_out, weights['dismissal_penalty'], 0.0))
+        
+        return base_score * (1.0 + np.asarray(pressure_weight))
+    
+    def score_bowling_batch(self, total_runs, is_wicket, pressure_weight) -> np.ndarray:
+        """Score many bowling deliveries at once.
+        
+        Takes one array per column (runs conceded, whether a wicket fell, pressure weight)
+        and returns the same scores as score_bowling_delivery.
+        """
+        runs_conceded = np.asarray(total_runs)
+        weights = self.bowling_weights
+        
+        base_score = (0.0
+                      + np.where(runs_conceded == 0, weights['dot_ball_bonus'], 0.0)
+                      + np.where(is_wicket, weights['wicket_bonus'], 0.0)
+                      + runs_conceded * weights['runs_conceded_penalty']
+                      + np.where(runs_conceded >= 4, weights['boundary_penalty'], 0.0))
+        
+        return base_score * (1.0 + np.asarray(pressure_weight) * 0.8)
+    
     def get_scoring_summary(self) -> Dict[str, Any]:
         """Return a summary of the scoring system."""
         return {
@@ -0,0 +1,200 @@
+"""
+Keeps each player's recent form up to date: PRS over their last N matches and a time-decayed PRS.
+"""
+
+import sqlite3
+from datetime import date
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from .db_writer import BulkWriter, insert_statement
+from .prs_calculator import PRSCalculator, PlayerPerformance
+
+
+# Matches in the rolling window
+FORM_WINDOW = 10
+# Days after which a match counts half as much in the decayed PRS
+FORM_HALF_LIFE_DAYS = 365
+# Keys of the form dicts returned by player_forms() and the API
+FORM_FIELDS = ('last_date', 'rolling_matches', 'rolling_batting_prs', 'rolling_bowling_prs',
+               'decayed_batting_prs', 'decayed_bowling_prs')
+# SQLite's default limit on host parameters is 999; stay well below it
+_IN_CHUNK = 500
+
+
+class FormStore:
+    """Maintains the prm_form table alongside PRMStore's match partials.
+
+    For each player the table holds the PRS of their last `window` dated matches and the
+    decayed sums Σ 0.5^(age / half_life) · match sums, aged relative to the player's latest
+    match. Scaling both sums by the same factor leaves their ratio unchanged, so the decayed
+    PRS does not go stale as time passes and only moves when the player plays again.
+
+    A new match costs a constant amount of work per player in it: the decayed sums are aged
+    and the match added to them, and the window is read back through the (player_name,
+    match_date) index. A changed or removed match, or a player without a form row yet,
+    is rebuilt from that player's partial rows instead.
+    """
+
+    def __init__(self, writer: BulkWriter, window: int = FORM_WINDOW,
+                 half_life_days: float = FORM_HALF_LIFE_DAYS):
+        self.writer = writer
+        self.window = window
+        self.half_life_days = half_life_days
+        # player -> [(date ordinal, bat score, bat weight, bowl score, bowl weight)] queued since the last flush
+        self.appended: Dict[str, List[Tuple[int, float, float, float, float]]] = {}
+        self.rebuild: Set[str] = set()
+        self.players_refreshed = 0
+        writer.on_flush.append(self._refresh_players)
+
+    def add_match(self, match_id: str, match_date: Optional[str], partials: Dict[str, PlayerPerformance]):
+        """Queue a match's players for a form update.
+
+        Call it after PRMStore.replace_match() with the same partials, so the match's rows are
+        written no later than the flush that refreshes its players.
+        """
+        previous = self._match_players(match_id)
+        if previous:
+            # A changed match (or one already flushed): its rows may be in the decayed sums
+            self.rebuild.update(previous, partials)
+            return
+
+        ordinal = _ordinal(match_date)
+        for player_name, performance in partials.items():
+            if ordinal is None:
+                # Undated matches are left out of the form figures but the row still refreshes
+                self.appended.setdefault(player_name, [])
+                continue
+            self.appended.setdefault(player_name, []).append((
+                ordinal,
+                performance.batting.weighted_score_sum, performance.batting.weight_sum,
+                performance.bowling.weighted_score_sum, performance.bowling.weight_sum
+            ))
+
+    def remove_match(self, match_id: str):
+        """Queue a rebuild for the players of a match; call before PRMStore.remove_match()."""
+        self.rebuild.update(self._match_players(match_id))
+
+    def _match_players(self, match_id: str) -> List[str]:
+        rows = self.writer.conn.execute(
+            "SELECT player_name FROM prm_match_partials WHERE match_id = ?", (match_id,)
+        ).fetchall()
+        return [name for (name,) in rows]
+
+    def _refresh_players(self, conn: sqlite3.Connection):
+        appended, rebuild = self.appended, self.rebuild
+        self.appended, self.rebuild = {}, set()
+
+        rows = []
+        for player_name in sorted(rebuild.union(appended)):
+            stored = None
+            if player_name not in rebuild:
+                stored = conn.execute(
+                    "SELECT last_date, bat_decayed_score, bat_decayed_weight, bowl_decayed_score, "
+                    "bowl_decayed_weight FROM prm_form WHERE player_name = ?", (player_name,)
+                ).fetchone()
+
+            if stored is None:
+                last, sums = self._decay_all(conn, player_name)
+            else:
+                last, sums = _ordinal(stored[0]), list(stored[1:])
+                for contribution in sorted(appended[player_name]):
+                    last = self._decay_into(sums, last, contribution)
+
+            rows.append(self._form_row(conn, player_name, last, sums))
+
+        # Players left without any dated match lose their row
+        conn.executemany("DELETE FROM prm_form WHERE player_name = ?", [(row[0],) for row in rows if not row[6]])
+        conn.executemany(insert_statement('prm_form'), [row for row in rows if row[6]])
+        self.players_refreshed += len(rows)
+
+    def _decay_all(self, conn: sqlite3.Connection, player_name: str) -> Tuple[Optional[int], List[float]]:
+        """Decayed sums from every dated partial row of the player, oldest first."""
+        last, sums = None, [0.0, 0.0, 0.0, 0.0]
+        for match_date, *totals in conn.execute(
+            "SELECT match_date, bat_weighted_score, bat_weight, bowl_weighted_score, bowl_weight "
+            "FROM prm_match_partials WHERE player_name = ? AND match_date IS NOT NULL "
+            "ORDER BY match_date, match_id", (player_name,)
+        ):
+            last = self._decay_into(sums, last, (_ordinal(match_date), *totals))
+        return last, sums
+
+    def _decay_into(self, sums: List[float], last: Optional[int],
+                    contribution: Tuple[int, float, float, float, float]) -> Optional[int]:
+        """Add one match to the decayed sums in place; returns the new reference date.
+
+        A match newer than the reference ages the sums up to its date; an older one (files
+        appended out of date order) is aged down to the reference date instead.
+        """
+        ordinal, *totals = contribution
+        if ordinal is None:
+            return last
+        if last is None or ordinal >= last:
+            factor = 0.5 ** ((ordinal - last) / self.half_life_days) if last is not None else 1.0
+            sums[:] = [value * factor + total for value, total in zip(sums, totals)]
+            return ordinal
+
+        factor = 0.5 ** ((last - ordinal) / self.half_life_days)
+        sums[:] = [value + total * factor for value, total in zip(sums, totals)]
+        return last
+
+    def _form_row(self, conn: sqlite3.Connection, player_name: str,
+                  last: Optional[int], sums: List[float]) -> tuple:
+        matches, bat_weighted, bat_weight, bat_balls, bowl_weighted, bowl_weight, bowl_balls = conn.execute("""
+            SELECT COUNT(*), SUM(bat_weighted_score), SUM(bat_weight), SUM(bat_balls),
+                   SUM(bowl_weighted_score), SUM(bowl_weight), SUM(bowl_balls)
+            FROM (SELECT * FROM prm_match_partials
+                  WHERE player_name = ? AND match_date IS NOT NULL
+                  ORDER BY match_date DESC, match_id DESC
+                  LIMIT ?)
+        """, (player_name, self.window)).fetchone()
+
+        bat_decayed, bat_decayed_weight, bowl_decayed, bowl_decayed_weight = sums
+        return (
+            player_name,
+            date.fromordinal(last).isoformat() if last is not None else None,
+            bat_decayed, bat_decayed_weight, bowl_decayed, bowl_decayed_weight,
+            matches,
+            PRSCalculator.prs_from_totals(bat_weighted, bat_weight) if bat_balls else None,
+            PRSCalculator.prs_from_totals(bowl_weighted, bowl_weight) if bowl_balls else None,
+            PRSCalculator.prs_from_totals(bat_decayed, bat_decayed_weight) if bat_decayed_weight else None,
+            PRSCalculator.prs_from_totals(bowl_decayed, bowl_decayed_weight) if bowl_decayed_weight else None
+        )
+
+
+def player_forms(conn: sqlite3.Connection, players: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """The given players' form figures from prm_form as {player: {field: value}} (FORM_FIELDS).
+
+    Players without a form row are left out; {} when the database has no prm_form table.
+    """
+    players = list(players)
+    forms = {}
+    for start in range(0, len(players), _IN_CHUNK):
+        chunk = players[start:start + _IN_CHUNK]
+        try:
+            rows = conn.execute(f"""
+                SELECT player_name, {', '.join(FORM_FIELDS)} FROM prm_form
+                WHERE player_name IN ({', '.join('?' * len(chunk))})
+            """, chunk).fetchall()
+        except sqlite3.OperationalError:
+            # No form table yet: prm.py --incremental has not been run on this database
+            return {}
+        forms.update((row[0], dict(zip(FORM_FIELDS, row[1:]))) for row in rows)
+    return forms
+
+
+def clear_forms(conn: sqlite3.Connection):
+    """Drop every form row and mark the incremental PRS manifest stale.
+
+    For a full prm.py run, whose prm rows no longer match the stored per-match partials the
+    form is built from: the API reports no form until the next prm.py --incremental, which
+    scores every file again and rebuilds it.
+    """
+    conn.execute("DELETE FROM prm_form")
+    conn.execute("UPDATE ingest_manifest SET status = 'stale' WHERE pipeline = 'prm'")
+
+
+def _ordinal(match_date: Optional[str]) -> Optional[int]:
+    """Day number of an ISO date string, or None when the date is missing or malformed."""
+    try:
+        return date.fromisoformat(str(match_date)[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
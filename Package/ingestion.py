@@ -0,0 +1,224 @@
+"""
+Single-pass ingestion of match YAML files into the batting, bowling and match tables.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from .match_loader import MatchLoader
+
+
+# Only the two regular innings feed the stats tables; super overs are ignored.
+MAX_INNINGS = 2
+
+
+class DeliveryVisitor:
+    """Base class for components that build table rows from a stream of deliveries."""
+
+    table = ''
+
+    def start_match(self, match_id: str, info: Dict):
+        """Reset state for a new match."""
+
+    def start_innings(self, innings: Dict):
+        """Called before the first delivery of an innings."""
+
+    def visit_delivery(self, delivery: Dict, innings: Dict):
+        """Called once for every delivery of the innings."""
+
+    def end_innings(self, innings: Dict):
+        """Called after the last delivery of an innings."""
+
+    def rows(self) -> List[tuple]:
+        """Return the rows collected for the current match."""
+        return []
+
+
+class BattingVisitor(DeliveryVisitor):
+    """Builds `batsman_stats` rows: runs, boundaries, balls faced and dismissal per player."""
+
+    table = 'batsman_stats'
+
+    def start_match(self, match_id: str, info: Dict):
+        self.match_id = match_id
+        self.stats = _init_player_stats(info, lambda: {
+            'runs': 0, 'fours': 0, 'sixes': 0, 'balls': 0, 'dismissal_kind': 'not out'
+        })
+
+    def visit_delivery(self, delivery: Dict, innings: Dict):
+        batsman_runs = delivery['runs']['batsman']
+
+        stats = self.stats.get(delivery['batsman'])
+        if stats is not None:
+            stats['runs'] += batsman_runs
+            if batsman_runs == 4:
+                stats['fours'] += 1
+            if batsman_runs == 6:
+                stats['sixes'] += 1
+            stats['balls'] += 1  # Every delivery faced by the striker, extras included
+
+        wicket = delivery.get('wicket')
+        if wicket:
+            out = self.stats.get(wicket.get('player_out'))
+            if out is not None:
+                out['dismissal_kind'] = wicket.get('kind')
+
+    def rows(self) -> List[tuple]:
+        return [
+            (self.match_id, stats['player_id'], stats['runs'], stats['fours'], stats['sixes'],
+             stats['balls'], stats['dismissal_kind'])
+            for stats in self.stats.values()
+        ]
+
+
+class BowlingVisitor(DeliveryVisitor):
+    """Builds `bowling_stats` rows: wickets, balls, maidens, runs and extras per bowler."""
+
+    table = 'bowling_stats'
+
+    def start_match(self, match_id: str, info: Dict):
+        self.match_id = match_id
+        self.stats = _init_player_stats(info, lambda: {
+            'wickets': 0, 'hatrick': 0, 'balls_played': 0, 'maidens': 0,
+            'runs_given': 0, 'no_balls': 0, 'wides': 0
+        })
+
+    def start_innings(self, innings: Dict):
+        self.current_over = -1
+        self.runs_in_over = 0
+        self.bowler_of_over = None
+
+    def visit_delivery(self, delivery: Dict, innings: Dict):
+        bowler = delivery['bowler']
+
+        # A new over has started: check whether the previous one was a maiden
+        if delivery['over'] != self.current_over:
+            self._close_over()
+            self.current_over = delivery['over']
+            self.runs_in_over = 0
+            self.bowler_of_over = bowler
+
+        stats = self.stats.get(bowler)
+        if stats is None:
+            return
+
+        wicket = delivery.get('wicket')
+        if wicket and wicket.get('player_out') == delivery['batsman']:
+            stats['wickets'] += 1
+
+        batsman_runs = delivery['runs']['batsman']
+        stats['runs_given'] += batsman_runs
+        self.runs_in_over += batsman_runs
+        stats['balls_played'] += 1
+
+        extras = delivery.get('extras') or {}
+        if extras.get('wides') == 1:
+            stats['wides'] += 1
+        if extras.get('noballs') == 1:
+            stats['no_balls'] += 1
+
+    def end_innings(self, innings: Dict):
+        # The last over of the innings never sees a following delivery
+        self._close_over()
+
+    def _close_over(self):
+        if self.current_over != -1 and self.runs_in_over == 0 and self.bowler_of_over:
+            stats = self.stats.get(self.bowler_of_over)
+            if stats is not None:
+                stats['maidens'] += 1
+
+    def rows(self) -> List[tuple]:
+        return [
+            (self.match_id, stats['player_id'], '', stats['wickets'], stats['hatrick'],
+             stats['balls_played'], stats['maidens'], stats['runs_given'],
+             stats['no_balls'], stats['wides'])
+            for stats in self.stats.values()
+        ]
+
+
+class MatchSummaryVisitor(DeliveryVisitor):
+    """Builds the single `master_match` row: venue, toss, innings totals and result."""
+
+    table = 'master_match'
+
+    def start_match(self, match_id: str, info: Dict):
+        self.match_id = match_id
+        self.info = info
+        self.totals = [0] * MAX_INNINGS
+
+    def visit_delivery(self, delivery: Dict, innings: Dict):
+        self.totals[innings['innings_number'] - 1] += delivery['runs']['total']
+
+    def rows(self) -> List[tuple]:
+        info = self.info
+        team1, team2 = info['teams'][0], info['teams'][1]
+
+        # Order the teams so that team_1 is the side that batted first
+        toss = info.get('toss', {})
+        toss_winner = toss.get('winner')
+        decision = toss.get('decision')
+        if decision == 'bat':
+            if team1 != toss_winner:
+                team1, team2 = team2, team1
+        elif team2 != toss_winner:
+            team1, team2 = team2, team1
+
+        outcome = info.get('outcome', {})
+        if 'winner' in outcome:
+            winner = outcome['winner']
+        else:
+            winner = f"{outcome.get('eliminator')} - {outcome.get('result')}"
+
+        player_of_match = info.get('player_of_match') or [None]
+
+        return [(
+            str(info['dates'][0]), self.match_id, info.get('venue'), info.get('city', 'not found'),
+            team1, team2, toss_winner, decision, self.totals[0], self.totals[1],
+            winner, player_of_match[0]
+        )]
+
+
+class MatchIngestor:
+    """Loads each match once and feeds every delivery to all registered visitors."""
+
+    def __init__(self, visitors: Optional[List[DeliveryVisitor]] = None, use_cache: bool = True):
+        self.loader = MatchLoader(use_cache=use_cache)
+        # Deliveries visited so far, across every ingested match
+        self.deliveries = 0
+        self.visitors = visitors if visitors is not None else [
+            BattingVisitor(), BowlingVisitor(), MatchSummaryVisitor()
+        ]
+
+    def ingest_file(self, yaml_file: str) -> Optional[Dict[str, List[tuple]]]:
+        """Load a YAML match file and return the rows for every visitor's table."""
+        return self.ingest_match(self.loader.load(yaml_file), Path(yaml_file).stem)
+
+    def ingest_match(self, match: Dict, match_id: str) -> Optional[Dict[str, List[tuple]]]:
+        """Run all visitors over a parsed match. Returns None for matches with no result."""
+        info = match['info']
+        if info.get('outcome', {}).get('result') == 'no result':
+            return None
+
+        for visitor in self.visitors:
+            visitor.start_match(match_id, info)
+
+        for innings in match['innings'][:MAX_INNINGS]:
+            for visitor in self.visitors:
+                visitor.start_innings(innings)
+            self.deliveries += len(innings['deliveries'])
+            for delivery in innings['deliveries']:
+                for visitor in self.visitors:
+                    visitor.visit_delivery(delivery, innings)
+            for visitor in self.visitors:
+                visitor.end_innings(innings)
+
+        return {visitor.table: visitor.rows() for visitor in self.visitors}
+
+
+def _init_player_stats(info: Dict, factory) -> Dict[str, Dict[str, Any]]:
+    """Create a stats dict for every listed player, keyed by name, in team order."""
+    registry = info.get('registry', {}).get('people', {})
+    stats = {}
+    for team in info.get('teams', []):
+        for player in info.get('players', {}).get(team, []):
+            stats[player] = dict(factory(), player_id=registry.get(player))
+    return stats
@@ -0,0 +1,148 @@
+"""
+Per-ball innings state (score, wickets, recent wickets, balls remaining, chase context) computed in one pass.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+
+
+# Recent wickets are the wickets within this many balls of the latest wicket, that ball
+# included. The count only changes when a wicket falls and holds until the next one,
+# as the original per-ball loop did (it pruned its list to i - w <= 12 on wicket balls only).
+WICKET_WINDOW = 13
+
+
+@dataclass
+class InningsState:
+    """Column arrays describing an innings, one entry per delivery.
+
+    The first five arrays are the deliveries themselves; the rest is the match state
+    after each ball. The chase columns (`target` to `rate_gap`) are NaN where no target
+    is known, and `required_run_rate` / `rate_gap` also once no balls remain. `legal`
+    and `bowler_runs` come from the wides and no-balls columns, when given.
+    """
+    over: np.ndarray
+    runs: np.ndarray              # total runs off the ball, extras included
+    batter_runs: np.ndarray
+    is_wicket: np.ndarray
+    striker_out: np.ndarray       # the wicket was the striker's
+    current_score: np.ndarray
+    wickets_fallen: np.ndarray
+    recent_wickets: np.ndarray    # wickets in the WICKET_WINDOW balls up to the latest wicket
+    balls_remaining: np.ndarray
+    target: np.ndarray
+    runs_required: np.ndarray
+    required_run_rate: np.ndarray
+    current_run_rate: np.ndarray
+    rate_gap: np.ndarray          # required minus current run rate
+    legal: np.ndarray             # neither a wide nor a no-ball
+    bowler_runs: np.ndarray       # runs conceded by the bowler (byes and leg byes excluded)
+
+    @property
+    def total(self) -> int:
+        """Runs scored in the innings."""
+        return int(self.current_score[-1]) if len(self.current_score) else 0
+
+    def __len__(self) -> int:
+        return len(self.runs)
+
+    @classmethod
+    def from_columns(cls, over, runs, batter_runs, is_wicket, striker_out,
+                     total_overs: int, balls_per_over: int = 6,
+                     target: Optional[int] = None, wides=None, noballs=None) -> 'InningsState':
+        """Build the state from delivery columns (lists or arrays, e.g. a columnar store slice).
+
+        wides and noballs are the extras runs of each kind per ball; without them every
+        ball is taken as legal and the bowler as conceding all its runs.
+        """
+        runs = np.asarray(runs, dtype=np.int64)
+        batter_runs = np.asarray(batter_runs, dtype=np.int64)
+        is_wicket = np.asarray(is_wicket, dtype=bool)
+        count = len(runs)
+
+        current_score = np.cumsum(runs)
+        wickets_fallen = np.cumsum(is_wicket, dtype=np.int64)
+        # Difference of the running wicket count against the count WICKET_WINDOW balls earlier,
+        # taken at each wicket ball and carried forward to the following balls
+        window_start = np.zeros(count, dtype=np.int64)
+        window_start[WICKET_WINDOW:] = wickets_fallen[:-WICKET_WINDOW]
+        last_wicket = np.maximum.accumulate(np.where(is_wicket, np.arange(count), -1))
+        recent_wickets = np.where(last_wicket >= 0, (wickets_fallen - window_start)[last_wicket], 0)
+
+        balls_bowled = np.arange(1, count + 1)
+        balls_remaining = total_overs * balls_per_over - balls_bowled
+        current_run_rate = current_score / (balls_bowled / balls_per_over)
+
+        # Chase context: everything is relative to the target, NaN when there is none
+        target_column = np.full(count, np.nan if target is None else float(target))
+        runs_required = target_column - current_score
+        required_run_rate = np.full(count, np.nan)
+        if target:
+            chasing = balls_remaining > 0
+            required_run_rate[chasing] = ((target - current_score[chasing])
+                                          / (balls_remaining[chasing] / balls_per_over))
+
+        if wides is None or noballs is None:
+            legal = np.ones(count, dtype=bool)
+            bowler_runs = runs
+        else:
+            wides = np.asarray(wides, dtype=np.int64)
+            noballs = np.asarray(noballs, dtype=np.int64)
+            legal = (wides == 0) & (noballs == 0)
+            bowler_runs = batter_runs + wides + noballs
+
+        return cls(
+            over=np.asarray(over, dtype=np.int64),
+            runs=runs,
+            batter_runs=batter_runs,
+            is_wicket=is_wicket,
+            striker_out=np.asarray(striker_out, dtype=bool),
+            current_score=current_score,
+            wickets_fallen=wickets_fallen,
+            recent_wickets=recent_wickets,
+            balls_remaining=balls_remaining,
+            target=target_column,
+            runs_required=runs_required,
+            required_run_rate=required_run_rate,
+            current_run_rate=current_run_rate,
+            rate_gap=required_run_rate - current_run_rate,
+            legal=legal,
+            bowler_runs=bowler_runs
+        )
+
+    @classmethod
+    def from_deliveries(cls, deliveries: List[Dict], total_overs: int, balls_per_over: int = 6,
+                        target: Optional[int] = None) -> 'InningsState':
+        """Build the state from MatchParser delivery dicts."""
+        over, runs, batter_runs, is_wicket, striker_out, wides, noballs = [], [], [], [], [], [], []
+        for delivery in deliveries:
+            wicket = delivery.get('wicket')
+            extras = delivery.get('extras') or {}
+            over.append(delivery['over'])
+            runs.append(delivery['runs']['total'])
+            batter_runs.append(delivery['runs']['batsman'])
+            is_wicket.append(bool(wicket))
+            striker_out.append(bool(wicket) and wicket.get('player_out') == delivery['batsman'])
+            wides.append(extras.get('wides', 0))
+            noballs.append(extras.get('noballs', 0))
+
+        return cls.from_columns(over, runs, batter_runs, is_wicket, striker_out,
+                                total_overs, balls_per_over, target, wides, noballs)
+
+    def chase_target(self) -> int:
+        """Target for the side batting next when this is the first innings."""
+        return self.total + 1
+
+    def classifier_inputs(self) -> Dict[str, np.ndarray]:
+        """Keyword arguments for PressureClassifier.classify_innings()."""
+        return {
+            'over': self.over,
+            'current_score': self.current_score,
+            'wickets_fallen': self.wickets_fallen,
+            'balls_remaining': self.balls_remaining,
+            'required_run_rate': self.required_run_rate,
+            'recent_wickets': self.recent_wickets,
+            'runs': self.runs,
+            'is_wicket': self.is_wicket
+        }
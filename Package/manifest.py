@@ -0,0 +1,129 @@
+"""
+Tracks which match files each pipeline has already ingested, so reruns only touch new or changed files.
+"""
+
+import os
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from .db_writer import BulkWriter, TABLE_SCHEMAS, TABLE_COLUMNS, DB_FILE
+
+
+# Statuses that mean "nothing left to do for this file until it changes"
+DONE_STATUSES = ('ok', 'skipped')
+
+
+class IngestManifest:
+    """Per-pipeline record of each file's content hash, mtime, size and ingest status."""
+
+    def __init__(self, pipeline: str, db_path: str = DB_FILE):
+        self.pipeline = pipeline
+        self.db_path = db_path
+        self.entries = self._load_entries()
+        self.touched: List[str] = []
+
+    def plan(self, yaml_files: List[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """Split the given files into work to do.
+
+        Returns (changed, removed): `changed` holds (file, content hash) for files that are
+        new, modified or previously failed; `removed` holds manifest keys under the same
+        directories whose file no longer exists. Files with an unchanged mtime and size are
+        skipped without hashing.
+        """
+        changed = []
+        current = set()
+
+        for yaml_file in yaml_files:
+            key = self.key(yaml_file)
+            current.add(key)
+            entry = self.entries.get(key)
+            stat = os.stat(yaml_file)
+
+            if entry and entry['status'] in DONE_STATUSES:
+                if entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                    continue
+                digest = file_hash(yaml_file)
+                if entry['content_hash'] == digest:
+                    # Touched but not modified: only the stat fields need refreshing
+                    entry['mtime'], entry['size'] = stat.st_mtime, stat.st_size
+                    self.touched.append(key)
+                    continue
+            else:
+                digest = file_hash(yaml_file)
+
+            changed.append((yaml_file, digest))
+
+        directories = {str(Path(key).parent) for key in current}
+        removed = [key for key in self.entries
+                   if key not in current and str(Path(key).parent) in directories]
+        return changed, removed
+
+    def record(self, writer: BulkWriter, yaml_file: str, digest: str, status: str,
+               error: Optional[str] = None):
+        """Queue the manifest row for a processed file on the writer's current batch."""
+        stat = os.stat(yaml_file)
+        key = self.key(yaml_file)
+        self.entries[key] = {
+            'pipeline': self.pipeline,
+            'file_path': key,
+            'match_id': match_id_for(key),
+            'content_hash': digest,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'status': status,
+            'error': error,
+            'ingested_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self._write(writer, key)
+
+    def record_touched(self, writer: BulkWriter):
+        """Queue stat refreshes for files whose mtime changed but whose content did not."""
+        for key in self.touched:
+            self._write(writer, key)
+        self.touched = []
+
+    def forget(self, writer: BulkWriter, key: str):
+        """Queue removal of the manifest row for a file that no longer exists."""
+        writer.delete('ingest_manifest', pipeline=self.pipeline, file_path=key)
+        self.entries.pop(key, None)
+
+    def invalidate(self):
+        """Treat every recorded file as changed on the next plan(), e.g. after a schema change."""
+        for entry in self.entries.values():
+            entry['status'] = 'stale'
+
+    @staticmethod
+    def key(yaml_file: str) -> str:
+        """Manifest key for a file: its normalised path."""
+        return os.path.normpath(yaml_file)
+
+    def _write(self, writer: BulkWriter, key: str):
+        entry = self.entries[key]
+        writer.add('ingest_manifest', tuple(entry[column] for column in TABLE_COLUMNS['ingest_manifest']))
+
+    def _load_entries(self) -> Dict[str, Dict[str, Any]]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                conn.execute(TABLE_SCHEMAS['ingest_manifest'])
+            rows = conn.execute(
+                "SELECT * FROM ingest_manifest WHERE pipeline = ?", (self.pipeline,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        return {row['file_path']: dict(row) for row in rows}
+
+
+def match_id_for(yaml_file: str) -> str:
+    """Match id used by every table: the file name without its extension."""
+    return Path(yaml_file).stem
+
+
+def file_hash(yaml_file: str) -> str:
+    """SHA-1 of a file's contents (the same key the match cache uses)."""
+    with open(yaml_file, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
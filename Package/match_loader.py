@@ -0,0 +1,180 @@
+"""
+Loads match YAML files through libyaml when available, with a parse-once binary cache.
+"""
+
+import os
+import re
+import glob
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+import yaml
+from .match_parser import MatchParser
+from .stage_timer import NULL_TIMER
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+
+CACHE_DIR_NAME = '.cache'
+
+# Bump whenever the structure returned by MatchParser.parse_match changes,
+# so that existing cache entries are ignored and rebuilt.
+CACHE_VERSION = 1
+
+CACHE_SUFFIX = f'.v{CACHE_VERSION}.pickle'
+
+# Cache entry names of any version: <stem>.<16 hex digits of the content hash>.v<version>.pickle
+_ENTRY_NAME = re.compile(r"(.+)\.[0-9a-f]{16}\.v\d+\.pickle")
+
+
+def load_yaml(yaml_file: str) -> Any:
+    """Load a YAML file with the fastest available safe loader."""
+    with open(yaml_file, 'rb') as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
+class MatchLoader:
+    """Returns parsed matches, reusing a content-hash-keyed pickle of each file when possible.
+
+    Cache entries live in a `.cache` directory next to the source file and are named
+    `<stem>.<content hash>.v<version>.pickle`. Editing a file changes its hash, so the
+    stale entry is never read again and is removed the next time the file is loaded.
+    """
+
+    def __init__(self, use_cache: bool = True, cache_dir: Optional[str] = None):
+        self.parser = MatchParser()
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        # Set to a StageTimer to time the load / yaml / parse stages
+        self.timer = NULL_TIMER
+
+    def load(self, yaml_file: str) -> Dict:
+        """Load and parse a match file."""
+        timer = self.timer
+        if not self.use_cache:
+            with timer.stage('yaml'):
+                raw = self._load_raw(yaml_file)
+            with timer.stage('parse'):
+                return self.parser.parse_match(raw)
+
+        with timer.stage('load'):
+            with open(yaml_file, 'rb') as file:
+                content = file.read()
+            cache_file = self.cache_path(yaml_file, hashlib.sha1(content).hexdigest())
+
+            try:
+                with open(cache_file, 'rb') as file:
+                    match = pickle.load(file)
+                self.hits += 1
+                return match
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # Truncated, or pickled against classes or a structure that have since
+                # changed: the entry is stale, so drop it and parse the YAML again
+                _discard(cache_file)
+
+        with timer.stage('yaml'):
+            try:
+                raw = yaml.load(content, Loader=SafeLoader)
+            except Exception as e:
+                raise Exception(f"Failed to load YAML file: {e}")
+        with timer.stage('parse'):
+            match = self.parser.parse_match(raw)
+        self.misses += 1
+        with timer.stage('load'):
+            self._store(cache_file, Path(yaml_file).stem, match)
+        return match
+
+    def cache_path(self, yaml_file: str, digest: str) -> Path:
+        """Cache entry for a source file with the given content hash."""
+        source = Path(yaml_file)
+        return self._cache_dir_for(source) / f"{source.stem}.{digest[:16]}{CACHE_SUFFIX}"
+
+    def is_cached(self, yaml_file: str) -> bool:
+        """Whether an up-to-date cache entry exists for the file."""
+        with open(yaml_file, 'rb') as file:
+            digest = hashlib.sha1(file.read()).hexdigest()
+        return self.cache_path(yaml_file, digest).exists()
+
+    def prune(self, yaml_files: List[str]) -> Tuple[int, int]:
+        """Delete cache entries that no longer match a current source file.
+
+        Only cache directories belonging to the given files are inspected. An entry is
+        removed when it is an old version of a given file (stale) or when its source file
+        is gone (orphaned); entries of source files that exist but were not given are kept.
+        Returns (entries kept, entries removed).
+        """
+        live = set()
+        listed: Dict[Path, set] = {}
+        for yaml_file in yaml_files:
+            with open(yaml_file, 'rb') as file:
+                digest = hashlib.sha1(file.read()).hexdigest()
+            live.add(self.cache_path(yaml_file, digest))
+            listed.setdefault(self._cache_dir_for(Path(yaml_file)), set()).add(Path(yaml_file).stem)
+
+        kept = removed = 0
+        for cache_dir, stems in listed.items():
+            if not cache_dir.is_dir():
+                continue
+            for entry in cache_dir.glob('*.pickle'):
+                name = _ENTRY_NAME.fullmatch(entry.name)
+                if entry in live or not name or (name.group(1) not in stems
+                                                 and self._source_exists(cache_dir, name.group(1))):
+                    kept += 1
+                else:
+                    entry.unlink()
+                    removed += 1
+        return kept, removed
+
+    def _load_raw(self, yaml_file: str) -> Dict:
+        try:
+            return load_yaml(yaml_file)
+        except Exception as e:
+            raise Exception(f"Failed to load YAML file: {e}")
+
+    def _source_exists(self, cache_dir: Path, stem: str) -> bool:
+        """Whether a source file for entries named after stem may still exist.
+
+        With a shared cache_dir the sources could be anywhere, so they are assumed to exist.
+        """
+        if self.cache_dir:
+            return True
+        return any(cache_dir.parent.glob(f"{glob.escape(stem)}.y*ml"))
+
+    def _cache_dir_for(self, source: Path) -> Path:
+        if self.cache_dir:
+            return Path(self.cache_dir)
+        return source.parent / CACHE_DIR_NAME
+
+    def _store(self, cache_file: Path, stem: str, match: Dict):
+        """Write a cache entry atomically and drop older entries for the same file."""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Only this file's entries (any hash, any version): a bare glob on the stem would
+            # also match the entries of a.b.yaml when storing a.yaml
+            for stale in cache_file.parent.glob(f"{glob.escape(stem)}.*.pickle"):
+                name = _ENTRY_NAME.fullmatch(stale.name)
+                if stale != cache_file and name and name.group(1) == stem:
+                    stale.unlink()
+
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'wb') as file:
+                pickle.dump(match, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            # A read-only data directory just means no caching
+            pass
+
+
+def _discard(cache_file: Path):
+    try:
+        cache_file.unlink()
+    except OSError:
+        pass
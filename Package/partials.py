@@ -0,0 +1,94 @@
+"""
+Reads and writes PRS partial-aggregate files, so a corpus can be scored in shards and reduced,
+and a long run can checkpoint its totals and resume.
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from .prs_calculator import PRSCalculator, PlayerPerformance
+
+
+PARTIALS_VERSION = 1
+
+# Files analyzed between two checkpoints
+CHECKPOINT_EVERY = 500
+
+
+def select_shard(yaml_files: List[str], shard: str) -> List[str]:
+    """The files belonging to shard "K/N" (1-based): every N-th file of the sorted list, from the K-th."""
+    try:
+        index, count = (int(part) for part in shard.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like K/N, got {shard!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return sorted(yaml_files)[index - 1::count]
+
+
+def write_partials(path: str, calculator: PRSCalculator, yaml_files: List[str],
+                   errors: List[Dict[str, str]]):
+    """Write the calculator's per-player partials plus the files they cover, atomically."""
+    data = {
+        'version': PARTIALS_VERSION,
+        'files': yaml_files,
+        'errors': errors,
+        'players': calculator.to_dict()
+    }
+    target = Path(path)
+    if target.parent != Path('.'):
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_file = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+        # On disk before the rename, so a crash leaves the old file or the new one, never a torn one
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_file, target)
+
+
+def read_partials(path: str) -> Tuple[Dict[str, PlayerPerformance], Dict[str, Any]]:
+    """Read a partials file; returns (partials for PRSCalculator.merge, the rest of the file)."""
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    if data.get('version') != PARTIALS_VERSION:
+        raise ValueError(f"Unsupported partials version {data.get('version')} in {path}")
+
+    return PRSCalculator.partials_from_dict(data.pop('players')), data
+
+
+class Checkpointer:
+    """Writes a run's running totals as a partials file every `every` files.
+
+    The file lists the files whose partials are in the totals and the files that failed,
+    with their errors. It is replaced atomically, so it always describes a consistent
+    state. Resuming merges its partials and skips its files, which gives the same totals
+    as an uninterrupted run in the same order. Failed files are not marked done, so a
+    resume retries them.
+    """
+
+    def __init__(self, path: str, every: int = CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.pending = 0
+        self.written = 0
+
+    def load(self) -> Optional[Tuple[Dict[str, PlayerPerformance], List[str], List[Dict[str, str]]]]:
+        """(partials, completed files, errors) of the last checkpoint, or None when there is none."""
+        if not os.path.exists(self.path):
+            return None
+        partials, meta = read_partials(self.path)
+        return partials, meta['files'], meta['errors']
+
+    def file_done(self, calculator: PRSCalculator, yaml_files: List[str], errors: List[Dict[str, str]]):
+        """Count one analyzed (or failed) file and write a checkpoint when one is due."""
+        self.pending += 1
+        if self.pending >= self.every:
+            self.write(calculator, yaml_files, errors)
+
+    def write(self, calculator: PRSCalculator, yaml_files: List[str], errors: List[Dict[str, str]]):
+        write_partials(self.path, calculator, yaml_files, errors)
+        self.pending = 0
+        self.written += 1
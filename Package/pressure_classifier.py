@@ -2,8 +2,17 @@
 Classifies the pressure level of each delivery based on match context.
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
 from enum import Enum
+import numpy as np
+
+
+# The run-rate table is indexed by ceil(required run rate), clipped to 0..RUN_RATE_CAP.
+# That is exact because every band boundary of _calculate_run_rate_pressure is a whole
+# number: a rate and its ceiling always fall in the same band. Rates above the cap share
+# its band; the last entry is for an unknown target (NaN).
+RUN_RATE_CAP = 13
 
 
 class PressureLevel(Enum):
@@ -15,6 +24,14 @@ class PressureLevel(Enum):
     EXTREME = 5
 
 
+@dataclass(frozen=True)
+class FactorTables:
+    """Dense lookups of the factors that depend on one small integer input, for one format."""
+    phase: np.ndarray             # by over
+    balls_remaining: np.ndarray   # by balls remaining
+    run_rate: np.ndarray          # by ceil(required run rate), then NaN
+
+
 class PressureClassifier:
     """Classifies deliveries into pressure zones based on match context."""
     
@@ -27,33 +44,155 @@ class PressureClassifier:
             PressureLevel.HIGH: 0.8,
             PressureLevel.EXTREME: 1.0
         }
+        
+        # Contribution of each factor to the overall pressure
+        self.factor_weights = {
+            'phase_pressure': 0.25,
+            'wicket_pressure': 0.25,
+            'run_rate_pressure': 0.25,
+            'balls_remaining_pressure': 0.15,
+            'situation_pressure': 0.1
+        }
+        
+        # Upper bounds (inclusive) of VERY_LOW, LOW, MEDIUM and HIGH overall pressure
+        self.level_thresholds = (0.3, 0.45, 0.6, 0.8)
+        
+        # Factor lookup tables per (total_overs, balls_per_over), built on first use
+        self._tables: Dict[Tuple[int, int], FactorTables] = {}
     
     def classify_delivery(self, delivery: Dict, current_score: int, wickets_fallen: int,
                          balls_remaining: int, total_overs: int, required_run_rate: Optional[float],
-                         recent_wickets: int) -> Dict:
-        """Classify a single delivery's pressure level."""
+                         recent_wickets: int, balls_per_over: int = 6) -> Dict:
+        """Classify a single delivery's pressure level.
+        
+        Thin wrapper around classify_innings() for callers that work one ball at a time.
+        """
+        wicket = delivery.get('wicket')
+        batch = self.classify_innings(
+            over=[delivery['over']],
+            current_score=[current_score],
+            wickets_fallen=[wickets_fallen],
+            balls_remaining=[balls_remaining],
+            required_run_rate=[np.nan if required_run_rate is None else required_run_rate],
+            recent_wickets=[recent_wickets],
+            runs=[delivery.get('runs', {}).get('total', 0)],
+            is_wicket=[bool(wicket)],
+            total_overs=total_overs,
+            include_factors=True,
+            balls_per_over=balls_per_over
+        )
+        
+        return {
+            'level': PressureLevel(int(batch['level'][0])),
+            'weight': float(batch['weight'][0]),
+            'factors': {name: float(values[0]) for name, values in batch['factors'].items()}
+        }
+    
+    def classify_innings(self, over, current_score, wickets_fallen, balls_remaining,
+                         required_run_rate, recent_wickets, runs, is_wicket,
+                         total_overs: int, include_factors: bool = False, balls_per_over: int = 6) -> Dict:
+        """Classify many deliveries at once.
         
-        pressure_factors = self._calculate_pressure_factors(
-            delivery, current_score, wickets_fallen, balls_remaining,
-            total_overs, required_run_rate, recent_wickets
+        Every argument except total_overs is a sequence with one entry per delivery;
+        required_run_rate uses NaN where no target is known. Returns a dict of NumPy arrays:
+        'level' (PressureLevel values 1-5) and 'weight', plus 'factors' (name -> array)
+        when include_factors is set. Results match classify_delivery() exactly.
+        """
+        factors = self.calculate_factor_arrays(
+            np.asarray(over), np.asarray(wickets_fallen), np.asarray(balls_remaining),
+            np.asarray(required_run_rate, dtype=np.float64), np.asarray(recent_wickets),
+            np.asarray(runs), np.asarray(is_wicket, dtype=bool), total_overs, balls_per_over
         )
         
-        pressure_level = self._determine_pressure_level(pressure_factors)
+        total_pressure = self.combine_factors(factors)
+        levels = np.searchsorted(self.level_thresholds, total_pressure, side='left') + 1
+        weights = np.array([self.pressure_weights[level] for level in PressureLevel])[levels - 1]
+        
+        result = {'level': levels, 'weight': weights}
+        if include_factors:
+            result['factors'] = factors
+        return result
+    
+    def calculate_factor_arrays(self, over: np.ndarray, wickets_fallen: np.ndarray,
+                                balls_remaining: np.ndarray, required_run_rate: np.ndarray,
+                                recent_wickets: np.ndarray, runs: np.ndarray,
+                                is_wicket: np.ndarray, total_overs: int,
+                                balls_per_over: int = 6) -> Dict[str, np.ndarray]:
+        """Vectorised counterpart of _calculate_pressure_factors (same thresholds, same order).
+        
+        Phase, balls-remaining and run-rate pressure are read from the format's
+        factor_tables(); the wicket and situation factors combine several inputs and
+        are computed directly.
+        """
+        tables = self.factor_tables(total_overs, balls_per_over)
+        
+        # Phase of the match, by over
+        phase = tables.phase[np.clip(over, 0, len(tables.phase) - 1)]
+        
+        # Wickets situation
+        wicket = np.minimum(np.minimum(wickets_fallen / 10.0, 0.8) + np.minimum(recent_wickets * 0.2, 0.4), 1.0)
+        
+        # Required run rate by its ceiling (NaN = unknown target)
+        rate = np.ceil(required_run_rate)
+        run_rate = tables.run_rate[np.where(np.isnan(rate), RUN_RATE_CAP + 1,
+                                            np.clip(rate, 0, RUN_RATE_CAP)).astype(np.intp)]
+        
+        # Balls remaining
+        balls = tables.balls_remaining[np.clip(balls_remaining, 0, len(tables.balls_remaining) - 1)]
+        
+        # Specific delivery situation: wicket, boundary or dot ball
+        situation = np.where(is_wicket, 0.3, 0.0) + np.select([runs >= 4, runs == 0], [0.2, 0.1], 0.0)
+        situation = np.minimum(situation, 0.5)
         
         return {
-            'level': pressure_level,
-            'weight': self.pressure_weights[pressure_level],
-            'factors': pressure_factors
+            'phase_pressure': phase,
+            'wicket_pressure': wicket,
+            'run_rate_pressure': run_rate,
+            'balls_remaining_pressure': balls,
+            'situation_pressure': situation
         }
     
+    def factor_tables(self, total_overs: int, balls_per_over: int = 6) -> FactorTables:
+        """The format's lookup tables, built once from the scalar factor methods.
+        
+        Each table extends to an index past which its factor no longer changes (the last
+        over, all balls remaining, RUN_RATE_CAP), so clipping out-of-range inputs to the
+        ends gives the same values as the thresholds. Balls remaining are measured
+        against total_overs * balls_per_over, the innings length InningsState counts
+        them down from.
+        """
+        key = (total_overs, balls_per_over)
+        tables = self._tables.get(key)
+        if tables is None:
+            total_balls = total_overs * balls_per_over
+            # Short formats separate overs up to 6, longer ones are flat after the last over
+            last_over = max(total_overs, 6)
+            tables = self._tables[key] = FactorTables(
+                phase=np.array([self._calculate_phase_pressure(over, total_overs)
+                                for over in range(last_over + 1)]),
+                balls_remaining=np.array([self._calculate_balls_remaining_pressure(balls, total_balls)
+                                          for balls in range(total_balls + 1)]),
+                run_rate=np.array([self._calculate_run_rate_pressure(float(rate))
+                                   for rate in range(RUN_RATE_CAP + 1)]
+                                  + [self._calculate_run_rate_pressure(None)])
+            )
+        return tables
+    
+    def combine_factors(self, factors: Dict) -> np.ndarray:
+        """Weighted sum of the factor arrays, accumulated in factor_weights order."""
+        total_pressure = 0
+        for factor, weight in self.factor_weights.items():
+            total_pressure = total_pressure + factors[factor] * weight
+        return total_pressure
+    
     def _calculate_pressure_factors(self, delivery: Dict, current_score: int,
                                    wickets_fallen: int, balls_remaining: int,
                                    total_overs: int, required_run_rate: Optional[float],
-                                   recent_wickets: int) -> Dict:
+                                   recent_wickets: int, balls_per_over: int = 6) -> Dict:
         """Calculate various pressure factors for the delivery."""
         
         over_num = delivery['over']
-        total_balls = total_overs * 6
+        total_balls = total_overs * balls_per_over
         balls_bowled = total_balls - balls_remaining
         
         factors = {
@@ -141,23 +280,16 @@ class PressureClassifier:
     def _determine_pressure_level(self, factors: Dict) -> PressureLevel:
         """Determine overall pressure level from individual factors."""
         # Weighted average of all pressure factors
-        weights = {
-            'phase_pressure': 0.25,
-            'wicket_pressure': 0.25,
-            'run_rate_pressure': 0.25,
-            'balls_remaining_pressure': 0.15,
-            'situation_pressure': 0.1
-        }
-        
-        total_pressure = sum(factors[factor] * weight for factor, weight in weights.items())
+        total_pressure = sum(factors[factor] * weight for factor, weight in self.factor_weights.items())
         
-        if total_pressure <= 0.3:
+        very_low, low, medium, high = self.level_thresholds
+        if total_pressure <= very_low:
             return PressureLevel.VERY_LOW
-        elif total_pressure <= 0.45:
+        elif total_pressure <= low:
             return PressureLevel.LOW
-        elif total_pressure <= 0.6:
+        elif total_pressure <= medium:
             return PressureLevel.MEDIUM
-        elif total_pressure <= 0.8:
+        elif total_pressure <= high:
             return PressureLevel.HIGH
         else:
             return PressureLevel.EXTREME
\ No newline at end of file
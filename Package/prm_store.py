@@ -0,0 +1,233 @@
+"""
+Persists per-match PRS partial sums and keeps the prm table in step with them.
+"""
+
+import sys
+import sqlite3
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple, Union
+from .db_writer import BulkWriter, DB_FILE, insert_statement
+from .form_store import clear_forms
+from .pressure_classifier import PressureLevel
+from .prs_calculator import PRSCalculator, PlayerPerformance, DisciplineStats, level_summary
+
+
+# SQLite's default limit on host parameters is 999; stay well below it
+_IN_CHUNK = 500
+
+
+class PRMStore:
+    """Replaces a match's partial rows and recomputes prm for the players it touched.
+
+    Every match contributes one `prm_match_partials` row per player with the sums PRS is
+    built from. A player's prm row is the PRS of the SUM of their partial rows, so adding,
+    changing or removing a match only needs those players' rows re-aggregated. The
+    re-aggregation runs inside the writer's batch transaction, so prm never disagrees
+    with the committed partials. Per-pressure-level totals follow the same scheme:
+    `prm_match_pressure` rows per match, summed into `prm_pressure`.
+    """
+
+    def __init__(self, writer: BulkWriter):
+        self.writer = writer
+        self.affected: Set[str] = set()
+        self.players_refreshed = 0
+        writer.on_flush.append(self._refresh_players)
+
+    def replace_match(self, match_id: str, partials: Dict[str, PlayerPerformance],
+                      context: Optional[Dict[str, Any]] = None):
+        """Queue the partial rows for a new or changed match, replacing any previous rows.
+
+        context is the analyzer's match context (season, venue and each player's team and
+        opponent); it fills the slice columns that prm_slice() filters on.
+        """
+        self.remove_match(match_id)
+        context = context or {}
+        player_teams = context.get('player_teams', {})
+
+        for player_name, performance in partials.items():
+            team, opponent = player_teams.get(player_name, (None, None))
+            self.writer.add('prm_match_partials', (
+                match_id, player_name,
+                *_discipline_totals(performance.batting),
+                *_discipline_totals(performance.bowling),
+                context.get('season'), context.get('venue'), team, opponent, context.get('date')
+            ))
+            self.affected.add(player_name)
+
+            for discipline in ('batting', 'bowling'):
+                for level_row in getattr(performance, f'{discipline}_levels').rows():
+                    self.writer.add('prm_match_pressure', (match_id, player_name, discipline, *level_row))
+
+    def remove_match(self, match_id: str):
+        """Queue deletion of a match's partial rows."""
+        previous = self.writer.conn.execute(
+            "SELECT player_name FROM prm_match_partials WHERE match_id = ?", (match_id,)
+        ).fetchall()
+        self.affected.update(name for (name,) in previous)
+        self.writer.delete('prm_match_partials', match_id=match_id)
+        self.writer.delete('prm_match_pressure', match_id=match_id)
+
+    def _refresh_players(self, conn: sqlite3.Connection):
+        players = sorted(self.affected)
+        self.affected = set()
+
+        for start in range(0, len(players), _IN_CHUNK):
+            chunk = players[start:start + _IN_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f"""
+                SELECT player_name,
+                       SUM(bat_weighted_score), SUM(bat_weight), SUM(bat_balls),
+                       SUM(bowl_weighted_score), SUM(bowl_weight), SUM(bowl_balls)
+                FROM prm_match_partials
+                WHERE player_name IN ({placeholders})
+                GROUP BY player_name
+            """, chunk).fetchall()
+
+            remaining = {row[0] for row in rows}
+            conn.executemany("DELETE FROM prm WHERE player_name = ?",
+                             [(name,) for name in chunk if name not in remaining])
+            conn.executemany(insert_statement('prm'), [_prm_row(*row) for row in rows])
+
+            conn.execute(f"DELETE FROM prm_pressure WHERE player_name IN ({placeholders})", chunk)
+            conn.execute(f'''
+                INSERT INTO prm_pressure (player_name, discipline, level, balls, score_sum, runs, overs)
+                SELECT player_name, discipline, level, SUM(balls), SUM(score_sum), SUM(runs), SUM(overs)
+                FROM prm_match_pressure
+                WHERE player_name IN ({placeholders})
+                GROUP BY player_name, discipline, level
+            ''', chunk)
+
+        self.players_refreshed += len(players)
+
+
+def save_prm_results(results: Union[Dict[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]],
+                     pressure_rows: Iterable[tuple] = (), db_path: str = DB_FILE) -> Dict[str, Any]:
+    """Upsert a full calculate_final_scores() result set into prm in one transaction.
+
+    results is the result dict or (player_name, stats) pairs, e.g. the lazy
+    CricketAnalyzer.iter_final_results(), which is consumed one player at a time.
+    Every player is written, whatever was printed; existing rows are updated in place
+    (INSERT ... ON CONFLICT DO UPDATE), so reruns never trip over the primary key.
+    pressure_rows (PRSCalculator.pressure_rows()) replace every written player's
+    prm_pressure rows in the same transaction, so levels a player no longer has balls
+    in do not linger. prm_form is cleared in the same transaction (form_store.clear_forms()).
+    Returns the writer's report() plus the number of players.
+    """
+    players = results.items() if isinstance(results, dict) else results
+
+    # Only close() flushes, so the whole result set commits or none of it does
+    writer = BulkWriter(db_path, batch_size=sys.maxsize)
+    writer.open(tables=['prm', 'prm_pressure', 'prm_form', 'ingest_manifest'])
+    # The form figures were built from the incremental partials, not from these scores
+    writer.on_flush.append(clear_forms)
+    count = 0
+    for player_name, stats in players:
+        writer.delete('prm_pressure', player_name=player_name)
+        writer.add('prm', results_row(player_name, stats))
+        count += 1
+    writer.add_many('prm_pressure', pressure_rows)
+    writer.close()
+    return {**writer.report(), 'players': count}
+
+
+# Slice filters accepted by prm_slice(): name -> SQL condition on prm_match_partials
+SLICE_FILTERS = {
+    'season': 'season = ?',
+    'venue': 'venue LIKE ?',
+    'team': 'team = ?',
+    'opponent': 'opponent = ?'
+}
+
+
+def prm_slice(conn: sqlite3.Connection, **filters: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """PRS per player over the matches matching the filters, with one aggregate query.
+
+    Filters are season ('2023'), venue (substring, e.g. 'Wankhede'), team and opponent;
+    None or empty values are ignored. Returns the same shape as
+    PRSCalculator.calculate_final_scores().
+    """
+    conditions, params = [], []
+    for name, value in filters.items():
+        if name not in SLICE_FILTERS:
+            raise ValueError(f"Unknown slice filter: {name}")
+        if value:
+            conditions.append(SLICE_FILTERS[name])
+            params.append(f"%{value}%" if name == 'venue' else value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    rows = conn.execute(f"""
+        SELECT player_name,
+               SUM(bat_weighted_score), SUM(bat_weight), SUM(bat_balls),
+               SUM(bowl_weighted_score), SUM(bowl_weight), SUM(bowl_balls)
+        FROM prm_match_partials
+        {where}
+        GROUP BY player_name
+    """, params).fetchall()
+
+    results = {}
+    for player_name, bat_weighted, bat_weight, bat_balls, bowl_weighted, bowl_weight, bowl_balls in rows:
+        results[player_name] = {
+            'batting_prs': PRSCalculator.prs_from_totals(bat_weighted, bat_weight) if bat_balls else 0.0,
+            'bowling_prs': PRSCalculator.prs_from_totals(bowl_weighted, bowl_weight) if bowl_balls else 0.0,
+            'batting_deliveries': bat_balls,
+            'bowling_deliveries': bowl_balls,
+            'total_deliveries': bat_balls + bowl_balls
+        }
+    return results
+
+
+def pressure_breakdowns(conn: sqlite3.Connection,
+                        players: Iterable[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Stored per-pressure-level summaries for the given players, read from prm_pressure.
+
+    Returns {player: {'batting': [...], 'bowling': [...]}} with one level_summary() per
+    level the player has balls in, lowest pressure first; {} when the database has no
+    prm_pressure table.
+    """
+    order = {level.name: level.value for level in PressureLevel}
+    players = list(players)
+    breakdowns = {}
+    for start in range(0, len(players), _IN_CHUNK):
+        chunk = players[start:start + _IN_CHUNK]
+        try:
+            rows = conn.execute(f"""
+                SELECT player_name, discipline, level, balls, score_sum, runs, overs
+                FROM prm_pressure
+                WHERE player_name IN ({', '.join('?' * len(chunk))})
+            """, chunk).fetchall()
+        except sqlite3.OperationalError:
+            # No pressure table yet: prm.py has not saved a breakdown to this database
+            return {}
+        for player_name, discipline, *level_row in sorted(rows, key=lambda row: order[row[2]]):
+            breakdown = breakdowns.setdefault(player_name, {'batting': [], 'bowling': []})
+            breakdown[discipline].append(level_summary(discipline, *level_row))
+    return breakdowns
+
+
+def _discipline_totals(stats: DisciplineStats) -> tuple:
+    """(weighted score sum, weight sum, deliveries) for one player's discipline in one match."""
+    return stats.weighted_score_sum, stats.weight_sum, stats.deliveries
+
+
+def _prm_row(player_name, bat_weighted, bat_weight, bat_balls, bowl_weighted, bowl_weight, bowl_balls):
+    # Confidence intervals need per-delivery data, which the partials do not keep
+    return results_row(player_name, {
+        'batting_prs': PRSCalculator.prs_from_totals(bat_weighted, bat_weight) if bat_balls else 0.0,
+        'bowling_prs': PRSCalculator.prs_from_totals(bowl_weighted, bowl_weight) if bowl_balls else 0.0,
+        'batting_deliveries': bat_balls,
+        'bowling_deliveries': bowl_balls
+    })
+
+
+def results_row(player_name: str, stats: Dict[str, Any]) -> tuple:
+    """prm row for one player's calculate_final_scores() entry (PRS of 0 is stored as NULL)."""
+    batting_ci = stats.get('batting_prs_ci') or (None, None)
+    bowling_ci = stats.get('bowling_prs_ci') or (None, None)
+    return (
+        player_name,
+        stats['batting_prs'] if stats['batting_prs'] > 0 else None,
+        stats['bowling_prs'] if stats['bowling_prs'] > 0 else None,
+        stats['batting_deliveries'],
+        stats['bowling_deliveries'],
+        *batting_ci,
+        *bowling_ci
+    )
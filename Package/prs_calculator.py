@@ -2,73 +2,310 @@
 Calculates the final Pressure Resistance Score (PRS) for each player.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
+import numpy as np
+from .pressure_classifier import PressureLevel
+
+
+# Slots in the per-pressure-level arrays: slot i holds PressureLevel(i + 1)
+LEVEL_COUNT = len(PressureLevel)
+
+
+@dataclass
+class DisciplineStats:
+    """Running totals for one player's batting or bowling, kept in constant memory."""
+    deliveries: int = 0
+    weighted_score_sum: float = 0.0
+    weight_sum: float = 0.0
+    score_sum: float = 0.0
+    best: float = float('-inf')
+    worst: float = float('inf')
+    # Second-order sums (Σw², Σw²·s, Σw²·s²) for the analytic PRS confidence interval
+    weight_sq_sum: float = 0.0
+    weight_sq_score_sum: float = 0.0
+    weight_sq_score_sq_sum: float = 0.0
+
+    def add(self, score: float, weight: float):
+        """Add a single scored delivery."""
+        self.deliveries += 1
+        self.weighted_score_sum += score * weight
+        self.weight_sum += weight
+        self.score_sum += score
+        weight_sq = weight * weight
+        self.weight_sq_sum += weight_sq
+        self.weight_sq_score_sum += weight_sq * score
+        self.weight_sq_score_sq_sum += weight_sq * score * score
+        if score > self.best:
+            self.best = score
+        if score < self.worst:
+            self.worst = score
+
+    def merge(self, other: 'DisciplineStats'):
+        """Add another set of totals (e.g. from a later match) to this one."""
+        self.deliveries += other.deliveries
+        self.weighted_score_sum += other.weighted_score_sum
+        self.weight_sum += other.weight_sum
+        self.score_sum += other.score_sum
+        self.best = max(self.best, other.best)
+        self.worst = min(self.worst, other.worst)
+        self.weight_sq_sum += other.weight_sq_sum
+        self.weight_sq_score_sum += other.weight_sq_score_sum
+        self.weight_sq_score_sq_sum += other.weight_sq_score_sq_sum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form of the totals (best/worst are None before the first delivery)."""
+        return {
+            'deliveries': self.deliveries,
+            'weighted_score_sum': self.weighted_score_sum,
+            'weight_sum': self.weight_sum,
+            'score_sum': self.score_sum,
+            'best': self.best if self.deliveries else None,
+            'worst': self.worst if self.deliveries else None,
+            'weight_sq_sum': self.weight_sq_sum,
+            'weight_sq_score_sum': self.weight_sq_score_sum,
+            'weight_sq_score_sq_sum': self.weight_sq_score_sq_sum
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DisciplineStats':
+        stats = cls(data['deliveries'], data['weighted_score_sum'], data['weight_sum'], data['score_sum'])
+        if data['deliveries']:
+            stats.best, stats.worst = data['best'], data['worst']
+        stats.weight_sq_sum = data.get('weight_sq_sum', 0.0)
+        stats.weight_sq_score_sum = data.get('weight_sq_score_sum', 0.0)
+        stats.weight_sq_score_sq_sum = data.get('weight_sq_score_sq_sum', 0.0)
+        return stats
+
+
+@dataclass
+class LevelStats:
+    """Per-pressure-level totals for one player's batting or bowling, as fixed-size arrays.
+
+    runs are the batter's runs when batting and the runs conceded by the bowler (wides and
+    no-balls included, byes and leg byes not) when bowling; overs are the legal balls in
+    overs of their match's length. The summary gives a strike rate or an economy rate
+    for each level.
+    """
+    balls: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_COUNT, dtype=np.int64))
+    score_sums: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_COUNT))
+    runs: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_COUNT, dtype=np.int64))
+    overs: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_COUNT))
+
+    def add(self, balls: np.ndarray, score_sums: np.ndarray, runs: np.ndarray, overs: np.ndarray):
+        """Add per-level totals (one entry per level)."""
+        self.balls += balls
+        self.score_sums += score_sums
+        self.runs += runs
+        self.overs += overs
+
+    def merge(self, other: 'LevelStats'):
+        self.add(other.balls, other.score_sums, other.runs, other.overs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'balls': self.balls.tolist(), 'score_sums': self.score_sums.tolist(), 'runs': self.runs.tolist(),
+                'overs': self.overs.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LevelStats':
+        # Partials written before overs were kept have none
+        overs = np.array(data['overs'], dtype=np.float64) if 'overs' in data else np.zeros(LEVEL_COUNT)
+        return cls(np.array(data['balls'], dtype=np.int64), np.array(data['score_sums'], dtype=np.float64),
+                   np.array(data['runs'], dtype=np.int64), overs)
+
+    def rows(self):
+        """(level name, balls, score sum, runs, overs) for every level with at least one ball."""
+        for level in PressureLevel:
+            slot = level.value - 1
+            if self.balls[slot]:
+                yield (level.name, int(self.balls[slot]), float(self.score_sums[slot]), int(self.runs[slot]),
+                       float(self.overs[slot]))
+
+
+def level_summary(discipline: str, level: str, balls: int, score_sum: float, runs: int,
+                  overs: Optional[float]) -> Dict[str, Any]:
+    """Display form of one pressure level's totals: average score plus strike rate (batting)
+    or economy, runs per over (bowling). Used for both calculator results and stored
+    prm_pressure rows; the economy is None for rows stored before overs were kept."""
+    summary = {
+        'level': level,
+        'balls': balls,
+        'runs': runs,
+        'average_score': round(score_sum / balls, 2) if balls else 0.0
+    }
+    if discipline == 'batting':
+        summary['strike_rate'] = round(100 * runs / balls, 2) if balls else 0.0
+    elif overs is None:
+        summary['economy'] = None
+    else:
+        summary['economy'] = round(runs / overs, 2) if overs else 0.0
+    return summary
 
 
 @dataclass
 class PlayerPerformance:
-    """Stores performance data for a single player."""
+    """Stores performance data for a single player.
+    
+    The batting and bowling totals are always kept; the per-delivery lists are only
+    filled when the calculator was created with track_deliveries=True.
+    """
+    batting: DisciplineStats = field(default_factory=DisciplineStats)
+    bowling: DisciplineStats = field(default_factory=DisciplineStats)
+    batting_levels: LevelStats = field(default_factory=LevelStats)
+    bowling_levels: LevelStats = field(default_factory=LevelStats)
     batting_performances: List[float] = field(default_factory=list)
     bowling_performances: List[float] = field(default_factory=list)
     batting_pressure_weights: List[float] = field(default_factory=list)
     bowling_pressure_weights: List[float] = field(default_factory=list)
 
+    def merge(self, other: 'PlayerPerformance'):
+        """Add another partial performance (e.g. from a later match) to this one."""
+        self.batting.merge(other.batting)
+        self.bowling.merge(other.bowling)
+        self.batting_levels.merge(other.batting_levels)
+        self.bowling_levels.merge(other.bowling_levels)
+        self.batting_performances.extend(other.batting_performances)
+        self.bowling_performances.extend(other.bowling_performances)
+        self.batting_pressure_weights.extend(other.batting_pressure_weights)
+        self.bowling_pressure_weights.extend(other.bowling_pressure_weights)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form; the per-delivery lists are only included when they were tracked."""
+        data = {'batting': self.batting.to_dict(), 'bowling': self.bowling.to_dict(),
+                'batting_levels': self.batting_levels.to_dict(), 'bowling_levels': self.bowling_levels.to_dict()}
+        for name in _DELIVERY_LISTS:
+            if getattr(self, name):
+                data[name] = getattr(self, name)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PlayerPerformance':
+        return cls(
+            DisciplineStats.from_dict(data['batting']),
+            DisciplineStats.from_dict(data['bowling']),
+            *(LevelStats.from_dict(data[name]) if name in data else LevelStats()
+              for name in ('batting_levels', 'bowling_levels')),
+            *(list(data.get(name, [])) for name in _DELIVERY_LISTS)
+        )
+
+
+_DELIVERY_LISTS = ('batting_performances', 'bowling_performances',
+                   'batting_pressure_weights', 'bowling_pressure_weights')
+
 
 class PRSCalculator:
     """Calculates Pressure Resistance Scores for all players."""
     
-    def __init__(self):
+    def __init__(self, track_deliveries: bool = False):
         self.players: Dict[str, PlayerPerformance] = defaultdict(PlayerPerformance)
+        self.track_deliveries = track_deliveries
         
     def add_delivery_performance(self, batsman: str, bowler: str, 
                                batting_score: float, bowling_score: float,
                                pressure_weight: float):
         """Add performance data for a single delivery."""
-        # Add batting performance
-        self.players[batsman].batting_performances.append(batting_score)
-        self.players[batsman].batting_pressure_weights.append(pressure_weight)
+        batter = self.players[batsman]
+        batter.batting.add(batting_score, pressure_weight)
         
-        # Add bowling performance
-        self.players[bowler].bowling_performances.append(bowling_score)
-        self.players[bowler].bowling_pressure_weights.append(pressure_weight)
+        bowler_performance = self.players[bowler]
+        bowler_performance.bowling.add(bowling_score, pressure_weight)
+        
+        # Keep the individual deliveries only when asked to
+        if self.track_deliveries:
+            batter.batting_performances.append(batting_score)
+            batter.batting_pressure_weights.append(pressure_weight)
+            bowler_performance.bowling_performances.append(bowling_score)
+            bowler_performance.bowling_pressure_weights.append(pressure_weight)
+    
+    def add_level_totals(self, discipline: str, players: List[str], levels: np.ndarray,
+                         scores: np.ndarray, runs: np.ndarray, overs: np.ndarray):
+        """Add a batch of deliveries (e.g. one innings) to the players' per-level totals.
+
+        players names the batter or bowler of each delivery; levels holds PressureLevel
+        values 1-5; overs is each delivery's share of an over (0 for wides and no-balls).
+        The batch is grouped with np.bincount, so the Python work is per player in the
+        batch rather than per ball.
+        """
+        names, player_index = np.unique(np.asarray(players), return_inverse=True)
+        slots = player_index * LEVEL_COUNT + (np.asarray(levels) - 1)
+        size = len(names) * LEVEL_COUNT
+        balls = np.bincount(slots, minlength=size).reshape(-1, LEVEL_COUNT)
+        score_sums = np.bincount(slots, weights=scores, minlength=size).reshape(-1, LEVEL_COUNT)
+        run_sums = np.bincount(slots, weights=runs, minlength=size).astype(np.int64).reshape(-1, LEVEL_COUNT)
+        over_sums = np.bincount(slots, weights=overs, minlength=size).reshape(-1, LEVEL_COUNT)
+
+        for player_name, player_balls, player_scores, player_runs, player_overs in zip(
+                names.tolist(), balls, score_sums, run_sums, over_sums):
+            getattr(self.players[player_name], f'{discipline}_levels').add(player_balls, player_scores,
+                                                                           player_runs, player_overs)
+
+    def pressure_breakdown(self, player_name: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Per-pressure-level summaries for a player: {'batting': [...], 'bowling': [...]}."""
+        if player_name not in self.players:
+            return {}
+        performance = self.players[player_name]
+        return {
+            discipline: [level_summary(discipline, *row) for row in getattr(performance, f'{discipline}_levels').rows()]
+            for discipline in ('batting', 'bowling')
+        }
+
+    def pressure_rows(self):
+        """prm_pressure rows: (player, discipline, level name, balls, score sum, runs, overs)."""
+        for player_name, performance in self.players.items():
+            for discipline in ('batting', 'bowling'):
+                for level_row in getattr(performance, f'{discipline}_levels').rows():
+                    yield (player_name, discipline, *level_row)
+
+    def merge(self, partials: Dict[str, PlayerPerformance]):
+        """Merge per-player partial performances, e.g. the result of a single match."""
+        for player_name, performance in partials.items():
+            self.players[player_name].merge(performance)
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Per-player partial aggregates, ready to be written as JSON and merged elsewhere."""
+        return {player_name: performance.to_dict() for player_name, performance in self.players.items()}
+    
+    @staticmethod
+    def partials_from_dict(data: Dict[str, Dict[str, Any]]) -> Dict[str, PlayerPerformance]:
+        """Inverse of to_dict(); the result can be passed straight to merge()."""
+        return {player_name: PlayerPerformance.from_dict(performance) for player_name, performance in data.items()}
     
     def calculate_final_scores(self) -> Dict[str, Dict[str, Any]]:
         """Calculate final PRS scores for all players."""
-        results = {}
+        return dict(self.iter_final_scores())
+    
+    def iter_final_scores(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (player_name, scores) one player at a time, in calculator order.
         
+        Each player's scores are computed as they are requested, so a consumer that
+        writes them out never holds more than one player's results.
+        """
         for player_name, performance in self.players.items():
-            batting_prs = self._calculate_prs(
-                performance.batting_performances,
-                performance.batting_pressure_weights
-            )
-            
-            bowling_prs = self._calculate_prs(
-                performance.bowling_performances,
-                performance.bowling_pressure_weights
-            )
-            
-            results[player_name] = {
-                'batting_prs': batting_prs,
-                'bowling_prs': bowling_prs,
-                'batting_deliveries': len(performance.batting_performances),
-                'bowling_deliveries': len(performance.bowling_performances),
-                'total_deliveries': len(performance.batting_performances) + len(performance.bowling_performances)
-            }
-        
-        return results
+            yield player_name, self._final_scores(performance)
+    
+    def _final_scores(self, performance: PlayerPerformance) -> Dict[str, Any]:
+        """Final scores for one player."""
+        batting, bowling = performance.batting, performance.bowling
+        return {
+            'batting_prs': self._calculate_prs(batting),
+            'bowling_prs': self._calculate_prs(bowling),
+            'batting_deliveries': batting.deliveries,
+            'bowling_deliveries': bowling.deliveries,
+            'total_deliveries': batting.deliveries + bowling.deliveries
+        }
     
-    def _calculate_prs(self, performances: List[float], pressure_weights: List[float]) -> float:
+    def _calculate_prs(self, stats: DisciplineStats) -> float:
         """Calculate PRS for a specific discipline (batting or bowling)."""
-        if not performances:
+        if not stats.deliveries:
             return 0.0
         
-        # Calculate weighted average performance
-        total_weighted_score = sum(score * weight for score, weight in zip(performances, pressure_weights))
-        total_weight = sum(pressure_weights)
-        
-        if total_weight == 0:
+        return self.prs_from_totals(stats.weighted_score_sum, stats.weight_sum)
+    
+    @staticmethod
+    def prs_from_totals(total_weighted_score: float, total_weight: float) -> float:
+        """Calculate PRS from the pressure-weighted score sum and the weight sum."""
+        if not total_weight:
             return 0.0
         
         weighted_average = total_weighted_score / total_weight
@@ -87,24 +324,14 @@ class PRSCalculator:
         
         performance = self.players[player_name]
         
-        batting_stats = self._get_discipline_stats(
-            performance.batting_performances,
-            performance.batting_pressure_weights
-        )
-        
-        bowling_stats = self._get_discipline_stats(
-            performance.bowling_performances,
-            performance.bowling_pressure_weights
-        )
-        
         return {
-            'batting': batting_stats,
-            'bowling': bowling_stats
+            'batting': self._get_discipline_stats(performance.batting),
+            'bowling': self._get_discipline_stats(performance.bowling)
         }
     
-    def _get_discipline_stats(self, performances: List[float], weights: List[float]) -> Dict[str, Any]:
+    def _get_discipline_stats(self, stats: DisciplineStats) -> Dict[str, Any]:
         """Get detailed statistics for a discipline (batting/bowling)."""
-        if not performances:
+        if not stats.deliveries:
             return {
                 'deliveries': 0,
                 'average_score': 0.0,
@@ -114,14 +341,14 @@ class PRSCalculator:
                 'pressure_adjusted_score': 0.0
             }
         
-        average_score = sum(performances) / len(performances)
-        weighted_average = sum(p * w for p, w in zip(performances, weights)) / sum(weights) if weights else 0
+        average_score = stats.score_sum / stats.deliveries
+        weighted_average = stats.weighted_score_sum / stats.weight_sum if stats.weight_sum else 0
         
         return {
-            'deliveries': len(performances),
+            'deliveries': stats.deliveries,
             'average_score': round(average_score, 2),
             'weighted_average': round(weighted_average, 2),
-            'best_performance': round(max(performances), 2),
-            'worst_performance': round(min(performances), 2),
-            'average_pressure': round(sum(weights) / len(weights), 2) if weights else 0
-        }
\ No newline at end of file
+            'best_performance': round(stats.best, 2),
+            'worst_performance': round(stats.worst, 2),
+            'average_pressure': round(stats.weight_sum / stats.deliveries, 2)
+        }
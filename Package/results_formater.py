@@ -3,103 +3,85 @@ Formats and displays the final PRS results in various formats.
 """
 
 import sys
+import csv
 import json
-import sqlite3
-from typing import Dict, Any, Optional, List
+import heapq
+from itertools import islice
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple
 
 
-class ResultsFormatter:
-    """Formats PRS results for display."""
-    @staticmethod
-    def add_data(data):
-        conn = sqlite3.connect("database.db")
-        cursor = conn.cursor()
+def _overall_key(item):
+    _, stats = item
+    # Combine batting and bowling PRS, giving equal weight
+    batting_score = stats['batting_prs'] if stats['batting_deliveries'] > 0 else 0
+    bowling_score = stats['bowling_prs'] if stats['bowling_deliveries'] > 0 else 0
+    
+    # Weight by the number of deliveries to favor players with more data
+    total_deliveries = stats['total_deliveries']
+    weighted_score = (batting_score + bowling_score) * (1 + min(total_deliveries / 100, 1))
+    
+    return weighted_score
 
-        
-        try:
-            cursor.execute('''
-                INSERT INTO prm (
-                    player_name,batting_prs,bowling_prs,bat_balls,bowl_balls
-                ) VALUES (?, ?, ?, ?, ? )
-            ''', (
-                data[0], data[1], data[2], data[3], data[4]
-            ))
-            conn.commit()
-        except sqlite3.OperationalError as e:
-            if "no such table" in str(e):
-                print("Table not found, creating one...")
-                cursor.execute('''
-                    CREATE TABLE prm (
-                        player_name TEXT,
-                        batting_prs INTEGER,
-                        bowling_prs INTEGER,
-                        bat_balls INTEGER,
-                        bowl_balls INTEGER,
-                        PRIMARY KEY (player_name)
-                    )
-                ''')
-                conn.commit()
 
-                # retry the insert
-                cursor.execute('''
-                    INSERT INTO prm (
-                        player_name,batting_prs,bowling_prs,bat_balls,bowl_balls
-                    ) VALUES (?, ?, ?, ?, ? )
-                ''', (
-                    data[0], data[1], data[2], data[3], data[4]
-                ))
-                conn.commit()
-            else:
-                print("Error inserting:", e)
-                conn.rollback()
-        finally:
-            conn.close()
-    
-    def print_table_results(self, results: Dict[str, Dict[str, Any]], top_n: Optional[int] = None):
+# Orderings for --sort, highest first: name -> key on a (player_name, stats) item
+SORT_KEYS = {
+    'overall': _overall_key,
+    'batting': lambda item: item[1]['batting_prs'],
+    'bowling': lambda item: item[1]['bowling_prs'],
+    'deliveries': lambda item: item[1]['total_deliveries']
+}
+
+# Formats written one player at a time
+STREAM_FORMATS = ('ndjson', 'csv')
+
+# Columns of the csv format; the intervals are split into low/high columns
+CSV_COLUMNS = ('player_name', 'batting_prs', 'bowling_prs', 'batting_deliveries', 'bowling_deliveries',
+               'total_deliveries', 'batting_prs_low', 'batting_prs_high', 'bowling_prs_low', 'bowling_prs_high')
+
+
+class ResultsFormatter:
+    """Formats PRS results for display."""
+    def print_table_results(self, results: Dict[str, Dict[str, Any]], top_n: Optional[int] = None,
+                            sort: str = 'overall'):
         """Print results in a formatted table."""
         # Sort players by total performance (batting + bowling PRS)
-        sorted_players = self._sort_players_by_performance(results)
-        
-        if top_n:
-            sorted_players = sorted_players[:top_n]
+        sorted_players = self._sort_players_by_performance(results, top_n, sort)
         
-        # Print header
-        print("=" * 80)
+        # Print header; the rules are as wide as the columns, interval columns included
+        with_intervals = any('batting_prs_ci' in stats for _, stats in sorted_players)
+        interval_header = f" {'Batting CI':<14} {'Bowling CI':<14}" if with_intervals else ''
+        header = (f"{'Name':<25} {'Batting PRS':<12} {'Bowling PRS':<12} {'Bat Balls':<10} {'Bowl Balls':<10}"
+                  f"{interval_header}")
+        width = max(80, len(header))
+        print("=" * width)
         print("PRESSURE RESISTANCE SCORE (PRS) ANALYSIS")
-        print("=" * 80)
-        print(f"{'Name':<25} {'Batting PRS':<12} {'Bowling PRS':<12} {'Bat Balls':<10} {'Bowl Balls':<10}")
-        print("-" * 80)
+        print("=" * width)
+        print(header)
+        print("-" * width)
         
         for player_name, stats in sorted_players:
             batting_prs = f"{stats['batting_prs']:.1f}" if stats['batting_prs'] > 0 else "N/A"
             bowling_prs = f"{stats['bowling_prs']:.1f}" if stats['bowling_prs'] > 0 else "N/A"
+            batting_ci = stats.get('batting_prs_ci') or (None, None)
+            bowling_ci = stats.get('bowling_prs_ci') or (None, None)
             
-            data = [
-                player_name,
-                stats['batting_prs'] if stats['batting_prs'] > 0 else None,
-                stats['bowling_prs'] if stats['bowling_prs'] > 0 else None,
-                stats['batting_deliveries'],
-                stats['bowling_deliveries']
-            ]
-
-            ResultsFormatter.add_data(data)
-
+            intervals = ''
+            if with_intervals:
+                intervals = f" {self._format_interval(batting_ci):<14} {self._format_interval(bowling_ci):<14}"
             print(f"{player_name:<25} {batting_prs:<12} {bowling_prs:<12} "
-                  f"{stats['batting_deliveries']:<10} {stats['bowling_deliveries']:<10}")
+                  f"{stats['batting_deliveries']:<10} {stats['bowling_deliveries']:<10}{intervals}")
         
-        print("-" * 80)
+        print("-" * width)
         print(f"Total players analyzed: {len(results)}")
         
         if top_n:
             print(f"Showing top {min(top_n, len(results))} performers")
     
     def print_detailed_results(self, results: Dict[str, Dict[str, Any]], 
-                             top_n: Optional[int] = None, include_match_details: bool = False):
+                             top_n: Optional[int] = None, include_match_details: bool = False,
+                             sort: str = 'overall'):
         """Print detailed results with additional statistics."""
-        sorted_players = self._sort_players_by_performance(results)
-        
-        if top_n:
-            sorted_players = sorted_players[:top_n]
+        sorted_players = self._sort_players_by_performance(results, top_n, sort)
         
         print("=" * 100)
         print("DETAILED PRESSURE RESISTANCE SCORE (PRS) ANALYSIS")
@@ -112,6 +94,8 @@ class ResultsFormatter:
             # Batting stats
             if stats['batting_deliveries'] > 0:
                 print(f"  Batting PRS: {stats['batting_prs']:.1f}")
+                if stats.get('batting_prs_ci'):
+                    print(f"  Batting PRS interval: {self._format_interval(stats['batting_prs_ci'])}")
                 print(f"  Batting deliveries: {stats['batting_deliveries']}")
             else:
                 print("  Batting: No data")
@@ -119,6 +103,8 @@ class ResultsFormatter:
             # Bowling stats
             if stats['bowling_deliveries'] > 0:
                 print(f"  Bowling PRS: {stats['bowling_prs']:.1f}")
+                if stats.get('bowling_prs_ci'):
+                    print(f"  Bowling PRS interval: {self._format_interval(stats['bowling_prs_ci'])}")
                 print(f"  Bowling deliveries: {stats['bowling_deliveries']}")
             else:
                 print("  Bowling: No data")
@@ -134,21 +120,56 @@ class ResultsFormatter:
         """Print results in JSON format."""
         print(json.dumps(results, indent=2))
     
-    def _sort_players_by_performance(self, results: Dict[str, Dict[str, Any]]) -> List[tuple]:
-        """Sort players by their overall performance."""
-        def sort_key(item):
-            _, stats = item
-            # Combine batting and bowling PRS, giving equal weight
-            batting_score = stats['batting_prs'] if stats['batting_deliveries'] > 0 else 0
-            bowling_score = stats['bowling_prs'] if stats['bowling_deliveries'] > 0 else 0
-            
-            # Weight by the number of deliveries to favor players with more data
-            total_deliveries = stats['total_deliveries']
-            weighted_score = (batting_score + bowling_score) * (1 + min(total_deliveries / 100, 1))
-            
-            return weighted_score
-        
-        return sorted(results.items(), key=sort_key, reverse=True)
+    def stream_results(self, players: Iterable[Tuple[str, Dict[str, Any]]], format_type: str,
+                       out=None) -> int:
+        """Write (player_name, stats) pairs one line at a time as ndjson or csv.
+
+        Nothing is collected first, so output starts with the first player. Writes to
+        sys.stdout unless out is given and returns the number of players written.
+        """
+        out = out or sys.stdout
+        count = 0
+        if format_type == 'ndjson':
+            for player_name, stats in players:
+                out.write(json.dumps({'player_name': player_name, **stats}) + '\n')
+                count += 1
+        elif format_type == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(CSV_COLUMNS)
+            for player_name, stats in players:
+                batting_ci = stats.get('batting_prs_ci') or (None, None)
+                bowling_ci = stats.get('bowling_prs_ci') or (None, None)
+                writer.writerow((player_name, stats['batting_prs'], stats['bowling_prs'],
+                                 stats['batting_deliveries'], stats['bowling_deliveries'],
+                                 stats['total_deliveries'], *batting_ci, *bowling_ci))
+                count += 1
+        else:
+            raise ValueError(f"Not a streaming format: {format_type}")
+        return count
+    
+    def select_players(self, players: Iterable[Tuple[str, Dict[str, Any]]], sort: Optional[str] = None,
+                       top_n: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Order and cut (player_name, stats) pairs for output.
+
+        With sort and top_n only the best top_n are kept, in a bounded heap; with sort alone
+        every player is sorted; without sort the pairs pass through lazily (the first top_n).
+        """
+        if sort:
+            key = SORT_KEYS[sort]
+            if top_n:
+                return iter(heapq.nlargest(top_n, players, key=key))
+            return iter(sorted(players, key=key, reverse=True))
+        return islice(players, top_n) if top_n else iter(players)
+    
+    def _sort_players_by_performance(self, results: Dict[str, Dict[str, Any]], top_n: Optional[int] = None,
+                                     sort: str = 'overall') -> List[tuple]:
+        """Sort players by their overall performance (or another SORT_KEYS order), best top_n only."""
+        return list(self.select_players(results.items(), sort, top_n))
+    
+    def _format_interval(self, interval) -> str:
+        """Format a [low, high] PRS interval, or N/A when there is none."""
+        low, high = interval
+        return f"[{low:.1f}, {high:.1f}]" if low is not None else "N/A"
     
     def _get_performance_level(self, prs_score: float) -> str:
         """Get performance level description based on PRS score."""
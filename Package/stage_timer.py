@@ -0,0 +1,231 @@
+"""
+Per-stage wall/CPU timing (and optionally tracemalloc memory) for the pipelines,
+with a no-op stand-in for unprofiled runs.
+"""
+
+import sys
+import json
+import heapq
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class StageTimer:
+    """Accumulates wall and CPU seconds per named stage, plus per-file throughput.
+
+    Stages are timed with `with timer.stage('classify'): ...`. Completed files are
+    reported with file_done(), which keeps only the `slowest` slowest files in a
+    bounded heap. A timer filled in a worker process is shipped back with drain()
+    and added to the parent's with merge().
+
+    Stages may nest (ingest.py's 'ingest' wraps load, yaml and parse). Shares are
+    taken against the time of the top-level calls only, so nested time is not counted
+    twice; a stage only ever timed inside another is reported as nested.
+
+    With memory=True, tracemalloc also records per stage the peak of traced memory
+    while it ran, how far that peak rose above the memory at its start, and the bytes
+    still allocated when it returned (retained, summed over calls; memory freed later
+    by other code is not subtracted). The tracemalloc peak is reset at every stage
+    boundary; enclosing stages carry the peaks of the stages nested in them.
+    """
+    enabled = True
+
+    def __init__(self, slowest: int = 10, memory: bool = False, top_allocations: int = 10):
+        self.slowest = slowest
+        self.memory = memory
+        self.top_allocations = top_allocations
+        # name -> [wall seconds, cpu seconds, calls, peak bytes, peak increase bytes, retained bytes,
+        #          wall seconds of the calls not nested in another stage]
+        self.stages: Dict[str, List[float]] = {}
+        self._depth = 0  # stages currently open
+        self.files = 0
+        self.balls = 0
+        self._slowest: List[Tuple[float, str, int]] = []  # min-heap of (seconds, file, balls)
+        self._open: List[List[int]] = []  # [memory at start, highest peak so far] of each open stage
+        self._peak = 0
+        self._worker_peak = 0
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one call of the named stage."""
+        memory = self._enter_memory() if self.memory else None
+        top_level = self._depth == 0
+        self._depth += 1
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            totals = self.stages.setdefault(name, [0.0, 0.0, 0, 0, 0, 0, 0.0])
+            elapsed = time.perf_counter() - wall
+            totals[0] += elapsed
+            totals[1] += time.process_time() - cpu
+            totals[2] += 1
+            if top_level:
+                totals[6] += elapsed
+            if memory is not None:
+                started, peak, retained = self._exit_memory(memory)
+                totals[3] = max(totals[3], peak)
+                totals[4] = max(totals[4], peak - started)
+                totals[5] += retained
+
+    def _enter_memory(self) -> List[int]:
+        current, peak = tracemalloc.get_traced_memory()
+        if self._open:
+            self._open[-1][1] = max(self._open[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        self._open.append(frame)
+        return frame
+
+    def _exit_memory(self, frame: List[int]) -> Tuple[int, int, int]:
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame[1])
+        self._open.pop()
+        if self._open:
+            self._open[-1][1] = max(self._open[-1][1], peak)
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+        return frame[0], peak, current - frame[0]
+
+    def file_done(self, file: str, seconds: float, balls: int):
+        """Record one analyzed file (or stored match) and the deliveries it held."""
+        self.files += 1
+        self.balls += balls
+        self._keep_if_slow((seconds, file, balls))
+
+    def _keep_if_slow(self, entry: Tuple[float, str, int]):
+        if len(self._slowest) < self.slowest:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def drain(self) -> Dict[str, Any]:
+        """Return everything recorded since the last drain() and start again from zero."""
+        snapshot = {'stages': self.stages, 'files': self.files, 'balls': self.balls, 'slowest': self._slowest,
+                    'peak': self._peak}
+        self.stages, self.files, self.balls, self._slowest, self._peak = {}, 0, 0, [], 0
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        """Add a drain() snapshot, e.g. from a worker process."""
+        if not snapshot:
+            return
+        for name, (wall, cpu, calls, peak, increase, retained, top_level) in snapshot['stages'].items():
+            totals = self.stages.setdefault(name, [0.0, 0.0, 0, 0, 0, 0, 0.0])
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += calls
+            totals[3] = max(totals[3], peak)
+            totals[4] = max(totals[4], increase)
+            totals[5] += retained
+            totals[6] += top_level
+        # Workers trace their own heap: their peak is reported apart from this process's
+        self._worker_peak = max(self._worker_peak, snapshot['peak'])
+        self.files += snapshot['files']
+        self.balls += snapshot['balls']
+        for entry in snapshot['slowest']:
+            self._keep_if_slow(tuple(entry))
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-ready report: totals, throughput, per-stage times and the slowest files,
+        plus per-stage memory and the top allocation sites when tracing memory."""
+        wall = time.perf_counter() - self._started_wall
+        # Nested stages are already inside their parents' time
+        stage_wall = sum(totals[6] for totals in self.stages.values())
+        report = {
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(time.process_time() - self._started_cpu, 4),
+            'files': self.files,
+            'balls': self.balls,
+            'files_per_sec': round(self.files / wall, 1) if wall > 0 else 0.0,
+            'balls_per_sec': round(self.balls / wall, 1) if wall > 0 else 0.0,
+            'stages': {
+                name: {
+                    'wall_seconds': round(stage_wall_seconds, 4),
+                    'cpu_seconds': round(cpu, 4),
+                    'calls': calls,
+                    'share': round(stage_wall_seconds / stage_wall, 4) if stage_wall > 0 else 0.0,
+                    'nested': not top_level
+                }
+                for name, (stage_wall_seconds, cpu, calls, *_, top_level) in sorted(
+                    self.stages.items(), key=lambda item: item[1][0], reverse=True)
+            },
+            'slowest_files': [
+                {'file': file, 'seconds': round(seconds, 4), 'balls': balls}
+                for seconds, file, balls in sorted(self._slowest, reverse=True)
+            ]
+        }
+        if self.memory:
+            for name, stage in report['stages'].items():
+                peak, increase, retained = self.stages[name][3:6]
+                stage.update(peak_mb=_mb(peak), peak_increase_mb=_mb(increase), retained_mb=_mb(retained))
+            report['memory'] = self._memory_report()
+        return report
+
+    def _memory_report(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ))
+        memory = {
+            'peak_mb': _mb(peak),
+            'retained_mb': _mb(current),
+            'peak_bytes_per_delivery': round(peak / self.balls, 1) if self.balls else None,
+            'retained_bytes_per_delivery': round(current / self.balls, 1) if self.balls else None,
+            'top_allocations': [
+                {'site': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                 'size_mb': _mb(stat.size), 'blocks': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top_allocations]
+            ]
+        }
+        if self._worker_peak:
+            memory['worker_peak_mb'] = _mb(self._worker_peak)
+        return memory
+
+
+def write_report(report: Dict[str, Any], destination: str):
+    """Write a report() as JSON to a file, or to stderr for '-'."""
+    text = json.dumps(report, indent=2)
+    if destination == '-':
+        print(text, file=sys.stderr)
+        return
+    with open(destination, 'w', encoding='utf-8') as file:
+        file.write(text + '\n')
+    print(f"Wrote profile to {destination}", file=sys.stderr)
+
+
+def _mb(size: int) -> float:
+    return round(size / (1024 * 1024), 3)
+
+
+class _NullTimer:
+    """StageTimer stand-in used when profiling is off: every call is a no-op."""
+    enabled = False
+    memory = False
+    _context = nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+    def file_done(self, file: str, seconds: float, balls: int):
+        pass
+
+    def drain(self) -> None:
+        return None
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        pass
+
+
+NULL_TIMER = _NullTimer()
@@ -0,0 +1,401 @@
+"""
+Generates synthetic Cricsheet-format match files calibrated from a real corpus, for load and memory testing.
+"""
+
+import json
+import hashlib
+import bisect
+from collections import Counter, defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import yaml
+from .match_loader import MatchLoader
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
+
+# Bump when the calibration format changes, so stale profile files are rebuilt
+PROFILE_VERSION = 1
+
+# Extras that do not count as a legal delivery of the over
+ILLEGAL_EXTRAS = ('wides', 'noballs')
+
+
+class _Dumper(SafeDumper):
+    """Writes repeated objects (the match date in meta and info) in full instead of as anchors."""
+
+    def ignore_aliases(self, data):
+        return True
+
+
+class CorpusProfile:
+    """Distributions measured from a real corpus that the generator samples from.
+
+    Per over of the innings it keeps the joint frequency of every delivery outcome seen
+    there, as (batter runs, extras, wicket kind), so run rates, extras and wicket rates
+    follow the real corpus phase by phase. Per season it keeps the match dates and each
+    team's player pool with appearance counts, so squads mix players of one era, and
+    per player the mean batting position, balls bowled per
+    appearance and stumpings, which decide who bats where, who bowls and who keeps.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        # Outcome sampling tables: per over, the cumulative probabilities over data['outcomes']
+        self.cumulative = [np.cumsum(counts) / sum(counts) for counts in data['over_counts']]
+        # Seasons with at least two teams, and their weights by number of matches
+        self.seasons = sorted(season for season, entry in data['seasons'].items() if len(entry['teams']) > 1)
+        self.season_weights = [len(data['seasons'][season]['dates']) for season in self.seasons]
+
+    @classmethod
+    def calibrate(cls, yaml_files: List[str], loader: Optional[MatchLoader] = None) -> 'CorpusProfile':
+        """Measure the profile from match files (through the parsed-match cache)."""
+        loader = loader or MatchLoader()
+        outcomes: Dict[Tuple, int] = {}
+        over_counts: List[Counter] = []
+        seasons: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'dates': [], 'teams': defaultdict(Counter)})
+        appearances: Counter = Counter()
+        positions: Dict[str, List[int]] = defaultdict(list)
+        balls_bowled: Counter = Counter()
+        stumpings: Counter = Counter()
+        venues: Counter = Counter()
+        umpires: Counter = Counter()
+        registry: Dict[str, str] = {}
+        run_outs = [0, 0]  # [striker out, non-striker out]
+        toss = [0, 0]      # [bat, field]
+        first = None
+
+        for yaml_file in yaml_files:
+            match = loader.load(yaml_file)
+            info = match['info']
+            if first is None:
+                first = info
+            match_date = str(info.get('dates', [''])[0])
+            season = seasons[match_date[:4]]
+            season['dates'].append(match_date)
+            for team, players in info.get('players', {}).items():
+                season['teams'][team].update(players)
+                appearances.update(players)
+            registry.update(info.get('registry', {}).get('people', {}))
+            venues[(info.get('venue'), info.get('city'))] += 1
+            umpires.update(info.get('umpires', []))
+            toss[info.get('toss', {}).get('decision') == 'field'] += 1
+
+            # Super overs (innings 3+) follow different patterns and are left out
+            for innings in match['innings'][:2]:
+                batters: List[str] = []
+                for delivery in innings['deliveries']:
+                    for batter in (delivery['batsman'], delivery['non_striker']):
+                        if batter not in batters:
+                            batters.append(batter)
+                            positions[batter].append(len(batters))
+                    balls_bowled[delivery['bowler']] += 1
+
+                    wicket = delivery['wicket']
+                    kind = wicket['kind'] if wicket else None
+                    if kind == 'run out':
+                        run_outs[wicket['player_out'] != delivery['batsman']] += 1
+                    elif kind == 'stumped':
+                        stumpings.update(wicket.get('fielders', [])[:1])
+                    extras = tuple(sorted((delivery['extras'] or {}).items()))
+                    outcome = (delivery['runs'].get('batsman', 0), extras, kind)
+                    index = outcomes.setdefault(outcome, len(outcomes))
+                    while len(over_counts) <= delivery['over']:
+                        over_counts.append(Counter())
+                    over_counts[delivery['over']][index] += 1
+
+        if first is None:
+            raise ValueError("No matches to calibrate from")
+
+        return cls({
+            'version': PROFILE_VERSION,
+            'matches': len(yaml_files),
+            'info': {key: first.get(key) for key in ('competition', 'gender', 'match_type', 'overs', 'balls_per_over')},
+            'outcomes': [[runs, dict(extras), kind] for (runs, extras, kind) in outcomes],
+            'over_counts': [[counts.get(index, 0) for index in range(len(outcomes))] for counts in over_counts],
+            'seasons': {name: {'dates': sorted(season['dates']),
+                               'teams': {team: dict(pool) for team, pool in season['teams'].items()}}
+                        for name, season in seasons.items()},
+            'batting_position': {name: sum(seen) / len(seen) for name, seen in positions.items()},
+            'bowling_rate': {name: balls / appearances[name] for name, balls in balls_bowled.items() if appearances[name]},
+            'stumpings': dict(stumpings),
+            'venues': [[venue, city, count] for (venue, city), count in venues.items()],
+            'umpires': dict(umpires),
+            'registry': registry,
+            'run_out_non_striker': run_outs[1] / max(sum(run_outs), 1),
+            'toss_field': toss[1] / max(sum(toss), 1)
+        })
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.data, file)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['CorpusProfile']:
+        """Read a saved profile; None when the file is missing or from another PROFILE_VERSION."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        return cls(data) if data.get('version') == PROFILE_VERSION else None
+
+
+class MatchGenerator:
+    """Builds matches from a CorpusProfile, each drawn from its own (seed, index) random stream.
+
+    A match depends only on the seed and its index, so a corpus is the same whatever the
+    worker count, and the first N matches of a larger corpus equal a corpus of N.
+    """
+
+    def __init__(self, profile: CorpusProfile):
+        self.profile = profile
+        data = profile.data
+        self.info = data['info']
+        self.overs = self.info.get('overs') or 20
+        self.balls_per_over = self.info.get('balls_per_over') or 6
+        self.outcomes = data['outcomes']
+        self._scalars: Dict[str, str] = {}
+
+    def generate(self, seed: int, index: int) -> Dict[str, Any]:
+        """One match as the Cricsheet structure (the document a match YAML file holds)."""
+        data = self.profile.data
+        rng = np.random.default_rng([seed, index])
+
+        season = data['seasons'][self.profile.seasons[self._weighted(rng, self.profile.season_weights)]]
+        season_teams = sorted(season['teams'])
+        teams = [season_teams[i] for i in rng.choice(len(season_teams), 2, replace=False)]
+        squads = {team: self._pick_squad(rng, season['teams'][team]) for team in teams}
+        toss_winner = teams[int(rng.integers(2))]
+        decision = 'field' if rng.random() < data['toss_field'] else 'bat'
+        batting_first = toss_winner if decision == 'bat' else next(team for team in teams if team != toss_winner)
+        order = [batting_first, next(team for team in teams if team != batting_first)]
+
+        innings, totals = [], []
+        for number, batting in enumerate(order):
+            fielding = order[1 - number]
+            target = totals[0][0] + 1 if number == 1 else None
+            deliveries, total, wickets, figures = self._play_innings(rng, squads[batting], squads[fielding], target)
+            innings.append({f"{'1st' if number == 0 else '2nd'} innings": {'team': batting, 'deliveries': deliveries}})
+            totals.append((total, wickets, figures))
+
+        (first_total, _, first_figures), (second_total, second_wickets, second_figures) = totals
+        if second_total > first_total:
+            winner, margin = order[1], {'wickets': 10 - second_wickets}
+        elif second_total < first_total:
+            winner, margin = order[0], {'runs': first_total - second_total}
+        else:
+            winner, margin = None, None
+        outcome = {'winner': winner, 'by': margin} if winner else {'result': 'tie'}
+        figures = first_figures + second_figures
+        candidates = [entry for entry in figures if entry[2] in squads.get(winner, ())] or figures
+
+        venue, city, _ = data['venues'][self._weighted(rng, [count for *_, count in data['venues']])]
+        umpire_pool = sorted(data['umpires'])
+        umpires = [umpire_pool[i] for i in rng.choice(len(umpire_pool), 2, replace=False)]
+        match_date = date.fromisoformat(season['dates'][int(rng.integers(len(season['dates'])))][:10])
+        people = sorted({name for squad in squads.values() for name in squad} | set(umpires))
+
+        info = {
+            'balls_per_over': self.balls_per_over,
+            'competition': self.info.get('competition'),
+            'dates': [match_date],
+            'gender': self.info.get('gender'),
+            'match_type': self.info.get('match_type'),
+            'outcome': outcome,
+            'overs': self.overs,
+            'player_of_match': [max(candidates)[2]],
+            'players': {team: squads[team] for team in teams},
+            'registry': {'people': {name: data['registry'].get(name, _person_id(name))
+                                    for name in people}},
+            'teams': teams,
+            'toss': {'decision': decision, 'winner': toss_winner},
+            'umpires': umpires,
+            'venue': venue
+        }
+        if city:
+            info['city'] = city
+        return {
+            'meta': {'data_version': 0.91, 'created': match_date, 'revision': 1},
+            'info': {key: value for key, value in info.items() if value is not None},
+            'innings': innings
+        }
+
+    def _pick_squad(self, rng: np.random.Generator, pool: Dict[str, int]) -> List[str]:
+        """Eleven players drawn from a team's season pool by appearances, in batting order."""
+        names = sorted(pool)
+        weights = np.array([pool[name] for name in names], dtype=float)
+        size = min(11, len(names))
+        squad = [names[i] for i in rng.choice(len(names), size, replace=False, p=weights / weights.sum())]
+        positions = self.profile.data['batting_position']
+        jitter = rng.normal(0.0, 1.0, size)
+        return [name for _, name in sorted(zip((positions.get(name, 11.0) + noise for name, noise in zip(squad, jitter)), squad))]
+
+    def _play_innings(self, rng: np.random.Generator, batting: List[str], fielding: List[str],
+                      target: Optional[int]) -> Tuple[List[Dict], int, int, List[Tuple[int, int, str]]]:
+        """Ball-by-ball innings; returns (deliveries, total, wickets, [(runs, wickets, player)])."""
+        data = self.profile.data
+        bowlers = self._bowling_plan(rng, fielding)
+        stumpings = data['stumpings']
+        # The fielder with the most stumpings keeps wicket, preferably one who does not bowl
+        keeper = max(fielding, key=lambda name: (stumpings.get(name, 0), name not in bowlers))
+        striker, non_striker, next_batter = batting[0], batting[1], 2
+        total = wickets = 0
+        runs_by = Counter()
+        wickets_by = Counter()
+        deliveries = []
+
+        for over in range(self.overs):
+            bowler = bowlers[over]
+            cumulative = self.profile.cumulative[min(over, len(self.profile.cumulative) - 1)]
+            legal = ball = 0
+            while legal < self.balls_per_over:
+                ball += 1
+                batter_runs, extras, kind = self.outcomes[bisect.bisect_right(cumulative, rng.random())]
+                extras_runs = sum(extras.values())
+                delivery = {'batsman': striker, 'bowler': bowler, 'non_striker': non_striker}
+                if extras:
+                    delivery['extras'] = dict(extras)
+                delivery['runs'] = {'batsman': batter_runs, 'extras': extras_runs, 'total': batter_runs + extras_runs}
+                total += batter_runs + extras_runs
+                runs_by[striker] += batter_runs
+                if not any(key in extras for key in ILLEGAL_EXTRAS):
+                    legal += 1
+
+                ran = batter_runs + extras.get('byes', 0) + extras.get('legbyes', 0) + max(extras.get('wides', 0) - 1, 0)
+                if kind:
+                    out = striker
+                    if kind == 'run out' and rng.random() < data['run_out_non_striker']:
+                        out = non_striker
+                    delivery['wicket'] = self._wicket(rng, kind, out, bowler, keeper, fielding)
+                    wickets += 1
+                    if kind not in ('run out', 'retired hurt', 'retired out', 'obstructing the field'):
+                        wickets_by[bowler] += 1
+                deliveries.append({f'{over}.{ball}': delivery})
+
+                if ran % 2:
+                    striker, non_striker = non_striker, striker
+                if kind:
+                    if next_batter >= len(batting):
+                        break
+                    # The new batter takes the dismissed batter's end
+                    if delivery['wicket']['player_out'] == striker:
+                        striker = batting[next_batter]
+                    else:
+                        non_striker = batting[next_batter]
+                    next_batter += 1
+                if target is not None and total >= target:
+                    break
+            else:
+                striker, non_striker = non_striker, striker
+                continue
+            break
+
+        figures = [(runs_by[name] + 25 * wickets_by[name], wickets_by[name], name) for name in batting + fielding
+                   if name in runs_by or name in wickets_by]
+        return deliveries, total, wickets, figures
+
+    def _bowling_plan(self, rng: np.random.Generator, fielding: List[str]) -> List[str]:
+        """Bowler of each over: weighted by bowling rate, never two overs in a row, quota of overs / 5."""
+        rates = self.profile.data['bowling_rate']
+        quota = -(-self.overs // 5)
+        weights = np.array([rates.get(name, 0.0) + 0.05 for name in fielding])
+        bowled = Counter()
+        plan, previous = [], None
+        for _ in range(self.overs):
+            eligible = [i for i, name in enumerate(fielding) if name != previous and bowled[name] < quota]
+            if not eligible:
+                eligible = [i for i, name in enumerate(fielding) if name != previous]
+            choice = fielding[eligible[self._weighted(rng, weights[eligible])]]
+            bowled[choice] += 1
+            plan.append(choice)
+            previous = choice
+        return plan
+
+    @staticmethod
+    def _wicket(rng: np.random.Generator, kind: str, out: str, bowler: str, keeper: str,
+                fielding: List[str]) -> Dict[str, Any]:
+        wicket = {'kind': kind, 'player_out': out}
+        if kind == 'stumped':
+            wicket['fielders'] = [keeper]
+        elif kind in ('caught', 'run out'):
+            others = [name for name in fielding if name != bowler]
+            wicket['fielders'] = [others[int(rng.integers(len(others)))]]
+        return {key: wicket[key] for key in sorted(wicket)}
+
+    @staticmethod
+    def _weighted(rng: np.random.Generator, weights) -> int:
+        cumulative = np.cumsum(weights)
+        return int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side='right'))
+
+    def to_yaml(self, match: Dict[str, Any]) -> str:
+        """Render a match in the layout of the Cricsheet files.
+
+        meta and info go through the YAML dumper; the deliveries, which are most of the
+        file, are written directly with the same indentation and key order.
+        """
+        # Dumped separately so meta comes first, as in the source files (the dumper sorts keys)
+        header = [yaml.dump({key: match[key]}, Dumper=_Dumper, default_flow_style=False, allow_unicode=True)
+                  for key in ('meta', 'info')]
+        lines = ['---', ''.join(header).rstrip('\n'), 'innings:']
+        scalar = self._scalar
+        for innings in match['innings']:
+            (name, body), = innings.items()
+            lines.append(f'- {name}:')
+            lines.append(f'    team: {scalar(body["team"])}')
+            lines.append('    deliveries:')
+            for delivery in body['deliveries']:
+                (key, ball), = delivery.items()
+                # YAML reads 0.10 as the float 0.1, so double-digit balls are quoted
+                lines.append(f"    - {key}:" if len(key.split('.')[1]) == 1 else f"    - '{key}':")
+                lines.append(f'        batsman: {scalar(ball["batsman"])}')
+                lines.append(f'        bowler: {scalar(ball["bowler"])}')
+                if 'extras' in ball:
+                    lines.append('        extras:')
+                    lines.extend(f'          {kind}: {runs}' for kind, runs in ball['extras'].items())
+                lines.append(f'        non_striker: {scalar(ball["non_striker"])}')
+                runs = ball['runs']
+                lines.append('        runs:')
+                lines.append(f'          batsman: {runs["batsman"]}')
+                lines.append(f'          extras: {runs["extras"]}')
+                lines.append(f'          total: {runs["total"]}')
+                wicket = ball.get('wicket')
+                if wicket:
+                    lines.append('        wicket:')
+                    if 'fielders' in wicket:
+                        lines.append('          fielders:')
+                        lines.extend(f'          - {scalar(fielder)}' for fielder in wicket['fielders'])
+                    lines.append(f'          kind: {scalar(wicket["kind"])}')
+                    lines.append(f'          player_out: {scalar(wicket["player_out"])}')
+        lines.append('')
+        return '\n'.join(lines)
+
+    def _scalar(self, value: str) -> str:
+        """value as a YAML scalar, quoted by the dumper when it would not read back as the same string."""
+        rendered = self._scalars.get(value)
+        if rendered is None:
+            rendered = yaml.dump(value, Dumper=SafeDumper, allow_unicode=True, width=1 << 16)
+            rendered = rendered[:-5] if rendered.endswith('\n...\n') else rendered.rstrip('\n')
+            self._scalars[value] = rendered
+        return rendered
+
+    def write(self, out_dir: str, seed: int, index: int) -> str:
+        """Generate match `index` and write it to out_dir; returns the file path."""
+        path = Path(out_dir) / synthetic_name(seed, index)
+        path.write_text(self.to_yaml(self.generate(seed, index)), encoding='utf-8')
+        return str(path)
+
+
+def _person_id(name: str) -> str:
+    """Stable 8-hex-digit registry id for a name the source registry does not cover."""
+    return hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+
+
+def synthetic_name(seed: int, index: int) -> str:
+    """File name of a generated match; its stem is the match id the pipelines use."""
+    return f'synthetic-{seed}-{index:07d}.yaml'
@@ -0,0 +1,69 @@
+"""
+Checkpoint and resume: a run interrupted after its last checkpoint and resumed with
+prm.py's resume_checkpoint() ends with the totals of an uninterrupted run.
+"""
+
+import json
+from pathlib import Path
+from prm import resume_checkpoint
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.partials import Checkpointer
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+FILES = sorted(str(path) for path in MATCHES.glob('*.yaml'))[:12]
+
+
+def run(analyzer, files, checkpoint=None, stop_after=None):
+    """Process files like prm.py does, optionally stopping (crashing) after stop_after files."""
+    processed = []
+    for count, (yaml_file, error) in enumerate(analyzer.process_match_files(files), start=1):
+        assert error is None
+        processed.append(yaml_file)
+        if checkpoint:
+            checkpoint.file_done(analyzer.calculator, processed, [])
+        if count == stop_after:
+            break
+    return processed
+
+
+def test_resume_gives_the_uninterrupted_totals(tmp_path):
+    uninterrupted = CricketAnalyzer(use_cache=False)
+    run(uninterrupted, FILES)
+
+    path = str(tmp_path / 'run.ckpt')
+    run(CricketAnalyzer(use_cache=False), FILES, Checkpointer(path, every=5), stop_after=8)
+    assert json.loads(Path(path).read_text())['files'] == FILES[:5]
+
+    resumed = CricketAnalyzer(use_cache=False)
+    completed, remaining = resume_checkpoint(resumed, Checkpointer(path), FILES)
+    assert completed == FILES[:5] and remaining == FILES[5:]
+    run(resumed, remaining)
+
+    assert resumed.calculator.to_dict() == uninterrupted.calculator.to_dict()
+    assert [summary.file for summary in resumed.processed_matches] == FILES
+
+
+def test_resume_without_a_checkpoint_starts_over(tmp_path):
+    analyzer = CricketAnalyzer(use_cache=False)
+    assert resume_checkpoint(analyzer, Checkpointer(str(tmp_path / 'none.ckpt')), FILES) == ([], FILES)
+
+
+
+def test_resume_retries_failed_files(tmp_path):
+    broken = tmp_path / 'broken.yaml'
+    broken.write_text('info: [not, a, match\n')
+    files = FILES[:3] + [str(broken)]
+
+    analyzer = CricketAnalyzer(use_cache=False)
+    processed, errors = [], []
+    for yaml_file, error in analyzer.process_match_files(files):
+        if error is None:
+            processed.append(yaml_file)
+        else:
+            errors.append({'file': yaml_file, 'error': error})
+    checkpoint = Checkpointer(str(tmp_path / 'run.ckpt'))
+    checkpoint.write(analyzer.calculator, processed, errors)
+
+    completed, remaining = resume_checkpoint(CricketAnalyzer(use_cache=False), Checkpointer(checkpoint.path), files)
+    assert completed == FILES[:3] and remaining == [str(broken)]
+    assert [error['file'] for error in checkpoint.load()[2]] == [str(broken)]
@@ -0,0 +1,86 @@
+"""
+The vectorised classifier (classify_innings and its lookup tables) against the scalar
+factor methods it replaced, on random deliveries covering every band of every factor,
+for six- and eight-ball overs.
+"""
+
+import numpy as np
+import pytest
+from Package.innings_state import InningsState
+from Package.pressure_classifier import PressureClassifier, PressureLevel
+
+
+def random_deliveries(rng, count, total_overs, balls_per_over=6):
+    total_balls = total_overs * balls_per_over
+    required = rng.uniform(-2, 20, count).round(2)
+    boundaries = rng.random(count) < 0.2
+    required[boundaries] = rng.integers(0, 16, boundaries.sum())  # whole numbers sit on band edges
+    required[rng.random(count) < 0.3] = np.nan  # no target
+    return {
+        'over': rng.integers(0, total_overs + 3, count),
+        'current_score': rng.integers(0, 250, count),
+        'wickets_fallen': rng.integers(0, 11, count),
+        'balls_remaining': rng.integers(-2, total_balls + 2, count),
+        'required_run_rate': required,
+        'recent_wickets': rng.integers(0, 5, count),
+        'runs': rng.integers(0, 8, count),
+        'is_wicket': rng.random(count) < 0.1
+    }
+
+
+def scalar_classification(classifier, deliveries, index, total_overs, balls_per_over=6):
+    """Level, weight and factors of one delivery from the scalar factor methods."""
+    rate = deliveries['required_run_rate'][index]
+    delivery = {'over': int(deliveries['over'][index]), 'runs': {'total': int(deliveries['runs'][index])}}
+    if deliveries['is_wicket'][index]:
+        delivery['wicket'] = {'kind': 'bowled'}
+    factors = classifier._calculate_pressure_factors(
+        delivery, int(deliveries['current_score'][index]), int(deliveries['wickets_fallen'][index]),
+        int(deliveries['balls_remaining'][index]), total_overs, None if np.isnan(rate) else float(rate),
+        int(deliveries['recent_wickets'][index]), balls_per_over
+    )
+    level = classifier._determine_pressure_level(factors)
+    return level, classifier.pressure_weights[level], factors
+
+
+@pytest.mark.parametrize('balls_per_over', [6, 8])
+@pytest.mark.parametrize('total_overs', [1, 5, 6, 10, 20, 50])
+def test_classify_innings_matches_scalar_methods(total_overs, balls_per_over):
+    rng = np.random.default_rng(total_overs * balls_per_over)
+    classifier = PressureClassifier()
+    deliveries = random_deliveries(rng, 2000, total_overs, balls_per_over)
+
+    batch = classifier.classify_innings(**deliveries, total_overs=total_overs, include_factors=True,
+                                        balls_per_over=balls_per_over)
+    for index in range(len(deliveries['over'])):
+        level, weight, factors = scalar_classification(classifier, deliveries, index, total_overs, balls_per_over)
+        assert PressureLevel(int(batch['level'][index])) == level
+        assert batch['weight'][index] == weight
+        for name, value in factors.items():
+            assert batch['factors'][name][index] == value, name
+
+
+def test_classify_delivery_matches_classify_innings():
+    rng = np.random.default_rng(7)
+    classifier = PressureClassifier()
+    deliveries = random_deliveries(rng, 300, 20)
+    batch = classifier.classify_innings(**deliveries, total_overs=20)
+
+    for index in range(len(deliveries['over'])):
+        rate = deliveries['required_run_rate'][index]
+        delivery = {'over': int(deliveries['over'][index]), 'runs': {'total': int(deliveries['runs'][index])}}
+        if deliveries['is_wicket'][index]:
+            delivery['wicket'] = {'kind': 'bowled'}
+        single = classifier.classify_delivery(
+            delivery, int(deliveries['current_score'][index]), int(deliveries['wickets_fallen'][index]),
+            int(deliveries['balls_remaining'][index]), 20, None if np.isnan(rate) else float(rate),
+            int(deliveries['recent_wickets'][index])
+        )
+        assert single['level'].value == batch['level'][index]
+        assert single['weight'] == batch['weight'][index]
+
+
+def test_classify_innings_handles_an_empty_innings():
+    empty = InningsState.from_columns([], [], [], [], [], total_overs=20)
+    result = PressureClassifier().classify_innings(**empty.classifier_inputs(), total_overs=20)
+    assert len(result['level']) == 0 and len(result['weight']) == 0
@@ -0,0 +1,55 @@
+"""
+The columnar store against the YAML files it was built from: a saved and reloaded store
+gives process_match_files() results through process_store(), and undated matches keep
+a null date.
+"""
+
+import shutil
+from pathlib import Path
+import pytest
+from Package.columnar_store import ColumnarStore
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.match_loader import MatchLoader
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURES = ['1082591.yaml', '1082625.yaml', '1082648.yaml', '1178424.yaml', '501265.yaml']
+
+
+@pytest.fixture
+def matches(tmp_path):
+    directory = tmp_path / 'Matches'
+    directory.mkdir()
+    for name in FIXTURES:
+        shutil.copy(ROOT / 'Data' / 'Matches' / name, directory / name)
+    undated = directory / 'undated.yaml'
+    undated.write_text((directory / FIXTURES[0]).read_text().replace('  dates:\n  - 2017-04-05\n', ''))
+    return sorted(str(path) for path in directory.glob('*.yaml'))
+
+
+@pytest.fixture
+def store(matches, tmp_path):
+    ColumnarStore.build(matches, MatchLoader(use_cache=False)).save(str(tmp_path / 'columnar'))
+    return ColumnarStore.load(str(tmp_path / 'columnar'))
+
+
+def test_store_gives_the_yaml_results(matches, store):
+    from_files = CricketAnalyzer(use_cache=False)
+    assert not [error for _, error in from_files.process_match_files(matches) if error]
+    from_store = CricketAnalyzer(use_cache=False)
+    from_store.process_store(store)
+
+    assert from_store.calculator.to_dict() == from_files.calculator.to_dict()
+    assert from_store.final_results() == from_files.final_results()
+    assert from_store.processed_matches == from_files.processed_matches
+
+
+def test_undated_match_has_a_null_date(matches, store):
+    dates = {record['file']: record['date'] for record in store.matches}
+    assert dates[next(f for f in matches if f.endswith('undated.yaml'))] is None
+    assert dates[next(f for f in matches if f.endswith(FIXTURES[0]))] == '2017-04-05'
+
+
+def test_stores_saved_with_a_none_date_load_as_null(store, tmp_path):
+    store.tables['matches'][0]['date'] = 'None'
+    store.save(str(tmp_path / 'legacy'))
+    assert ColumnarStore.load(str(tmp_path / 'legacy')).matches[0]['date'] is None
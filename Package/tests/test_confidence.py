@@ -0,0 +1,92 @@
+"""
+PRS confidence intervals: analytic and bootstrap intervals contain each player's point
+PRS, bootstrap intervals repeat under the same --seed, and the table's rules span the
+interval columns.
+"""
+
+import io
+import shutil
+import subprocess
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+import pytest
+from Package.confidence import prs_intervals
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.results_formater import ResultsFormatter
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURES = ['1082591.yaml', '1082625.yaml', '1082648.yaml']
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    analyzer = CricketAnalyzer(use_cache=False, track_deliveries=True)
+    files = [str(ROOT / 'Data' / 'Matches' / name) for name in FIXTURES]
+    assert not [error for _, error in analyzer.process_match_files(files) if error]
+    return analyzer
+
+
+@pytest.mark.parametrize('method', ['analytic', 'bootstrap'])
+def test_intervals_cover_the_point_estimate(analyzer, method):
+    intervals = prs_intervals(analyzer.calculator, method, samples=500, seed=1)
+    results = analyzer.final_results()
+    covered = 0
+    for player_name, stats in results.items():
+        for discipline in ('batting', 'bowling'):
+            interval = intervals[player_name][f'{discipline}_prs_ci']
+            if stats[f'{discipline}_deliveries'] < 2:
+                assert interval is None
+                continue
+            low, high = interval
+            assert low <= stats[f'{discipline}_prs'] <= high, (player_name, discipline)
+            covered += 1
+    assert covered > 20
+
+
+def test_wider_confidence_gives_wider_intervals(analyzer):
+    narrow = prs_intervals(analyzer.calculator, confidence=0.8)
+    wide = prs_intervals(analyzer.calculator, confidence=0.99)
+    for player_name, intervals in narrow.items():
+        if intervals['batting_prs_ci']:
+            narrow_low, narrow_high = intervals['batting_prs_ci']
+            wide_low, wide_high = wide[player_name]['batting_prs_ci']
+            assert wide_low <= narrow_low and narrow_high <= wide_high
+
+
+def test_bootstrap_needs_the_deliveries():
+    with pytest.raises(ValueError):
+        prs_intervals(CricketAnalyzer(use_cache=False).calculator, 'bootstrap')
+
+
+def run_prm(directory, seed):
+    result = subprocess.run([sys.executable, str(ROOT / 'prm.py'), str(directory), '--format', 'ndjson', '--ci',
+                             'bootstrap', '--ci-samples', '200', '--seed', str(seed), '--no-save', '--no-cache'],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    return result.stdout
+
+
+def test_bootstrap_repeats_with_the_same_seed(analyzer, tmp_path):
+    assert prs_intervals(analyzer.calculator, 'bootstrap', seed=7) == prs_intervals(
+        analyzer.calculator, 'bootstrap', seed=7)
+    assert prs_intervals(analyzer.calculator, 'bootstrap', seed=7) != prs_intervals(
+        analyzer.calculator, 'bootstrap', seed=8)
+
+    for name in FIXTURES:
+        shutil.copy(ROOT / 'Data' / 'Matches' / name, tmp_path / name)
+    output = run_prm(tmp_path, 7)
+    assert 'batting_prs_ci' in output
+    assert run_prm(tmp_path, 7) == output
+
+
+def test_table_rules_span_the_interval_columns(analyzer):
+    output = io.StringIO()
+    with redirect_stdout(output):
+        ResultsFormatter().print_table_results(analyzer.final_results(prs_intervals(analyzer.calculator)), top_n=5)
+    lines = output.getvalue().splitlines()
+    header = lines[3]
+    assert header.startswith('Name') and 'Bowling CI' in header
+    rules = [line for line in lines if line and set(line) <= {'=', '-'}]
+    assert len(rules) == 4
+    assert {len(rule) for rule in rules} == {len(header)}
+    assert all(len(line) <= len(header) for line in lines[4:-2])
@@ -0,0 +1,136 @@
+"""
+BulkWriter against a temporary database: queued deletes run before the batch's inserts,
+open() migrates tables created before their newer columns, and report() accounts for
+the rows, deletes and batches written.
+"""
+
+import sqlite3
+import pytest
+from Package.db_writer import BulkWriter, TABLE_MIGRATIONS
+
+
+def batsman_row(match_id, player_id, runs):
+    return (match_id, player_id, runs, 0, 0, runs, None)
+
+
+def columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'writer.db')
+
+
+def test_deletes_run_before_the_inserts_of_their_batch(db_path):
+    with BulkWriter(db_path) as writer:
+        writer.add_many('batsman_stats', [batsman_row('m1', 'a', 10), batsman_row('m1', 'b', 20),
+                                          batsman_row('m2', 'a', 30)])
+        writer.flush()
+
+        # Queued after the new rows, but run first: the match is replaced, not emptied,
+        # and the re-added primary keys do not conflict with the old rows
+        writer.add('batsman_stats', batsman_row('m1', 'a', 15))
+        writer.delete('batsman_stats', match_id='m1')
+        writer.flush()
+        assert writer.batches_written == 2
+        rows = writer.conn.execute("SELECT match_id, player_id, runs FROM batsman_stats ORDER BY match_id").fetchall()
+    assert rows == [('m1', 'a', 15), ('m2', 'a', 30)]
+    assert writer.report()['deleted'] == 2
+
+
+def test_a_failing_flush_commits_nothing(db_path):
+    writer = BulkWriter(db_path)
+    writer.open(tables=['batsman_stats'])
+    writer.add('batsman_stats', batsman_row('m1', 'a', 10))
+    writer.flush()
+
+    def fail(conn):
+        raise RuntimeError("callback failed")
+
+    writer.on_flush.append(fail)
+    writer.delete('batsman_stats', match_id='m1')
+    writer.add('batsman_stats', batsman_row('m2', 'a', 30))
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    assert writer.conn.execute("SELECT match_id FROM batsman_stats").fetchall() == [('m1',)]
+    writer._disconnect()
+
+
+PRE_MIGRATION_SCHEMAS = {
+    'prm': '''
+        CREATE TABLE prm (
+            player_name TEXT,
+            batting_prs INTEGER,
+            bowling_prs INTEGER,
+            bat_balls INTEGER,
+            bowl_balls INTEGER,
+            PRIMARY KEY (player_name)
+        )
+    ''',
+    'prm_pressure': '''
+        CREATE TABLE prm_pressure (
+            player_name TEXT,
+            discipline TEXT,
+            level TEXT,
+            balls INTEGER,
+            score_sum REAL,
+            runs INTEGER,
+            PRIMARY KEY (player_name, discipline, level)
+        )
+    '''
+}
+
+
+def test_open_adds_the_new_columns_to_an_existing_database(db_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        for schema in PRE_MIGRATION_SCHEMAS.values():
+            conn.execute(schema)
+        conn.execute("INSERT INTO prm VALUES ('P', 60, NULL, 10, 0)")
+        conn.execute("INSERT INTO prm_pressure VALUES ('P', 'batting', 'HIGH', 10, 5.0, 12)")
+    conn.close()
+
+    writer = BulkWriter(db_path)
+    writer.open(tables=['prm', 'prm_pressure', 'prm_form'])
+    assert writer.created == ['prm_form']
+    assert writer.migrated == {table: [column for column, _ in TABLE_MIGRATIONS[table]]
+                               for table in PRE_MIGRATION_SCHEMAS}
+    for table in PRE_MIGRATION_SCHEMAS:
+        assert columns(writer.conn, table)[-len(TABLE_MIGRATIONS[table]):] == [
+            column for column, _ in TABLE_MIGRATIONS[table]]
+
+    # Old rows keep their values with NULL in the new columns; new rows fill them
+    writer.add('prm', ('Q', 55.0, None, 20, 0, 50.0, 60.0, None, None))
+    writer.add('prm_pressure', ('P', 'batting', 'HIGH', 12, 6.0, 14, 2.0))
+    writer.close()
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT * FROM prm ORDER BY player_name").fetchall() == [
+            ('P', 60, None, 10, 0, None, None, None, None), ('Q', 55.0, None, 20, 0, 50.0, 60.0, None, None)]
+        assert conn.execute("SELECT * FROM prm_pressure").fetchall() == [('P', 'batting', 'HIGH', 12, 6.0, 14, 2.0)]
+    finally:
+        conn.close()
+
+    # A migrated database has nothing left to migrate
+    writer = BulkWriter(db_path)
+    writer.open(tables=['prm', 'prm_pressure'])
+    assert writer.migrated == {} and writer.created == []
+    writer.close()
+
+
+def test_report_counts_the_writes(db_path):
+    writer = BulkWriter(db_path, batch_size=4)
+    writer.open(tables=['batsman_stats'])
+    writer.add_many('batsman_stats', [batsman_row(f'm{i}', 'a', i) for i in range(10)])
+    writer.delete('batsman_stats', match_id='m0')
+    writer.close()
+
+    report = writer.report()
+    assert set(report) == {'rows', 'deleted', 'batches', 'seconds', 'write_seconds', 'insert_seconds',
+                           'rows_per_sec'}
+    # Two full batches of four, then the last two rows with the delete of m0's committed row
+    assert (report['rows'], report['deleted'], report['batches']) == (10, 1, 3)
+    assert 0 <= report['insert_seconds'] <= report['write_seconds'] <= report['seconds']
+    assert report['rows_per_sec'] > 0
+    assert BulkWriter(db_path).report()['rows_per_sec'] == 0.0
@@ -0,0 +1,134 @@
+"""
+Rolling-window and time-decayed form: the window keeps a player's latest dated matches,
+the decayed sums halve every half-life, appended matches give the figures of a full
+rebuild, and removing a match rebuilds only its players. A full prm save clears the form.
+"""
+
+import sqlite3
+import pytest
+from Package.db_writer import BulkWriter
+from Package.form_store import FormStore, player_forms
+from Package.prm_store import PRMStore, save_prm_results
+from Package.prs_calculator import PRSCalculator, PlayerPerformance, DisciplineStats
+
+
+def batting(average, balls=10):
+    """One match's partials for a batter whose weighted average score is `average` (weights of 1)."""
+    return PlayerPerformance(batting=DisciplineStats(balls, average * balls, float(balls), average * balls))
+
+
+class Stores:
+    def __init__(self, db_path, window=2, half_life_days=365):
+        self.writer = BulkWriter(str(db_path))
+        self.writer.open(tables=['prm', 'prm_match_partials', 'prm_match_pressure', 'prm_pressure', 'prm_form',
+                                'ingest_manifest'])
+        self.prm = PRMStore(self.writer)
+        self.form = FormStore(self.writer, window, half_life_days)
+
+    def add(self, match_id, match_date, partials):
+        self.prm.replace_match(match_id, partials, {'date': match_date})
+        self.form.add_match(match_id, match_date, partials)
+        self.writer.flush()
+
+    def remove(self, match_id):
+        self.form.remove_match(match_id)
+        self.prm.remove_match(match_id)
+        self.writer.flush()
+
+    def forms(self, *players):
+        return player_forms(self.writer.conn, players)
+
+
+@pytest.fixture
+def stores(tmp_path):
+    stores = Stores(tmp_path / 'form.db')
+    yield stores
+    stores.writer.close()
+
+
+def test_rolling_window_keeps_the_latest_matches(stores):
+    # Added out of date order: the window is by match date, not by arrival
+    stores.add('m3', '2021-01-01', {'P': batting(3), 'Q': batting(1)})
+    stores.add('m1', '2020-01-01', {'P': batting(1)})
+    stores.add('m2', '2020-06-01', {'P': batting(2)})
+
+    form = stores.forms('P')['P']
+    assert form['last_date'] == '2021-01-01'
+    assert form['rolling_matches'] == 2
+    assert form['rolling_batting_prs'] == PRSCalculator.prs_from_totals(20 + 30, 20)
+    assert form['rolling_bowling_prs'] is None
+    assert set(stores.forms('P', 'Q', 'Nobody')) == {'P', 'Q'}
+
+
+def test_a_match_counts_half_after_one_half_life(stores):
+    stores.add('old', '2020-01-01', {'P': batting(0)})
+    stores.add('new', '2020-12-31', {'P': batting(4)})  # 365 days later
+
+    assert stores.forms('P')['P']['decayed_batting_prs'] == PRSCalculator.prs_from_totals(0 * 5 + 40, 5 + 10)
+    row = stores.writer.conn.execute(
+        "SELECT bat_decayed_score, bat_decayed_weight FROM prm_form WHERE player_name = 'P'").fetchone()
+    assert row == pytest.approx((40.0, 15.0))
+
+
+def test_appended_matches_give_the_rebuilt_sums(stores, tmp_path):
+    matches = [('a', '2019-03-01', 1.5), ('b', '2020-02-10', -0.5), ('c', '2019-11-20', 2.0), ('d', '2021-07-04', 0.5)]
+    for match_id, match_date, average in matches:
+        stores.add(match_id, match_date, {'P': batting(average)})
+
+    rebuilt = Stores(tmp_path / 'rebuilt.db')
+    for match_id, match_date, average in matches:
+        rebuilt.prm.replace_match(match_id, {'P': batting(average)}, {'date': match_date})
+        rebuilt.form.add_match(match_id, match_date, {'P': batting(average)})
+    rebuilt.writer.flush()
+    # One flush, with no form row yet: the figures come from every partial row at once
+    query = "SELECT * FROM prm_form"
+    actual, expected = stores.writer.conn.execute(query).fetchall(), rebuilt.writer.conn.execute(query).fetchall()
+    rebuilt.writer.close()
+    assert len(actual) == len(expected) == 1
+    for value, expected_value in zip(actual[0], expected[0]):
+        assert value == (pytest.approx(expected_value) if isinstance(value, float) else expected_value)
+
+
+def test_removing_a_match_rebuilds_only_its_players(stores):
+    stores.add('m1', '2020-01-01', {'P': batting(1), 'Q': batting(2)})
+    stores.add('m2', '2020-06-01', {'P': batting(2)})
+    stores.add('m3', '2021-01-01', {'P': batting(3), 'R': batting(1)})
+    before = stores.forms('Q')
+
+    refreshed = stores.form.players_refreshed
+    stores.remove('m3')
+    assert stores.form.players_refreshed - refreshed == 2  # P and R, not Q
+
+    forms = stores.forms('P', 'Q', 'R')
+    assert forms['Q'] == before['Q']
+    assert 'R' not in forms  # no dated match left
+    assert forms['P']['last_date'] == '2020-06-01'
+    assert forms['P']['rolling_batting_prs'] == PRSCalculator.prs_from_totals(10 + 20, 20)
+    assert forms['P']['decayed_batting_prs'] == PRSCalculator.prs_from_totals(
+        10 * 0.5 ** (152 / 365) + 20, 10 * 0.5 ** (152 / 365) + 10)
+
+
+def test_undated_matches_stay_out_of_the_form(stores):
+    stores.add('m1', '2020-01-01', {'P': batting(1)})
+    stores.add('undated', None, {'P': batting(5)})
+    form = stores.forms('P')['P']
+    assert form['rolling_matches'] == 1 and form['last_date'] == '2020-01-01'
+
+
+def test_full_save_clears_the_form(stores, tmp_path):
+    stores.add('m1', '2020-01-01', {'P': batting(1)})
+    conn = stores.writer.conn
+    with conn:
+        conn.execute("INSERT INTO ingest_manifest (pipeline, file_path, status) VALUES ('prm', 'm1.yaml', 'ok')")
+    stores.writer.close()
+
+    calculator = PRSCalculator()
+    calculator.add_delivery_performance('P', 'B', 1.0, -1.0, 1.0)
+    save_prm_results(calculator.calculate_final_scores(), db_path=str(tmp_path / 'form.db'))
+
+    conn = sqlite3.connect(str(tmp_path / 'form.db'))
+    try:
+        assert player_forms(conn, ['P']) == {}
+        assert conn.execute("SELECT status FROM ingest_manifest").fetchall() == [('stale',)]
+    finally:
+        conn.close()
@@ -0,0 +1,100 @@
+"""
+Incremental ingestion through the manifest: a rerun over unchanged files does no work
+and leaves the tables as they were; a changed or deleted file only has its own rows
+replaced or removed.
+"""
+
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from Package.manifest import IngestManifest
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURES = ['1082591.yaml', '1082625.yaml', '1082648.yaml', '1178424.yaml']
+
+
+def ingest(directory, db_path):
+    subprocess.run([sys.executable, str(ROOT / 'ingest.py'), str(directory), '--db', str(db_path),
+                    '--quiet', '--no-cache'], cwd=ROOT, check=True, capture_output=True)
+
+
+def table_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall())
+                for table in ('batsman_stats', 'bowling_stats', 'master_match')}
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    directory = tmp_path / 'Matches'
+    directory.mkdir()
+    for name in FIXTURES:
+        shutil.copy(ROOT / 'Data' / 'Matches' / name, directory / name)
+    return directory, tmp_path / 'test.db'
+
+
+def test_rerun_is_a_no_op(corpus):
+    directory, db_path = corpus
+    ingest(directory, db_path)
+    first = table_rows(db_path)
+
+    files = sorted(str(directory / name) for name in FIXTURES)
+    assert IngestManifest('stats', str(db_path)).plan(files) == ([], [])
+
+    ingest(directory, db_path)
+    assert table_rows(db_path) == first
+
+
+def test_touched_file_is_not_reprocessed(corpus):
+    directory, db_path = corpus
+    ingest(directory, db_path)
+    touched = directory / FIXTURES[0]
+    os.utime(touched, (1, 1))
+
+    manifest = IngestManifest('stats', str(db_path))
+    assert manifest.plan(sorted(str(directory / name) for name in FIXTURES)) == ([], [])
+    assert manifest.touched == [os.path.normpath(str(touched))]
+
+
+def test_deleted_file_loses_only_its_rows(corpus):
+    directory, db_path = corpus
+    ingest(directory, db_path)
+    before = table_rows(db_path)
+
+    (directory / FIXTURES[0]).unlink()
+    ingest(directory, db_path)
+    after = table_rows(db_path)
+
+    removed_id = Path(FIXTURES[0]).stem
+    for table, rows in before.items():
+        match_id = 1 if table == 'master_match' else 0
+        assert after[table] == [row for row in rows if row[match_id] != removed_id]
+
+
+def test_changed_file_replaces_only_its_rows(corpus):
+    directory, db_path = corpus
+    ingest(directory, db_path)
+    before = table_rows(db_path)
+
+    changed = directory / FIXTURES[0]
+    changed.write_text(changed.read_text().replace('venue: Rajiv Gandhi International Stadium, Uppal',
+                                                   'venue: Renamed Ground'))
+    manifest = IngestManifest('stats', str(db_path))
+    planned, removed = manifest.plan(sorted(str(directory / name) for name in FIXTURES))
+    assert [yaml_file for yaml_file, _ in planned] == [str(changed)] and removed == []
+
+    ingest(directory, db_path)
+    after = table_rows(db_path)
+    changed_id = Path(FIXTURES[0]).stem
+    assert after['batsman_stats'] == before['batsman_stats']
+    assert after['bowling_stats'] == before['bowling_stats']
+    assert [row for row in after['master_match'] if row[1] != changed_id] == \
+        [row for row in before['master_match'] if row[1] != changed_id]
+    assert [row[2] for row in after['master_match'] if row[1] == changed_id] == ['Renamed Ground']
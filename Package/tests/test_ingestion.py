@@ -0,0 +1,53 @@
+"""
+The single-pass ingestion must give the rows of the three parser scripts it replaced
+(batting-parser.py, bowling-parser.py and master-matches-parser.py).
+
+fixtures/legacy_ingest.json holds those scripts' rows for a few files of Data/Matches:
+a win, a tie, a D/L result and two no-result matches, which give no rows.
+"""
+
+import json
+from pathlib import Path
+import pytest
+from Package.ingestion import MatchIngestor
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+
+with open(Path(__file__).parent / 'fixtures' / 'legacy_ingest.json', encoding='utf-8') as file:
+    LEGACY = json.load(file)
+
+
+@pytest.fixture(scope='module')
+def ingested():
+    ingestor = MatchIngestor(use_cache=False)
+    tables = {}
+    for name in LEGACY['files']:
+        for table, rows in (ingestor.ingest_file(str(MATCHES / name)) or {}).items():
+            tables.setdefault(table, []).extend(list(row) for row in rows)
+    return {table: sorted(rows) for table, rows in tables.items()}
+
+
+@pytest.mark.parametrize('table', ['batsman_stats', 'bowling_stats'])
+def test_stats_rows_match_legacy_parsers(ingested, table):
+    assert ingested[table] == LEGACY[table]
+
+
+def test_master_match_rows_match_legacy_parser(ingested):
+    assert [row[1] for row in ingested['master_match']] == [row[1] for row in LEGACY['master_match']]
+    for row, legacy in zip(ingested['master_match'], LEGACY['master_match']):
+        # The old parser compared team names with `is not`, which always swapped them,
+        # so only the pair of teams is compared; every other column must agree
+        assert row[:4] + row[6:] == legacy[:4] + legacy[6:]
+        assert sorted(row[4:6]) == sorted(legacy[4:6])
+
+
+def test_master_match_team_1_batted_first(ingested):
+    for row in ingested['master_match']:
+        team_1, team_2, toss_winner, decision = row[4:8]
+        assert (team_1 if decision == 'bat' else team_2) == toss_winner
+
+
+def test_no_result_matches_give_no_rows():
+    ingestor = MatchIngestor(use_cache=False)
+    assert ingestor.ingest_file(str(MATCHES / '1178424.yaml')) is None
+    assert ingestor.ingest_file(str(MATCHES / '501265.yaml')) is None
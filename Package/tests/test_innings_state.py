@@ -0,0 +1,102 @@
+"""
+InningsState against the per-ball loop it replaced: the recent-wickets window, taken at
+each wicket ball and held until the next one; and the chase context, NaN without a
+target, with the target at the first-innings total + 1.
+"""
+
+import numpy as np
+import pytest
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.innings_state import InningsState, WICKET_WINDOW
+
+
+def state_with_wickets(balls, wicket_balls, target=None, total_overs=20, runs=None):
+    is_wicket = np.zeros(balls, dtype=bool)
+    is_wicket[list(wicket_balls)] = True
+    runs = np.ones(balls, dtype=np.int64) if runs is None else np.asarray(runs)
+    return InningsState.from_columns(np.arange(balls) // 6, runs, runs, is_wicket, is_wicket,
+                                     total_overs, 6, target)
+
+
+def loop_recent_wickets(is_wicket):
+    """The original per-ball loop: prune to the last two overs on wicket balls only."""
+    recent, counts = [], []
+    for i, wicket in enumerate(is_wicket):
+        if wicket:
+            recent.append(i)
+            recent = [w for w in recent if i - w <= 12]
+        counts.append(len(recent))
+    return counts
+
+
+@pytest.mark.parametrize('second', [WICKET_WINDOW - 1, WICKET_WINDOW])
+def test_window_edge(second):
+    state = state_with_wickets(30, [0, second])
+    inside = second < WICKET_WINDOW
+    assert state.recent_wickets[second] == (2 if inside else 1)
+
+
+def test_count_is_held_until_the_next_wicket():
+    state = state_with_wickets(40, [0, 5, 20])
+    recent = state.recent_wickets.tolist()
+    assert recent[:5] == [1] * 5
+    # Ball 0 leaves the window after ball 12, but the count only moves on a wicket ball
+    assert recent[5:20] == [2] * 15
+    assert recent[20:] == [1] * 20
+
+
+def test_no_wickets_no_recent_wickets():
+    assert state_with_wickets(15, []).recent_wickets.tolist() == [0] * 15
+
+
+def test_matches_the_per_ball_loop():
+    rng = np.random.default_rng(11)
+    for _ in range(200):
+        is_wicket = rng.random(120) < 0.08
+        state = state_with_wickets(120, np.flatnonzero(is_wicket))
+        assert state.recent_wickets.tolist() == loop_recent_wickets(is_wicket)
+
+
+CHASE_COLUMNS = ('target', 'runs_required', 'required_run_rate', 'rate_gap')
+
+
+def test_first_innings_has_no_chase_context():
+    state = state_with_wickets(30, [4])
+    for name in CHASE_COLUMNS:
+        assert np.isnan(getattr(state, name)).all(), name
+    assert state.chase_target() == state.total + 1 == 31
+
+
+def test_required_rate_late_in_a_chase():
+    # 20 overs, 114 balls bowled for 150: 6 balls left needing 12
+    runs = np.zeros(114, dtype=np.int64)
+    runs[:75] = 2
+    state = state_with_wickets(114, [], target=162, runs=runs)
+    assert state.current_score[-1] == 150
+    assert state.balls_remaining[-1] == 6
+    assert state.runs_required[-1] == 12
+    assert state.required_run_rate[-1] == pytest.approx(12.0)
+    assert state.current_run_rate[-1] == pytest.approx(150 / 19)
+    assert state.rate_gap[-1] == pytest.approx(12.0 - 150 / 19)
+
+    # The last ball of the allotted overs has no balls left to score from
+    state = state_with_wickets(120, [], target=162, runs=np.ones(120, dtype=np.int64))
+    assert state.balls_remaining[-1] == 0
+    assert np.isnan(state.required_run_rate[-1]) and np.isnan(state.rate_gap[-1])
+    assert state.runs_required[-1] == 42
+    assert state.required_run_rate[-2] == pytest.approx((162 - 119) / (1 / 6))
+
+
+def test_target_reached():
+    state = state_with_wickets(60, [], target=55)
+    assert state.runs_required[54] == 0
+    assert state.required_run_rate[54] == 0
+    assert (state.target == 55).all()
+
+
+def test_second_innings_chases_the_first_innings_total_plus_one():
+    analyzer = CricketAnalyzer(use_cache=False)
+    first = state_with_wickets(120, [3, 50])
+    assert analyzer._get_target(1, first) is None
+    assert analyzer._get_target(2, None) is None
+    assert analyzer._get_target(2, first) == first.total + 1 == 121
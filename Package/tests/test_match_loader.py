@@ -0,0 +1,105 @@
+"""
+The parse-once match cache: hits, invalidation when a file's content changes, entries
+that cannot be unpickled, and match_cache.py prune.
+"""
+
+import pickle
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from Package.match_loader import MatchLoader, CACHE_DIR_NAME
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURES = ['1082591.yaml', '1082625.yaml', '1082648.yaml']
+
+
+@pytest.fixture
+def matches(tmp_path):
+    for name in FIXTURES:
+        shutil.copy(ROOT / 'Data' / 'Matches' / name, tmp_path / name)
+    return tmp_path
+
+
+def entries(directory):
+    return sorted(path.name for path in (directory / CACHE_DIR_NAME).glob('*.pickle'))
+
+
+def edit(yaml_file):
+    yaml_file.write_text(yaml_file.read_text().replace('Rajiv Gandhi International Stadium', 'Renamed Ground'))
+
+
+def test_second_load_is_a_cache_hit(matches):
+    yaml_file = str(matches / FIXTURES[0])
+    loader = MatchLoader()
+    parsed = loader.load(yaml_file)
+    assert (loader.hits, loader.misses) == (0, 1)
+
+    assert MatchLoader().load(yaml_file) == parsed
+    assert MatchLoader(use_cache=False).load(yaml_file) == parsed
+    loader.load(yaml_file)
+    assert (loader.hits, loader.misses) == (1, 1)
+
+
+def test_changed_content_replaces_the_entry(matches):
+    yaml_file = matches / FIXTURES[0]
+    loader = MatchLoader()
+    loader.load(str(yaml_file))
+    before = entries(matches)
+
+    edit(yaml_file)
+    assert not loader.is_cached(str(yaml_file))
+    assert loader.load(str(yaml_file))['info']['venue'].startswith('Renamed Ground')
+    assert (loader.hits, loader.misses) == (0, 2)
+    after = entries(matches)
+    assert len(after) == 1 and after != before
+
+
+@pytest.mark.parametrize('content', [
+    b'',                                            # EOFError
+    b'not a pickle',                                # UnpicklingError
+    None,                                           # truncated entry
+    b'cPackage.match_loader\nNoSuchClass\n.',       # AttributeError: a class that moved
+    b'cno_such_module\nMatch\n.',                   # ImportError: a module that moved
+])
+def test_unreadable_entry_is_dropped_and_reparsed(matches, content):
+    yaml_file = str(matches / FIXTURES[0])
+    loader = MatchLoader()
+    parsed = loader.load(yaml_file)
+    entry = matches / CACHE_DIR_NAME / entries(matches)[0]
+    entry.write_bytes(pickle.dumps(parsed)[:50] if content is None else content)
+
+    loader = MatchLoader()
+    assert loader.load(yaml_file) == parsed
+    assert (loader.hits, loader.misses) == (0, 1)
+    # The bad entry was replaced by a good one
+    assert MatchLoader().load(yaml_file) == parsed
+    assert entries(matches) == [entry.name]
+
+
+def prune(directory):
+    result = subprocess.run([sys.executable, str(ROOT / 'match_cache.py'), 'prune', str(directory)],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def test_prune_removes_only_stale_and_orphaned_entries(matches):
+    loader = MatchLoader()
+    for name in FIXTURES:
+        loader.load(str(matches / name))
+    live = entries(matches)
+
+    # An orphan (its source was deleted) and a stale entry (an older hash of a current file)
+    shutil.copy(matches / FIXTURES[0], matches / 'gone.yaml')
+    loader.load(str(matches / 'gone.yaml'))
+    (matches / 'gone.yaml').unlink()
+    (matches / CACHE_DIR_NAME / f"{Path(FIXTURES[0]).stem}.{'0' * 16}.v1.pickle").write_bytes(b'old')
+    assert len(entries(matches)) == 5
+
+    # Entries of existing files that were not given are left alone, stale or not
+    assert loader.prune([str(matches / FIXTURES[1])]) == (4, 1)
+    assert not any(name.startswith('gone.') for name in entries(matches))
+
+    assert prune(matches) == 'Kept 3 entries, removed 1 stale entries'
+    assert entries(matches) == live
@@ -0,0 +1,33 @@
+"""
+Process-pool runs against a serial run over the same files: identical totals, and
+results (errors included) yielded in input order.
+"""
+
+from pathlib import Path
+from Package.cricket_analyzer import CricketAnalyzer
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+FILES = sorted(str(path) for path in MATCHES.glob('*.yaml'))[:12]
+
+
+def analyze(files, workers=1):
+    analyzer = CricketAnalyzer(use_cache=False)
+    results = list(analyzer.process_match_files(files, workers=workers))
+    return analyzer, results
+
+
+def test_workers_give_the_serial_totals():
+    parallel, _ = analyze(FILES, workers=2)
+    serial, _ = analyze(FILES)
+    assert parallel.calculator.to_dict() == serial.calculator.to_dict()
+    assert parallel.processed_matches == serial.processed_matches
+
+
+def test_workers_yield_errors_in_input_order(tmp_path):
+    broken = tmp_path / 'broken.yaml'
+    broken.write_text('info: [not, a, match\n')
+    files = FILES[:3] + [str(broken)] + FILES[3:6]
+
+    _, results = analyze(files, workers=2)
+    assert [yaml_file for yaml_file, _ in results] == files
+    assert [error is not None for _, error in results] == [False] * 3 + [True] + [False] * 3
@@ -0,0 +1,94 @@
+"""
+Mergeable PRS partials: merged totals (per-match partials, shards, any grouping) against
+a single pass over the same deliveries, and shard selection.
+"""
+
+from functools import reduce
+from pathlib import Path
+import numpy as np
+import pytest
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.partials import write_partials, read_partials, select_shard
+from Package.prs_calculator import PRSCalculator, DisciplineStats
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+FILES = sorted(str(path) for path in MATCHES.glob('*.yaml'))[:12]
+
+_TOTALS = ('weighted_score_sum', 'weight_sum', 'score_sum',
+           'weight_sq_sum', 'weight_sq_score_sum', 'weight_sq_score_sq_sum')
+
+
+def stats_of(deliveries):
+    stats = DisciplineStats()
+    for score, weight in deliveries:
+        stats.add(score, weight)
+    return stats
+
+
+def merged(parts):
+    return reduce(lambda total, part: (total.merge(part), total)[1], parts, DisciplineStats())
+
+
+def assert_same_totals(actual, expected):
+    assert actual.deliveries == expected.deliveries
+    assert actual.best == expected.best and actual.worst == expected.worst
+    for name in _TOTALS:
+        assert getattr(actual, name) == pytest.approx(getattr(expected, name), rel=1e-12), name
+
+
+def test_merged_chunks_match_a_single_pass():
+    rng = np.random.default_rng(3)
+    scores = rng.uniform(-3, 6, 1000).tolist()
+    weights = rng.choice([0.2, 0.4, 0.6, 0.8, 1.0], 1000).tolist()
+    deliveries = list(zip(scores, weights))
+    single = stats_of(deliveries)
+
+    bounds = [0, 1, 90, 91, 400, 777, 1000]
+    parts = [stats_of(deliveries[start:end]) for start, end in zip(bounds, bounds[1:])]
+    assert_same_totals(merged(parts), single)
+    assert_same_totals(merged(reversed(parts)), single)
+
+    # (a + b) + c == a + (b + c); merged() leaves its inputs untouched
+    assert_same_totals(merged([merged(parts[:3]), merged(parts[3:])]),
+                       merged([parts[0], merged(parts[1:])]))
+
+
+def test_merging_empty_totals_changes_nothing():
+    stats = stats_of([(1.5, 0.4), (-2.0, 1.0)])
+    before = stats.to_dict()
+    stats.merge(DisciplineStats())
+    assert stats.to_dict() == before
+
+
+def analyze(files, workers=1):
+    analyzer = CricketAnalyzer(use_cache=False)
+    errors = [error for _, error in analyzer.process_match_files(files, workers=workers) if error]
+    assert not errors
+    return analyzer.calculator
+
+
+def test_reduced_shards_give_the_single_run_scores(tmp_path):
+    single = analyze(FILES)
+
+    reduced = PRSCalculator()
+    for shard in range(3):
+        path = tmp_path / f'shard{shard}.json'
+        write_partials(str(path), analyze(FILES[shard::3]), FILES[shard::3], [])
+        partials, meta = read_partials(str(path))
+        assert meta['files'] == FILES[shard::3]
+        reduced.merge(partials)
+
+    assert reduced.calculate_final_scores() == single.calculate_final_scores()
+    for player_name, performance in single.players.items():
+        shard_total = reduced.players[player_name]
+        for discipline in ('batting', 'bowling'):
+            assert_same_totals(getattr(shard_total, discipline), getattr(performance, discipline))
+            assert np.array_equal(getattr(shard_total, f'{discipline}_levels').balls,
+                                  getattr(performance, f'{discipline}_levels').balls)
+
+
+def test_shards_cover_every_file_once():
+    shards = [select_shard(FILES, f'{index}/5') for index in range(1, 6)]
+    assert sorted(sum(shards, [])) == FILES
+    with pytest.raises(ValueError):
+        select_shard(FILES, '6/5')
@@ -0,0 +1,81 @@
+"""
+Per-pressure-level breakdowns: bowling economy counts legal balls in the match's overs
+and only the runs the bowler conceded, for the calculator and for stored rows alike.
+"""
+
+import sqlite3
+import pytest
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.innings_state import InningsState
+from Package.prm_store import pressure_breakdowns, save_prm_results
+from Package.prs_calculator import PRSCalculator, level_summary
+
+
+def over_with_a_wide_and_a_bye():
+    """One over of six legal balls plus a wide: 8 runs off the bat and extras, 7 conceded."""
+    balls = [
+        ({'batsman': 1, 'extras': 0, 'total': 1}, None),
+        ({'batsman': 0, 'extras': 1, 'total': 1}, {'wides': 1}),
+        ({'batsman': 0, 'extras': 1, 'total': 1}, {'byes': 1}),
+        ({'batsman': 4, 'extras': 0, 'total': 4}, None),
+        ({'batsman': 0, 'extras': 0, 'total': 0}, None),
+        ({'batsman': 0, 'extras': 0, 'total': 0}, None),
+        ({'batsman': 1, 'extras': 0, 'total': 1}, None)
+    ]
+    return [{'over': 0, 'ball': number, 'batsman': 'Batter', 'bowler': 'Bowler', 'runs': runs,
+             'wicket': None, 'extras': extras} for number, (runs, extras) in enumerate(balls, start=1)]
+
+
+def score_over(balls_per_over):
+    deliveries = over_with_a_wide_and_a_bye()
+    state = InningsState.from_deliveries(deliveries, 20, balls_per_over)
+    calculator = PRSCalculator()
+    CricketAnalyzer(use_cache=False)._score_innings(
+        state, [d['batsman'] for d in deliveries], [d['bowler'] for d in deliveries], 20, calculator, balls_per_over)
+    return calculator
+
+
+def test_innings_state_separates_legal_balls_and_conceded_runs():
+    state = InningsState.from_deliveries(over_with_a_wide_and_a_bye(), 20)
+    assert state.legal.tolist() == [True, False, True, True, True, True, True]
+    assert state.bowler_runs.tolist() == [1, 1, 0, 4, 0, 0, 1]
+    assert state.runs.sum() == 8
+
+
+@pytest.mark.parametrize('balls_per_over', [6, 8])
+def test_economy_counts_legal_balls_and_conceded_runs(balls_per_over):
+    levels = score_over(balls_per_over).players['Bowler'].bowling_levels
+    assert levels.balls.sum() == 7
+    assert levels.runs.sum() == 7
+    assert levels.overs.sum() == pytest.approx(6 / balls_per_over)
+
+    # The whole over at one level: 7 runs over six legal balls
+    summary = level_summary('bowling', 'MEDIUM', int(levels.balls.sum()), float(levels.score_sums.sum()),
+                            int(levels.runs.sum()), float(levels.overs.sum()))
+    assert summary['economy'] == round(7 / (6 / balls_per_over), 2)
+
+
+def test_stored_breakdowns_give_the_calculator_economy(tmp_path):
+    calculator = score_over(6)
+    db_path = str(tmp_path / 'prm.db')
+    save_prm_results(calculator.calculate_final_scores(), calculator.pressure_rows(), db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        stored = pressure_breakdowns(conn, ['Bowler', 'Batter'])
+    finally:
+        conn.close()
+    assert stored == {name: calculator.pressure_breakdown(name) for name in ('Bowler', 'Batter')}
+
+
+def test_rows_without_overs_have_no_economy():
+    assert level_summary('bowling', 'LOW', 6, 3.0, 9, None)['economy'] is None
+    assert level_summary('bowling', 'LOW', 1, 0.0, 1, 0.0)['economy'] == 0.0
+
+
+def test_no_pressure_table_gives_no_breakdowns(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'empty.db'))
+    try:
+        assert pressure_breakdowns(conn, ['Bowler']) == {}
+    finally:
+        conn.close()
@@ -0,0 +1,120 @@
+"""
+The prm table and its per-match partials: a full save reruns as an in-place upsert with
+prm_pressure replaced per player, and replacing or removing a match re-aggregates only
+the players it touches.
+"""
+
+import sqlite3
+import numpy as np
+import pytest
+from Package.db_writer import BulkWriter
+from Package.pressure_classifier import PressureLevel
+from Package.prm_store import PRMStore, save_prm_results
+from Package.prs_calculator import PRSCalculator, PlayerPerformance, DisciplineStats, LEVEL_COUNT
+
+
+def stats(batting_prs, bowling_prs=0.0, balls=10):
+    return {'batting_prs': batting_prs, 'bowling_prs': bowling_prs,
+            'batting_deliveries': balls, 'bowling_deliveries': balls if bowling_prs else 0}
+
+
+def rows(db_path, query):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_rerun_updates_rows_in_place(tmp_path):
+    db_path = str(tmp_path / 'prm.db')
+    save_prm_results({'P': stats(1.5), 'Q': stats(0.5, 2.0)}, db_path=db_path)
+    before = dict(rows(db_path, "SELECT player_name, rowid FROM prm"))
+
+    report = save_prm_results({'P': stats(2.5, balls=20), 'Q': stats(0.5, 2.0)}, db_path=db_path)
+    assert report['players'] == 2
+    assert dict(rows(db_path, "SELECT player_name, rowid FROM prm")) == before
+    assert rows(db_path, "SELECT player_name, batting_prs, bat_balls FROM prm ORDER BY player_name") == [
+        ('P', 2.5, 20), ('Q', 0.5, 10)]
+
+
+def test_rerun_replaces_pressure_rows(tmp_path):
+    db_path = str(tmp_path / 'prm.db')
+    save_prm_results({'P': stats(1.0), 'Q': stats(1.0)}, [
+        ('P', 'batting', 'MEDIUM', 6, 3.0, 8, 1.0),
+        ('P', 'batting', 'HIGH', 4, 2.0, 5, 4 / 6),
+        ('Q', 'batting', 'LOW', 10, 5.0, 12, 10 / 6)
+    ], db_path=db_path)
+
+    # P no longer has balls at HIGH; Q is not in this save and keeps its rows
+    save_prm_results({'P': stats(1.0)}, [('P', 'batting', 'MEDIUM', 10, 5.0, 13, 10 / 6)], db_path=db_path)
+    assert rows(db_path, "SELECT player_name, level, balls FROM prm_pressure ORDER BY player_name") == [
+        ('P', 'MEDIUM', 10), ('Q', 'LOW', 10)]
+
+
+def batting(average, level=PressureLevel.MEDIUM, balls=10):
+    """One match's partials for a batter whose weighted average score is `average`, all at one level."""
+    performance = PlayerPerformance(batting=DisciplineStats(balls, average * balls, float(balls), average * balls))
+    level_balls = np.zeros(LEVEL_COUNT, dtype=np.int64)
+    level_balls[level.value - 1] = balls
+    performance.batting_levels.add(level_balls, level_balls * average, level_balls, level_balls / 6)
+    return performance
+
+
+@pytest.fixture
+def store(tmp_path):
+    writer = BulkWriter(str(tmp_path / 'prm.db'))
+    writer.open(tables=['prm', 'prm_match_partials', 'prm_match_pressure', 'prm_pressure'])
+    yield PRMStore(writer)
+    writer.close()
+
+
+def prm(store):
+    return {name: (rowid, prs, balls) for name, rowid, prs, balls in store.writer.conn.execute(
+        "SELECT player_name, rowid, batting_prs, bat_balls FROM prm")}
+
+
+def pressure(store):
+    return store.writer.conn.execute(
+        "SELECT player_name, level, balls FROM prm_pressure ORDER BY player_name, level").fetchall()
+
+
+def test_replacing_a_match_refreshes_only_its_players(store):
+    store.replace_match('m1', {'P': batting(1), 'Q': batting(2)})
+    store.replace_match('m2', {'Q': batting(4, PressureLevel.HIGH), 'R': batting(3)})
+    store.writer.flush()
+    before = prm(store)
+
+    refreshed = store.players_refreshed
+    # m2 changed: Q now bats at MEDIUM, R dropped out and S came in
+    store.replace_match('m2', {'Q': batting(4), 'S': batting(1)})
+    store.writer.flush()
+    assert store.players_refreshed - refreshed == 3  # Q, R and S, not P
+
+    after = prm(store)
+    assert after['P'] == before['P']
+    assert 'R' not in after
+    assert after['Q'] == (before['Q'][0], PRSCalculator.prs_from_totals(20 + 40, 20), 20)
+    assert after['S'][1:] == (PRSCalculator.prs_from_totals(10, 10), 10)
+    assert pressure(store) == [('P', 'MEDIUM', 10), ('Q', 'MEDIUM', 20), ('S', 'MEDIUM', 10)]
+
+
+def test_removing_a_match_refreshes_only_its_players(store):
+    store.replace_match('m1', {'P': batting(1), 'Q': batting(2)})
+    store.replace_match('m2', {'Q': batting(4, PressureLevel.HIGH)})
+    store.replace_match('m3', {'R': batting(3)})
+    store.writer.flush()
+    before = prm(store)
+
+    refreshed = store.players_refreshed
+    store.remove_match('m1')
+    store.writer.flush()
+    assert store.players_refreshed - refreshed == 2  # P and Q, not R
+
+    after = prm(store)
+    assert after['R'] == before['R']
+    assert 'P' not in after
+    assert after['Q'] == (before['Q'][0], PRSCalculator.prs_from_totals(40, 10), 10)
+    assert pressure(store) == [('Q', 'HIGH', 10), ('R', 'MEDIUM', 10)]
+    assert store.writer.conn.execute(
+        "SELECT COUNT(*) FROM prm_match_partials WHERE match_id = 'm1'").fetchone() == (0,)
@@ -0,0 +1,84 @@
+"""
+The constant-memory DisciplineStats totals against the list-based PRSCalculator they
+replaced: calculate_final_scores() and get_player_summary() from the running sums equal
+the same figures recomputed from every player's per-delivery lists.
+"""
+
+from pathlib import Path
+import pytest
+from Package.cricket_analyzer import CricketAnalyzer
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+FILES = sorted(str(path) for path in MATCHES.glob('*.yaml'))[:6]
+
+
+def list_prs(performances, weights):
+    """The list-based calculator's _calculate_prs()."""
+    if not performances:
+        return 0.0
+    total_weighted_score = sum(score * weight for score, weight in zip(performances, weights))
+    total_weight = sum(weights)
+    if total_weight == 0:
+        return 0.0
+    return round(max(0, min(100, 50 + total_weighted_score / total_weight * 10)), 1)
+
+
+def list_discipline_stats(performances, weights):
+    """The list-based calculator's _get_discipline_stats()."""
+    if not performances:
+        return {
+            'deliveries': 0,
+            'average_score': 0.0,
+            'weighted_average': 0.0,
+            'best_performance': 0.0,
+            'worst_performance': 0.0,
+            'pressure_adjusted_score': 0.0
+        }
+    return {
+        'deliveries': len(performances),
+        'average_score': round(sum(performances) / len(performances), 2),
+        'weighted_average': round(sum(p * w for p, w in zip(performances, weights)) / sum(weights), 2),
+        'best_performance': round(max(performances), 2),
+        'worst_performance': round(min(performances), 2),
+        'average_pressure': round(sum(weights) / len(weights), 2)
+    }
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    analyzer = CricketAnalyzer(use_cache=False, track_deliveries=True)
+    assert not [error for _, error in analyzer.process_match_files(FILES) if error]
+    return analyzer.calculator
+
+
+def test_final_scores_match_the_list_baseline(calculator):
+    expected = {}
+    for player_name, performance in calculator.players.items():
+        batting, bowling = performance.batting_performances, performance.bowling_performances
+        expected[player_name] = {
+            'batting_prs': list_prs(batting, performance.batting_pressure_weights),
+            'bowling_prs': list_prs(bowling, performance.bowling_pressure_weights),
+            'batting_deliveries': len(batting),
+            'bowling_deliveries': len(bowling),
+            'total_deliveries': len(batting) + len(bowling)
+        }
+    assert calculator.calculate_final_scores() == expected
+
+
+def test_player_summaries_match_the_list_baseline(calculator):
+    for player_name, performance in calculator.players.items():
+        assert calculator.get_player_summary(player_name) == {
+            'batting': list_discipline_stats(performance.batting_performances,
+                                             performance.batting_pressure_weights),
+            'bowling': list_discipline_stats(performance.bowling_performances,
+                                             performance.bowling_pressure_weights)
+        }, player_name
+    assert calculator.get_player_summary('Nobody') == {}
+
+
+def test_running_totals_hold_no_per_delivery_lists():
+    analyzer = CricketAnalyzer(use_cache=False)
+    assert not [error for _, error in analyzer.process_match_files(FILES[:2]) if error]
+    for performance in analyzer.calculator.players.values():
+        assert not performance.batting_performances and not performance.bowling_performances
+        assert performance.batting.deliveries + performance.bowling.deliveries > 0
@@ -0,0 +1,80 @@
+"""
+Streaming ndjson and csv output: each player's line is written as soon as its scores
+are computed, and the prm save takes its players from a lazy pass as well.
+"""
+
+import io
+import csv
+import json
+import sqlite3
+from contextlib import redirect_stdout
+from pathlib import Path
+import pytest
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.prm_store import save_prm_results
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+FILES = sorted(str(path) for path in MATCHES.glob('*.yaml'))[:3]
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    analyzer = CricketAnalyzer(use_cache=False)
+    assert not [error for _, error in analyzer.process_match_files(FILES) if error]
+    return analyzer
+
+
+def record_lines_at_each_player(analyzer, monkeypatch, out):
+    """Patch the per-player score computation to note how many lines out held when it ran."""
+    lines_before = []
+    final_scores = analyzer.calculator._final_scores
+
+    def recording(performance):
+        lines_before.append(out.getvalue().count('\n'))
+        return final_scores(performance)
+
+    monkeypatch.setattr(analyzer.calculator, '_final_scores', recording)
+    return lines_before
+
+
+@pytest.mark.parametrize('format_type, header_lines', [('ndjson', 0), ('csv', 1)])
+def test_lines_are_written_before_the_last_player_is_computed(analyzer, monkeypatch, format_type, header_lines):
+    out = io.StringIO()
+    lines_before = record_lines_at_each_player(analyzer, monkeypatch, out)
+    with redirect_stdout(out):
+        analyzer.display_results(format_type=format_type)
+
+    players = len(analyzer.calculator.players)
+    assert len(lines_before) == players
+    # Every earlier player is already on the stream when the next one is computed
+    assert lines_before == [header_lines + index for index in range(players)]
+    assert out.getvalue().count('\n') == header_lines + players
+
+
+def test_streamed_lines_match_final_results(analyzer):
+    expected = analyzer.final_results()
+    out = io.StringIO()
+    with redirect_stdout(out):
+        analyzer.display_results(format_type='ndjson')
+    streamed = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {record.pop('player_name'): record for record in streamed} == expected
+
+    out = io.StringIO()
+    with redirect_stdout(out):
+        analyzer.display_results(format_type='csv', sort='batting', top_n=5)
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    best = sorted(expected.items(), key=lambda item: item[1]['batting_prs'], reverse=True)[:5]
+    assert [float(row['batting_prs']) for row in rows] == [stats['batting_prs'] for _, stats in best]
+
+
+def test_save_consumes_the_lazy_results(analyzer, tmp_path):
+    db_path = str(tmp_path / 'prm.db')
+    report = save_prm_results(analyzer.iter_final_results(), analyzer.calculator.pressure_rows(), db_path)
+    assert report['players'] == len(analyzer.calculator.players)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        saved = dict(conn.execute("SELECT player_name, bat_balls FROM prm").fetchall())
+    finally:
+        conn.close()
+    assert saved == {name: stats['batting_deliveries'] for name, stats in analyzer.final_results().items()}
@@ -0,0 +1,46 @@
+"""
+The sweep's baseline configuration against the pipeline: the first column of
+WeightSweep.run() reproduces CricketAnalyzer.final_results() for every player, from
+files and from a columnar store.
+"""
+
+from pathlib import Path
+import pytest
+from Package.columnar_store import ColumnarStore
+from Package.cricket_analyzer import CricketAnalyzer
+from Package.match_loader import MatchLoader
+from Package.weight_sweep import SweepData, WeightSweep, expand_configs
+
+MATCHES = Path(__file__).resolve().parents[2] / 'Data' / 'Matches'
+FILES = sorted(str(path) for path in MATCHES.glob('*.yaml'))[:10]
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    analyzer = CricketAnalyzer(use_cache=False)
+    assert not [error for _, error in analyzer.process_match_files(FILES) if error]
+    return analyzer.final_results()
+
+
+def baseline_results(data):
+    configs = expand_configs([{'name': 'heavier dismissals', 'batting_weights': {'dismissal_penalty': -5.0}}])
+    result = WeightSweep(data, batch_size=1).run(configs)
+    return {
+        player_name: {
+            'batting_prs': float(result['batting_prs'][index, 0]),
+            'bowling_prs': float(result['bowling_prs'][index, 0]),
+            'batting_deliveries': int(result['bat_balls'][index]),
+            'bowling_deliveries': int(result['bowl_balls'][index]),
+            'total_deliveries': int(result['bat_balls'][index] + result['bowl_balls'][index])
+        }
+        for index, player_name in enumerate(data.players)
+    }
+
+
+def test_baseline_from_files_matches_the_pipeline(pipeline):
+    assert baseline_results(SweepData.from_files(FILES, MatchLoader(use_cache=False))) == pipeline
+
+
+def test_baseline_from_a_store_matches_the_pipeline(pipeline):
+    store = ColumnarStore.build(FILES, MatchLoader(use_cache=False))
+    assert baseline_results(SweepData.from_store(store)) == pipeline
@@ -0,0 +1,339 @@
+"""
+Scores many PRS weight configurations in one pass over the deliveries with batched matrix operations.
+"""
+
+import json
+import itertools
+from copy import deepcopy
+from typing import Dict, List, Any, Optional, Iterator
+import numpy as np
+from .pressure_classifier import PressureClassifier, PressureLevel
+from .delivery_scorer import DeliveryScorer
+from .innings_state import InningsState
+from .match_loader import MatchLoader
+from .columnar_store import ColumnarStore
+
+
+# Sweepable settings: section -> key order of its vector (the order the pipeline applies them in)
+SECTIONS = {
+    'factor_weights': ('phase_pressure', 'wicket_pressure', 'run_rate_pressure',
+                       'balls_remaining_pressure', 'situation_pressure'),
+    'pressure_weights': tuple(level.name for level in PressureLevel),
+    'level_thresholds': (0, 1, 2, 3),
+    'batting_weights': ('runs_per_ball', 'boundary_bonus', 'dot_ball_penalty', 'dismissal_penalty'),
+    'bowling_weights': ('dot_ball_bonus', 'wicket_bonus', 'runs_conceded_penalty', 'boundary_penalty')
+}
+
+
+def default_config() -> Dict[str, Any]:
+    """The weights the pipeline currently uses, as a sweep configuration."""
+    classifier, scorer = PressureClassifier(), DeliveryScorer()
+    return {
+        'name': 'baseline',
+        'factor_weights': dict(classifier.factor_weights),
+        'pressure_weights': {level.name: weight for level, weight in classifier.pressure_weights.items()},
+        'level_thresholds': list(classifier.level_thresholds),
+        'batting_weights': dict(scorer.batting_weights),
+        'bowling_weights': dict(scorer.bowling_weights)
+    }
+
+
+def expand_configs(spec: Any) -> List[Dict[str, Any]]:
+    """Turn a sweep specification into full configurations, baseline first.
+
+    The specification is either a list of partial configurations, or a dict with a "grid"
+    mapping "section.key" (e.g. "batting_weights.dismissal_penalty") to candidate values,
+    whose cartesian product is taken. Anything not given keeps its baseline value.
+    """
+    baseline = default_config()
+    if isinstance(spec, dict) and 'grid' in spec:
+        names = list(spec['grid'])
+        overrides = []
+        for values in itertools.product(*(spec['grid'][name] for name in names)):
+            override = {'name': ' '.join(f"{name.split('.', 1)[1]}={value}" for name, value in zip(names, values))}
+            for name, value in zip(names, values):
+                section, key = name.split('.', 1)
+                override.setdefault(section, {})[int(key) if section == 'level_thresholds' else key] = value
+            overrides.append(override)
+    elif isinstance(spec, list):
+        overrides = spec
+    else:
+        raise ValueError("Sweep spec must be a list of configurations or a dict with a 'grid'")
+
+    configs = [baseline]
+    for i, override in enumerate(overrides, 1):
+        config = deepcopy(baseline)
+        config['name'] = override.get('name', f"config-{i}")
+        for section, values in override.items():
+            if section == 'name':
+                continue
+            if section not in SECTIONS:
+                raise ValueError(f"Unknown sweep section: {section}")
+            if section == 'level_thresholds' and isinstance(values, list):
+                config[section] = list(values)
+            else:
+                for key, value in values.items():
+                    if section == 'level_thresholds':
+                        config[section][int(key)] = value
+                    elif key not in SECTIONS[section]:
+                        raise ValueError(f"Unknown {section} key: {key}")
+                    else:
+                        config[section][key] = value
+        configs.append(config)
+    return configs
+
+
+def load_spec(path: str) -> List[Dict[str, Any]]:
+    """Read a sweep specification (see expand_configs) from a JSON file."""
+    with open(path, 'r', encoding='utf-8') as file:
+        return expand_configs(json.load(file))
+
+
+class SweepData:
+    """Config-independent per-delivery matrices for a corpus.
+
+    factors holds the five pressure factors per delivery; batting and bowling hold the
+    delivery features each scorer weight multiplies, in SECTIONS order, so a delivery's
+    base score for a configuration is a dot product.
+    """
+
+    def __init__(self, players: List[str], batter: np.ndarray, bowler: np.ndarray,
+                 factors: np.ndarray, batting: np.ndarray, bowling: np.ndarray):
+        self.players = players
+        self.batter = batter
+        self.bowler = bowler
+        self.factors = factors
+        self.batting = batting
+        self.bowling = bowling
+
+    def __len__(self) -> int:
+        return len(self.batter)
+
+    @classmethod
+    def from_store(cls, store: ColumnarStore) -> 'SweepData':
+        """Collect the matrices from a columnar store."""
+        def innings() -> Iterator[tuple]:
+            for match_index, innings_indexes in store.match_innings():
+                record = store.matches[match_index]
+                for innings_index in innings_indexes:
+                    rows = store.innings_slice(innings_index)
+                    batter = store.batter[rows]
+                    yield (record, int(store.innings_number[innings_index]),
+                           (store.over[rows], store.total[rows], store.batter_runs[rows],
+                            store.wicket_kind[rows] >= 0, store.player_out[rows] == batter),
+                           batter, store.bowler[rows])
+
+        return cls._collect(innings(), list(store.players))
+
+    @classmethod
+    def from_files(cls, yaml_files: List[str], loader: Optional[MatchLoader] = None) -> 'SweepData':
+        """Collect the matrices from match YAML files (through the match cache)."""
+        loader = loader or MatchLoader()
+        players: Dict[str, int] = {}
+
+        def encode(names: List[str]) -> np.ndarray:
+            return np.array([players.setdefault(name, len(players)) for name in names], dtype=np.int64)
+
+        def innings() -> Iterator[tuple]:
+            for yaml_file in yaml_files:
+                match = loader.load(yaml_file)
+                info = match['info']
+                # The path identifies the match: stems can repeat across directories
+                record = {'match_id': yaml_file, 'overs': info.get('overs', 20),
+                          'balls_per_over': info.get('balls_per_over', 6)}
+                for innings_data in match['innings']:
+                    deliveries = innings_data['deliveries']
+                    columns = (
+                        [d['over'] for d in deliveries],
+                        [d['runs']['total'] for d in deliveries],
+                        [d['runs']['batsman'] for d in deliveries],
+                        [bool(d.get('wicket')) for d in deliveries],
+                        [bool(d.get('wicket')) and d['wicket'].get('player_out') == d['batsman']
+                         for d in deliveries]
+                    )
+                    yield (record, innings_data['innings_number'], columns,
+                           encode([d['batsman'] for d in deliveries]), encode([d['bowler'] for d in deliveries]))
+
+        data = cls._collect(innings(), [])
+        data.players = list(players)
+        return data
+
+    @classmethod
+    def _collect(cls, innings: Iterator[tuple], players: List[str]) -> 'SweepData':
+        classifier = PressureClassifier()
+        factor_names = SECTIONS['factor_weights']
+        parts = {name: [] for name in ('batter', 'bowler', 'factors', 'batting', 'bowling')}
+        first_innings, match_id = None, None
+
+        for record, innings_number, columns, batter, bowler in innings:
+            # A match without a first-innings record must not chase the previous match's target
+            if record['match_id'] != match_id:
+                first_innings, match_id = None, record['match_id']
+            target = first_innings.chase_target() if innings_number == 2 and first_innings else None
+            state = InningsState.from_columns(*columns, record['overs'], record['balls_per_over'], target)
+            if innings_number == 1:
+                first_innings = state
+            if not len(state):
+                continue
+
+            factors = classifier.calculate_factor_arrays(
+                state.over, state.wickets_fallen, state.balls_remaining, state.required_run_rate,
+                state.recent_wickets, state.runs, state.is_wicket, record['overs'], record['balls_per_over'])
+            dot, boundary = state.runs == 0, state.batter_runs >= 4
+
+            parts['batter'].append(np.asarray(batter, dtype=np.int64))
+            parts['bowler'].append(np.asarray(bowler, dtype=np.int64))
+            parts['factors'].append(np.column_stack([factors[name] for name in factor_names]))
+            parts['batting'].append(np.column_stack([state.batter_runs, boundary, dot, state.striker_out]))
+            parts['bowling'].append(np.column_stack([dot, state.is_wicket, state.runs, state.runs >= 4]))
+
+        if not parts['batter']:
+            return cls(players, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                       np.zeros((0, len(factor_names))), np.zeros((0, 4)), np.zeros((0, 4)))
+        return cls(
+            players,
+            np.concatenate(parts['batter']),
+            np.concatenate(parts['bowler']),
+            np.concatenate(parts['factors']).astype(np.float64),
+            np.concatenate(parts['batting']).astype(np.float64),
+            np.concatenate(parts['bowling']).astype(np.float64)
+        )
+
+
+class WeightSweep:
+    """Evaluates a list of configurations against SweepData, batch_size configurations at a time."""
+
+    def __init__(self, data: SweepData, batch_size: int = 16):
+        self.data = data
+        self.batch_size = batch_size
+        # Deliveries grouped by player once, so per-player sums are a single reduceat per batch
+        self._batting_groups = _Groups(data.batter, len(data.players))
+        self._bowling_groups = _Groups(data.bowler, len(data.players))
+
+    def run(self, configs: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Score every configuration.
+
+        Returns arrays of shape (players, configs): batting_prs and bowling_prs (0.0 for no
+        deliveries), plus per-player bat_balls and bowl_balls.
+        """
+        player_count = len(self.data.players)
+        batting_prs = np.zeros((player_count, len(configs)))
+        bowling_prs = np.zeros((player_count, len(configs)))
+
+        for start in range(0, len(configs), self.batch_size):
+            batch = configs[start:start + self.batch_size]
+            columns = slice(start, start + len(batch))
+            weights = self._pressure_weights(batch)
+            batting_prs[:, columns] = self._prs(self.data.batting, 'batting_weights', batch,
+                                                1.0 + weights, self._batting_groups, weights)
+            bowling_prs[:, columns] = self._prs(self.data.bowling, 'bowling_weights', batch,
+                                                1.0 + weights * 0.8, self._bowling_groups, weights)
+
+        return {
+            'batting_prs': batting_prs,
+            'bowling_prs': bowling_prs,
+            'bat_balls': self._batting_groups.counts,
+            'bowl_balls': self._bowling_groups.counts
+        }
+
+    def _pressure_weights(self, batch: List[Dict[str, Any]]) -> np.ndarray:
+        """(deliveries, configs) pressure weight of every delivery under every configuration."""
+        factor_weights = _matrix(batch, 'factor_weights')
+        thresholds = _matrix(batch, 'level_thresholds')
+        level_weights = _matrix(batch, 'pressure_weights')
+
+        total_pressure = _weighted_sum(self.data.factors, factor_weights)
+        # Same as searchsorted(thresholds, total, side='left'): thresholds strictly below the total
+        levels = (total_pressure[:, :, None] > thresholds.T[None, :, :]).sum(axis=2)
+        return np.take_along_axis(level_weights.T, levels.T, axis=1).T
+
+    def _prs(self, features: np.ndarray, section: str, batch: List[Dict[str, Any]],
+             multiplier: np.ndarray, groups: '_Groups', weights: np.ndarray) -> np.ndarray:
+        scores = _weighted_sum(features, _matrix(batch, section)) * multiplier
+        weighted_sum = groups.sum(scores * weights)
+        weight_sum = groups.sum(weights)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prs = np.clip(50 + weighted_sum / weight_sum * 10, 0, 100)
+        prs = np.where(weight_sum != 0, prs, 0.0)
+        # Python's round (as in PRSCalculator): np.round rounds some .x5 values the other way
+        return _round_1(prs).astype(np.float64)
+
+
+class _Groups:
+    """Sums rows of a (deliveries, configs) matrix per player id."""
+
+    def __init__(self, ids: np.ndarray, player_count: int):
+        self.order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[self.order]
+        self.present, self.starts = np.unique(sorted_ids, return_index=True)
+        self.player_count = player_count
+        self.counts = np.bincount(ids, minlength=player_count)
+
+    def sum(self, matrix: np.ndarray) -> np.ndarray:
+        totals = np.zeros((self.player_count, matrix.shape[1]))
+        if len(self.present):
+            totals[self.present] = np.add.reduceat(matrix[self.order], self.starts, axis=0)
+        return totals
+
+
+_round_1 = np.frompyfunc(lambda value: round(value, 1), 1, 1)
+
+
+def _weighted_sum(features: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """features @ weights, but accumulated column by column in the pipeline's order.
+
+    A BLAS product may round differently, and pressure totals often sit exactly on a
+    level threshold, so the order matters for matching the pipeline's levels.
+    """
+    total = 0.0
+    for j in range(features.shape[1]):
+        total = total + features[:, j, None] * weights[j]
+    return total
+
+
+def _matrix(batch: List[Dict[str, Any]], section: str) -> np.ndarray:
+    """(section size, configs) matrix of one section's values across a batch."""
+    keys = SECTIONS[section]
+    return np.array([[config[section][key] for config in batch] for key in keys], dtype=np.float64)
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation (average ranks for ties); NaN with fewer than two values."""
+    if len(a) < 2:
+        return float('nan')
+    ranks_a, ranks_b = _average_ranks(a), _average_ranks(b)
+    ranks_a, ranks_b = ranks_a - ranks_a.mean(), ranks_b - ranks_b.mean()
+    denominator = np.sqrt((ranks_a ** 2).sum() * (ranks_b ** 2).sum())
+    return float((ranks_a * ranks_b).sum() / denominator) if denominator else float('nan')
+
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Rank of each distinct value: the mean of the positions its ties occupy (1-based)
+    ends = np.cumsum(counts)
+    return ((ends - counts + 1 + ends) / 2.0)[inverse]
+
+
+def diagnostics(configs: List[Dict[str, Any]], result: Dict[str, np.ndarray],
+                min_balls: int = 60, top_n: int = 20) -> List[Dict[str, Any]]:
+    """Per configuration: Spearman correlation with the baseline (the first configuration)
+    and the overlap of the top-N lists, for batting and bowling among players with at
+    least min_balls deliveries in that discipline."""
+    rows = []
+    for discipline, balls in (('batting', result['bat_balls']), ('bowling', result['bowl_balls'])):
+        eligible = balls >= min_balls
+        prs = result[f'{discipline}_prs'][eligible]
+        baseline = prs[:, 0]
+        baseline_top = set(np.argsort(-baseline, kind='stable')[:top_n].tolist())
+        for k, config in enumerate(configs):
+            top = set(np.argsort(-prs[:, k], kind='stable')[:top_n].tolist())
+            rows.append({
+                'config': config['name'],
+                'discipline': discipline,
+                'players': int(eligible.sum()),
+                'spearman': round(spearman(baseline, prs[:, k]), 4),
+                f'top{top_n}_overlap': len(top & baseline_top),
+                'mean_prs': round(float(prs[:, k].mean()), 2) if len(prs) else 0.0
+            })
+    return rows
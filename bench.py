@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the PRS and ingestion pipelines and compares runs against a saved baseline.
+
+    python bench.py run [path] [--scales 1,10,50] [--cases prs,db_writer] [--files N] [--out bench.json]
+    python bench.py compare baseline.json bench.json [--threshold 0.10]
+
+Every case runs in its own process at every scale (scale 10 = the corpus ten times), and
+records wall time, balls/sec, peak RSS and, for the analyzer, the per-stage breakdown.
+compare exits with status 1 when any case got slower or bigger by more than the threshold.
+"""
+
+import sys
+import json
+import argparse
+import tempfile
+from Package.benchmark import (BENCH_CASES, DEFAULT_SCALES, run_case, run_suite,
+                               baseline_document, compare_results)
+from match_cache import find_match_files
+
+
+def corpus_files(path: str, limit=None):
+    """Sorted match files under path, the first `limit` only when given."""
+    yaml_files = sorted(find_match_files(path))
+    return yaml_files[:limit] if limit else yaml_files
+
+
+def run(args):
+    cases = args.cases.split(',') if args.cases else list(BENCH_CASES)
+    unknown = [name for name in cases if name not in BENCH_CASES]
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)} (available: {', '.join(BENCH_CASES)})", file=sys.stderr)
+        sys.exit(2)
+    scales = [int(scale) for scale in args.scales.split(',')]
+
+    files = corpus_files(args.path, args.files)
+    if not files:
+        print(f"No YAML files found in: {args.path}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Benchmarking {len(cases)} cases on {len(files)} files at scales {scales}", file=sys.stderr)
+
+    command = [sys.executable, sys.argv[0], 'case', '--path', args.path, '--repeat', str(args.repeat)]
+    if args.files:
+        command += ['--files', str(args.files)]
+    with tempfile.TemporaryDirectory(prefix='prs-bench-') as workdir:
+        results = run_suite(command, cases, scales, workdir, log=lambda line: print(line, file=sys.stderr))
+
+    document = baseline_document(results, args.path, len(files))
+    with open(args.out, 'w', encoding='utf-8') as file:
+        json.dump(document, file, indent=2)
+    print(f"Wrote {len(results)} results to {args.out}", file=sys.stderr)
+
+
+def case(args):
+    result = run_case(args.name, args.scale, corpus_files(args.path, args.files), args.workdir, args.repeat)
+    print(json.dumps(result))
+
+
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.current, encoding='utf-8') as file:
+        current = json.load(file)
+
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"{'Case':<12} {'Scale':<6} {'Metric':<13} {'Baseline':>10} {'Current':>10} {'Change':>8}")
+    print("-" * 64)
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['case']:<12} x{row['scale']:<5} {row['metric']:<13} {row['baseline']:>10} "
+              f"{row['current']:>10} {row['change']:>+8.1%}{flag}")
+
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the PRS and ingestion pipelines')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks and write a baseline JSON file')
+    run_parser.add_argument('path', nargs='?', default='Data/Matches',
+                            help='Directory of YAML match files (default: Data/Matches)')
+    run_parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                            help='Comma-separated corpus multiples (default: 1,10,50)')
+    run_parser.add_argument('--cases', help=f"Comma-separated subset of: {', '.join(BENCH_CASES)}")
+    run_parser.add_argument('--files', type=int, help='Use only the first N files of the corpus')
+    run_parser.add_argument('--repeat', type=int, default=1,
+                            help='Timed runs per case, the fastest is kept (default: 1)')
+    run_parser.add_argument('--out', default='bench.json', help='Baseline file to write (default: bench.json)')
+    run_parser.set_defaults(handler=run)
+
+    case_parser = commands.add_parser('case', help='Run a single case in this process (used by run)')
+    case_parser.add_argument('name', choices=list(BENCH_CASES))
+    case_parser.add_argument('scale', type=int)
+    case_parser.add_argument('--path', default='Data/Matches')
+    case_parser.add_argument('--files', type=int)
+    case_parser.add_argument('--repeat', type=int, default=1)
+    case_parser.add_argument('--workdir', required=True)
+    case_parser.set_defaults(handler=case)
+
+    compare_parser = commands.add_parser('compare', help='Compare a run against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Relative growth of wall time or peak RSS flagged as a regression '
+                                     '(default: 0.10)')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Builds the columnar ball-by-ball store (one .npy file per field) from match YAML files.
+
+    python build_store.py [path] [--out Data/columnar]
+    python build_store.py --info [--out Data/columnar]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from Package.columnar_store import ColumnarStore
+from Package.match_loader import MatchLoader
+
+DEFAULT_STORE = 'Data/columnar'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the columnar delivery store from match YAML files')
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='Data/Matches',
+        help='Directory containing YAML match files (default: Data/Matches)'
+    )
+    parser.add_argument(
+        '--out',
+        default=DEFAULT_STORE,
+        help=f'Directory the store is written to / read from (default: {DEFAULT_STORE})'
+    )
+    parser.add_argument(
+        '--info',
+        action='store_true',
+        help='Describe an existing store instead of building one'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always parse the YAML and do not read or write the parsed-match cache'
+    )
+    args = parser.parse_args()
+
+    if args.info:
+        started = time.perf_counter()
+        store = ColumnarStore.load(args.out)
+        elapsed = (time.perf_counter() - started) * 1000
+        size = sum(f.stat().st_size for f in Path(args.out).iterdir())
+        print(f"Loaded {args.out} in {elapsed:.1f} ms (memory-mapped, {size / 1e6:.1f} MB on disk)")
+        print(f"Matches: {len(store.matches)}  Innings: {store.innings_count}  Deliveries: {len(store)}")
+        print(f"Players: {len(store.players)}  Teams: {len(store.teams)}  Wicket kinds: {len(store.wicket_kinds)}")
+        return
+
+    yaml_files = sorted(str(p) for p in Path(args.path).rglob('*.y*ml'))
+    if not yaml_files:
+        print(f"No YAML files found in: {args.path}", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    store = ColumnarStore.build(yaml_files, MatchLoader(use_cache=not args.no_cache))
+    store.save(args.out)
+
+    for error in store.tables['errors']:
+        print(f"Error processing {error['file']}: {error['error']}", file=sys.stderr)
+    print(f"Wrote {len(store)} deliveries from {len(store.matches)} matches to {args.out} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Builds the batsman_stats, bowling_stats and master_match tables from match YAML files.
+Each match file is loaded once and all three tables are filled from the same pass.
+Only files that are new or changed since the last run (per the ingest manifest) are
+processed; their rows are replaced, so reruns are idempotent.
+"""
+
+import os
+import sys
+import time
+import argparse
+from Package.ingestion import MatchIngestor
+from Package.db_writer import BulkWriter, DB_FILE
+from Package.manifest import IngestManifest, match_id_for, file_hash
+from Package.stage_timer import StageTimer, NULL_TIMER, write_report
+
+
+def main():
+    """Ingest every YAML match file in the target directory."""
+    parser = argparse.ArgumentParser(
+        description='Build the batting, bowling and match tables from match YAML files'
+    )
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='Data/Matches',
+        help='Directory containing YAML match files (default: Data/Matches)'
+    )
+    parser.add_argument(
+        '--db',
+        default=DB_FILE,
+        help=f'SQLite database to write to (default: {DB_FILE})'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=10000,
+        help='Rows buffered per table before a transactional flush (default: 10000)'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Reprocess every file, not only the new or changed ones'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always parse the YAML and do not read or write the parsed-match cache'
+    )
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Do not report each ingested file on stderr'
+    )
+    parser.add_argument(
+        '--memprofile',
+        metavar='FILE',
+        nargs='?',
+        const='-',
+        help='Trace memory with tracemalloc and write per-stage peak/retained memory, the top '
+             'allocation sites and bytes per delivery as JSON to FILE (stderr when no FILE is given)'
+    )
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.path):
+        print(f"The directory '{args.path}' does not exist. Please check the path.", file=sys.stderr)
+        sys.exit(1)
+
+    ingestor = MatchIngestor(use_cache=not args.no_cache)
+    timer = StageTimer(memory=True) if args.memprofile else NULL_TIMER
+    ingestor.loader.timer = timer
+    stats_tables = [visitor.table for visitor in ingestor.visitors]
+
+    yaml_files = [os.path.join(args.path, file) for file in sorted(os.listdir(args.path))
+                  if file.endswith('.yaml') and os.path.isfile(os.path.join(args.path, file))]
+
+    manifest = IngestManifest('stats', args.db)
+    with timer.stage('plan'):
+        if args.full:
+            changed, removed = [(f, file_hash(f)) for f in yaml_files], []
+        else:
+            changed, removed = manifest.plan(yaml_files)
+    print(f"{len(changed)} new or changed, {len(removed)} removed, "
+          f"{len(yaml_files) - len(changed)} unchanged files", file=sys.stderr)
+
+    writer = BulkWriter(args.db, batch_size=args.batch_size)
+    writer.open()
+    matchcount = 0
+
+    for key in removed:
+        for table in stats_tables:
+            writer.delete(table, match_id=match_id_for(key))
+        manifest.forget(writer, key)
+
+    for file_path, digest in changed:
+        started, deliveries = time.perf_counter(), ingestor.deliveries
+        try:
+            with timer.stage('ingest'):
+                tables = ingestor.ingest_file(file_path)
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}", file=sys.stderr)
+            manifest.record(writer, file_path, digest, 'error', str(e))
+            continue
+
+        match_id = match_id_for(file_path)
+        for table in stats_tables:
+            writer.delete(table, match_id=match_id)
+
+        if tables is None:
+            print(f"Skipped (no result): {file_path}", file=sys.stderr)
+            manifest.record(writer, file_path, digest, 'skipped')
+            continue
+
+        with timer.stage('write'):
+            for table, rows in tables.items():
+                writer.add_many(table, rows)
+        manifest.record(writer, file_path, digest, 'ok')
+        timer.file_done(file_path, time.perf_counter() - started, ingestor.deliveries - deliveries)
+
+        matchcount += 1
+        if not args.quiet:
+            print(matchcount, os.path.basename(file_path), file=sys.stderr)
+
+    manifest.record_touched(writer)
+    with timer.stage('save'):
+        writer.close()
+    report = writer.report()
+    print(f'Total number of matches ingested: {matchcount}')
+    print(f"Wrote {report['rows']} rows (deleted {report['deleted']}) in {report['batches']} batches: "
+          f"{report['seconds']}s total, {report['write_seconds']}s writing "
+          f"({report['rows_per_sec']} rows/sec inserting)")
+    if args.memprofile:
+        write_report(timer.report(), args.memprofile)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import sqlite3
 import os  # <--- ADDED: Essential for finding the database path on Vercel
 from flask import Flask, request, jsonify, render_template, redirect, url_for, g
+from Package.form_store import player_forms
+from Package.prm_store import prm_slice, pressure_breakdowns, SLICE_FILTERS
 
 # --- Flask App Setup ---
 app = Flask(__name__)
@@ -297,14 +299,27 @@ def get_prm_data():
 
         search_query = request.args.get('search', '')
 
+        # Databases written before the confidence-interval columns existed have no *_prs_low/high
+        prm_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(prm)")}
+        ci_columns = [f'{discipline}_prs_{bound}'
+                      for discipline in ('batting', 'bowling') for bound in ('low', 'high')]
+        has_ci = all(column in prm_columns for column in ci_columns)
+        columns = "rowid as id, player_name, batting_prs, bowling_prs, bat_balls, bowl_balls"
+        if has_ci:
+            columns += ", " + ", ".join(ci_columns)
         if search_query:
-            query = "SELECT rowid as id, player_name, batting_prs, bowling_prs, bat_balls, bowl_balls FROM prm WHERE player_name LIKE ? ORDER BY player_name"
+            query = f"SELECT {columns} FROM prm WHERE player_name LIKE ? ORDER BY player_name"
             params = (f'%{search_query}%',)
         else:
-            query = "SELECT rowid as id, player_name, batting_prs, bowling_prs, bat_balls, bowl_balls FROM prm ORDER BY player_name"
+            query = f"SELECT {columns} FROM prm ORDER BY player_name"
             params = ()
 
         players = cursor.execute(query, params).fetchall()
+        forms = player_forms(conn, [player['player_name'] for player in players])
+        # ?detail=pressure adds the stored per-pressure-level breakdown of every player returned
+        detail = request.args.get('detail', '')
+        breakdowns = pressure_breakdowns(conn, [player['player_name'] for player in players]) \
+            if detail == 'pressure' else None
 
         prm_data = []
         for player in players:
@@ -317,7 +332,17 @@ def get_prm_data():
             elif bowl_balls > bat_balls:
                 role = "Bowler"
 
-            prm_data.append(dict(player, role=role))
+            row = dict(player, role=role)
+            # Confidence intervals as [low, high] pairs (None unless the run computed them)
+            for discipline in ('batting', 'bowling'):
+                low, high = row.pop(f'{discipline}_prs_low', None), row.pop(f'{discipline}_prs_high', None)
+                row[f'{discipline}_prs_ci'] = [low, high] if low is not None else None
+            # Rolling-window and time-decayed PRS (None until prm.py --incremental has run,
+            # and again after a full prm.py run, whose scores the form was not built from)
+            row['form'] = forms.get(player['player_name'])
+            if breakdowns is not None:
+                row['pressure'] = breakdowns.get(player['player_name'], {'batting': [], 'bowling': []})
+            prm_data.append(row)
 
         return jsonify(prm_data)
     except Exception as e:
@@ -325,6 +350,38 @@ def get_prm_data():
         traceback.print_exc()
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
+@app.route("/api/prm_slice")
+def get_prm_slice():
+    """
+    API endpoint computing PRS for a slice of matches from the stored per-match partials.
+    Filters: season (e.g. 2023), venue (substring), team and opponent; plus optional search.
+    """
+    try:
+        conn = get_db_connection()
+        filters = {name: request.args.get(name) for name in SLICE_FILTERS}
+        search_query = request.args.get('search', '').lower()
+
+        results = prm_slice(conn, **filters)
+
+        prm_data = []
+        for player_name in sorted(results):
+            if search_query and search_query not in player_name.lower():
+                continue
+            stats = results[player_name]
+            prm_data.append({
+                "player_name": player_name,
+                "batting_prs": stats['batting_prs'] or None,
+                "bowling_prs": stats['bowling_prs'] or None,
+                "bat_balls": stats['batting_deliveries'],
+                "bowl_balls": stats['bowling_deliveries']
+            })
+
+        return jsonify({"filters": {k: v for k, v in filters.items() if v}, "players": prm_data})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"An error occurred: {str(e)}"}), 500
+
 # --- Venue Report Feature ---
 @app.route("/venue-report")
 def venue_search_page():
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Manages the parsed-match cache used by the PRS analyzer and the ingestion pipeline.
+
+    python match_cache.py warm  [path]   # parse every file that has no up-to-date entry
+    python match_cache.py prune [path]   # delete entries whose source changed or was removed
+    python match_cache.py status [path]  # count cached and uncached files
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import List
+from multiprocessing import Pool
+from Package.match_loader import MatchLoader
+
+
+def find_match_files(directory: str) -> List[str]:
+    """Find all YAML match files under a directory (or the file itself)."""
+    path = Path(directory)
+    if path.is_file():
+        return [str(path)]
+    return sorted(str(p) for p in path.rglob('*.y*ml'))
+
+
+def _warm_one(yaml_file: str):
+    loader = MatchLoader()
+    try:
+        loader.load(yaml_file)
+        return loader.misses, None
+    except Exception as e:
+        return 0, str(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm, prune or inspect the parsed-match cache')
+    parser.add_argument('command', choices=['warm', 'prune', 'status'])
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='Data/Matches',
+        help='YAML file or directory of YAML files (default: Data/Matches)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes used by warm (default: 1)'
+    )
+    args = parser.parse_args()
+
+    yaml_files = find_match_files(args.path)
+    if not yaml_files:
+        print(f"No YAML files found in: {args.path}", file=sys.stderr)
+        sys.exit(1)
+
+    loader = MatchLoader()
+
+    if args.command == 'status':
+        cached = sum(1 for f in yaml_files if loader.is_cached(f))
+        print(f"{cached}/{len(yaml_files)} files cached")
+
+    elif args.command == 'prune':
+        kept, removed = loader.prune(yaml_files)
+        print(f"Kept {kept} entries, removed {removed} stale entries")
+
+    else:
+        started = time.perf_counter()
+        if args.workers > 1:
+            with Pool(processes=args.workers) as pool:
+                outcomes = pool.map(_warm_one, yaml_files, chunksize=16)
+        else:
+            outcomes = [_warm_one(f) for f in yaml_files]
+
+        parsed = 0
+        for yaml_file, (misses, error) in zip(yaml_files, outcomes):
+            parsed += misses
+            if error:
+                print(f"Error caching {yaml_file}: {error}", file=sys.stderr)
+
+        print(f"Parsed {parsed} of {len(yaml_files)} files in {time.perf_counter() - started:.1f}s "
+              f"({len(yaml_files) - parsed} already cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,23 @@ Analyzes ball-by-ball cricket match data to compute pressure resistance scores f
 
 import sys
 import os
+import json
+import signal
+import sqlite3
 import argparse
+from contextlib import closing, contextmanager, nullcontext, redirect_stdout
 from pathlib import Path
-from typing import List
-from Package.cricket_analyzer import CricketAnalyzer
+from typing import List, Optional, Tuple
+from Package.cricket_analyzer import CricketAnalyzer, MatchSummary
+from Package.columnar_store import ColumnarStore
+from Package.db_writer import BulkWriter, DB_FILE
+from Package.manifest import IngestManifest, match_id_for
+from Package.form_store import FormStore
+from Package.prm_store import PRMStore, prm_slice, save_prm_results, SLICE_FILTERS
+from Package.results_formater import ResultsFormatter, STREAM_FORMATS, SORT_KEYS
+from Package.partials import select_shard, write_partials, read_partials, Checkpointer, CHECKPOINT_EVERY
+from Package.confidence import prs_intervals, CI_METHODS
+from Package.stage_timer import write_report
 
 
 def find_yaml_files(directory: str) -> List[str]:
@@ -27,6 +40,142 @@ def find_yaml_files(directory: str) -> List[str]:
     return yaml_files
 
 
+def update_incrementally(analyzer: CricketAnalyzer, yaml_files: List[str], workers: int):
+    """Score only new or changed files and refresh prm for the players they involve."""
+    writer = BulkWriter()
+    writer.open(tables=['prm', 'prm_match_partials', 'prm_match_pressure', 'prm_pressure', 'prm_form',
+                        'ingest_manifest'])
+    store = PRMStore(writer)
+    form = FormStore(writer)
+
+    manifest = IngestManifest('prm')
+    if {'prm_match_partials', 'prm_match_pressure'} & set(writer.migrated) or 'prm_match_pressure' in writer.created:
+        # Matches scored before the slice and date columns, the pressure-level rows or
+        # their overs existed are missing that data: score everything again
+        manifest.invalidate()
+    changed, removed = manifest.plan(yaml_files)
+    print(f"{len(changed)} new or changed, {len(removed)} removed, "
+          f"{len(yaml_files) - len(changed)} unchanged files", file=sys.stderr)
+
+    for key in removed:
+        form.remove_match(match_id_for(key))
+        store.remove_match(match_id_for(key))
+        manifest.forget(writer, key)
+
+    digests = dict(changed)
+    for yaml_file, result, error in analyzer.analyze_match_files(list(digests), workers=workers):
+        if error is not None:
+            print(f"Error processing {yaml_file}: {error}", file=sys.stderr)
+            manifest.record(writer, yaml_file, digests[yaml_file], 'error', error)
+            continue
+
+        match, partials = result
+        store.replace_match(match_id_for(yaml_file), partials, match['context'])
+        form.add_match(match_id_for(yaml_file), match['context']['date'], partials)
+        manifest.record(writer, yaml_file, digests[yaml_file], 'ok')
+        print(f"Processed: {yaml_file}", file=sys.stderr)
+
+    manifest.record_touched(writer)
+    with analyzer.timer.stage('save'):
+        writer.close()
+    print(f"Updated prm for {store.players_refreshed} players "
+          f"and form for {form.players_refreshed}", file=sys.stderr)
+
+
+def reduce_partials(analyzer: CricketAnalyzer, partial_files: List[str]):
+    """Merge partial-aggregate files written with --emit-partials into the analyzer."""
+    seen = set()
+    for partial_file in partial_files:
+        partials, meta = read_partials(partial_file)
+        overlap = seen.intersection(meta['files'])
+        if overlap:
+            print(f"Error: {partial_file} repeats {len(overlap)} files already reduced "
+                  f"(e.g. {sorted(overlap)[0]})", file=sys.stderr)
+            sys.exit(1)
+        seen.update(meta['files'])
+
+        analyzer.calculator.merge(partials)
+        analyzer.processed_matches.extend(MatchSummary(f) for f in meta['files'])
+        for error in meta['errors']:
+            print(f"Error processing {error['file']}: {error['error']} (from {partial_file})", file=sys.stderr)
+        print(f"Reduced {partial_file}: {len(meta['files'])} files", file=sys.stderr)
+
+
+def display_slice(args, filters: dict):
+    """Display PRS for a season/venue/team/opponent slice from the stored match partials."""
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        results = prm_slice(conn, **filters)
+    except sqlite3.OperationalError as e:
+        print(f"Error reading match partials ({e}); run prm.py --incremental first", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    formatter = ResultsFormatter()
+    with open_output(args.output) as out, redirect_stdout(out):
+        if args.format == 'json':
+            formatter.print_json_results(results)
+            return
+        if args.format in STREAM_FORMATS:
+            formatter.stream_results(formatter.select_players(results.items(), args.sort, args.top), args.format)
+            return
+        if args.format == 'detailed':
+            formatter.print_detailed_results(results, args.top, args.match_details, args.sort or 'overall')
+        else:
+            formatter.print_table_results(results, args.top, args.sort or 'overall')
+        described = ', '.join(f"{name}={value}" for name, value in filters.items() if value)
+        print(f"\nSlice: {described} ({len(results)} players)")
+
+
+def resume_checkpoint(analyzer: CricketAnalyzer, checkpoint: Checkpointer,
+                      yaml_files: List[str]) -> Tuple[List[str], List[str]]:
+    """Merge the last checkpoint into the analyzer; returns (files it completed, files left to do)."""
+    state = checkpoint.load()
+    if state is None:
+        print(f"No checkpoint at {checkpoint.path}, starting from the beginning", file=sys.stderr)
+        return [], yaml_files
+
+    partials, completed, errors = state
+    unknown = set(completed).difference(yaml_files)
+    if unknown:
+        print(f"Error: {checkpoint.path} covers {len(unknown)} files that are not part of this run "
+              f"(e.g. {sorted(unknown)[0]})", file=sys.stderr)
+        sys.exit(1)
+
+    analyzer.calculator.merge(partials)
+    analyzer.processed_matches.extend(MatchSummary(f) for f in completed)
+    done = set(completed)
+    remaining = [f for f in yaml_files if f not in done]
+    print(f"Resuming from {checkpoint.path}: {len(completed)} files done, {len(remaining)} to analyze "
+          f"(including {len(errors)} that failed before)", file=sys.stderr)
+    return list(completed), remaining
+
+
+@contextmanager
+def deferred_sigterm():
+    """Record SIGTERM in the yielded list instead of dying, so the file loop can checkpoint and stop."""
+    received = []
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    try:
+        yield received
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def write_failed_report(path: str, errors: List[dict]):
+    """Write the files that failed, with their errors, as JSON."""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'failed': len(errors), 'errors': errors}, file, indent=2)
+        file.write('\n')
+    print(f"Wrote {len(errors)} failed files to {path}", file=sys.stderr)
+
+
+def open_output(path: Optional[str]):
+    """Context manager for the results stream: the --output file, or stdout (left open)."""
+    return open(path, 'w', newline='', encoding='utf-8') if path else nullcontext(sys.stdout)
+
+
 def main():
     """Main entry point for the cricket PRS analyzer."""
     parser = argparse.ArgumentParser(
@@ -35,14 +184,26 @@ def main():
     parser.add_argument(
         'path',
         nargs='?',
-        default='.',
-        help='Path to YAML file or directory containing YAML files (default: current directory)'
+        default='Data/Matches',
+        help='Path to YAML file or directory containing YAML files (default: Data/Matches)'
     )
     parser.add_argument(
         '--format',
-        choices=['table', 'detailed', 'json'],
+        choices=['table', 'detailed', 'json', *STREAM_FORMATS],
         default='table',
-        help='Output format (default: table)'
+        help='Output format (default: table); ndjson and csv stream one player per line'
+    )
+    parser.add_argument(
+        '--sort',
+        choices=sorted(SORT_KEYS),
+        help='Order players by this score, highest first; with --top only the top N are kept '
+             '(in a bounded heap). Table and detailed output default to overall, ndjson and csv '
+             'to calculator order'
+    )
+    parser.add_argument(
+        '--output',
+        metavar='FILE',
+        help='Write the results to FILE instead of stdout'
     )
     parser.add_argument(
         '--top',
@@ -54,9 +215,159 @@ def main():
         action='store_true',
         help='Include match-by-match breakdown'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes used to analyze files (default: 1, serial)'
+    )
+    parser.add_argument(
+        '--store',
+        metavar='DIR',
+        help='Analyze a columnar store built by build_store.py instead of the YAML files'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only score files that are new or changed since the last incremental run '
+             'and update prm for the affected players'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always parse the YAML and do not read or write the parsed-match cache'
+    )
+    parser.add_argument(
+        '--no-save',
+        action='store_true',
+        help='Only display the results; do not upsert them into the prm table'
+    )
+    parser.add_argument(
+        '--shard',
+        metavar='K/N',
+        help='Only analyze shard K of N (1-based) of the sorted file list'
+    )
+    parser.add_argument(
+        '--emit-partials',
+        metavar='OUT',
+        help='Write per-player partial aggregates to OUT (JSON) instead of displaying results'
+    )
+    parser.add_argument(
+        '--ci',
+        choices=CI_METHODS,
+        help='Add batting/bowling PRS confidence intervals (bootstrap keeps every delivery in memory)'
+    )
+    parser.add_argument(
+        '--confidence',
+        type=float,
+        default=0.95,
+        help='Confidence level of the intervals (default: 0.95)'
+    )
+    parser.add_argument(
+        '--ci-samples',
+        type=int,
+        default=1000,
+        help='Bootstrap resamples per player (default: 1000)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed for bootstrap intervals, for repeatable results'
+    )
+    for name in SLICE_FILTERS:
+        parser.add_argument(
+            f'--{name}',
+            help=f'Show PRS for matches with this {name} only, computed from the stored match '
+                 f'partials (see --incremental)' + (' (substring match)' if name == 'venue' else '')
+        )
+    parser.add_argument(
+        '--reduce-partials',
+        metavar='FILE',
+        nargs='+',
+        help='Merge partial files written by --emit-partials and display the final scores'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        metavar='FILE',
+        help='Periodically write the running totals and the completed files to FILE (atomically), '
+             'and once more when the files are done or SIGTERM arrives'
+    )
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=CHECKPOINT_EVERY,
+        metavar='N',
+        help=f'Files analyzed between checkpoints (default: {CHECKPOINT_EVERY})'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue from the --checkpoint file: skip the files it completed and retry the ones that failed'
+    )
+    parser.add_argument(
+        '--failed-report',
+        metavar='FILE',
+        help='Write the files that failed, with their errors, to FILE (JSON)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        nargs='?',
+        const='-',
+        help='Time every pipeline stage and write a JSON report to FILE (stderr when no FILE is given)'
+    )
+    parser.add_argument(
+        '--memprofile',
+        metavar='FILE',
+        nargs='?',
+        const='-',
+        help='Like --profile, and also trace memory with tracemalloc: peak and retained memory per '
+             'stage, the top allocation sites and bytes per delivery (slows the run down)'
+    )
     
     args = parser.parse_args()
-    args.path = "Data/Matches"
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint FILE')
+    if args.checkpoint and args.ci == 'bootstrap':
+        parser.error('checkpoints keep totals only, not the deliveries --ci bootstrap resamples')
+    if args.checkpoint or args.failed_report:
+        # Only the plain file loop checkpoints and records failures; the other modes never reach it
+        modes = [flag for flag, value in (('--incremental', args.incremental), ('--store', args.store),
+                                          ('--reduce-partials', args.reduce_partials)) if value]
+        modes += [f'--{name}' for name in SLICE_FILTERS if getattr(args, name)]
+        if modes:
+            parser.error(f"--checkpoint, --resume and --failed-report cannot be combined with {', '.join(modes)}")
+    
+    analyzer = run(parser, args)
+    if analyzer is not None and (args.profile or args.memprofile):
+        report = analyzer.timer.report()
+        for destination in dict.fromkeys(filter(None, (args.profile, args.memprofile))):
+            write_report(report, destination)
+
+
+def run(parser: argparse.ArgumentParser, args) -> Optional[CricketAnalyzer]:
+    """Carry out the mode selected on the command line; returns the analyzer it used."""
+    filters = {name: getattr(args, name) for name in SLICE_FILTERS}
+    if any(filters.values()):
+        display_slice(args, filters)
+        return None
+    
+    if args.reduce_partials:
+        analyzer = CricketAnalyzer(track_deliveries=args.ci == 'bootstrap', profile=bool(args.profile),
+                                   memprofile=bool(args.memprofile))
+        reduce_partials(analyzer, args.reduce_partials)
+        display(analyzer, args)
+        return analyzer
+    
+    if args.store:
+        analyzer = CricketAnalyzer(use_cache=not args.no_cache, track_deliveries=args.ci == 'bootstrap',
+                                   profile=bool(args.profile), memprofile=bool(args.memprofile))
+        with analyzer.timer.stage('store_load'):
+            store = ColumnarStore.load(args.store)
+        analyzer.process_store(store)
+        display(analyzer, args)
+        return analyzer
+    
     # Find YAML files
     yaml_files = find_yaml_files(args.path)
     
@@ -64,31 +375,98 @@ def main():
         print(f"No YAML files found in: {args.path}", file=sys.stderr)
         sys.exit(1)
     
+    if args.shard:
+        try:
+            yaml_files = select_shard(yaml_files, args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    
     print(f"Found {len(yaml_files)} YAML files to analyze...", file=sys.stderr)
     
     # Initialize analyzer
-    analyzer = CricketAnalyzer()
+    analyzer = CricketAnalyzer(use_cache=not args.no_cache, track_deliveries=args.ci == 'bootstrap',
+                               profile=bool(args.profile), memprofile=bool(args.memprofile))
     
-    # Process all files
-    for yaml_file in yaml_files:
-        try:
-            analyzer.process_match_file(yaml_file)
-            print(f"Processed: {yaml_file}", file=sys.stderr)
-        except Exception as e:
-            print(f"Error processing {yaml_file}: {e}", file=sys.stderr)
-            continue
+    if args.incremental:
+        update_incrementally(analyzer, yaml_files, args.workers)
+        return analyzer
+    
+    checkpoint = Checkpointer(args.checkpoint, args.checkpoint_every) if args.checkpoint else None
+    processed, errors = [], []
+    if args.resume:
+        processed, yaml_files = resume_checkpoint(analyzer, checkpoint, yaml_files)
     
-    # Generate and display results
+    # Process all files; with a checkpoint the workers ignore SIGTERM, and the pool is only
+    # terminated (by closing the file stream) once the checkpoint has been written
+    files = analyzer.process_match_files(yaml_files, workers=args.workers, shield_workers=bool(checkpoint))
+    with deferred_sigterm() if checkpoint else nullcontext([]) as stop, closing(files):
+        for yaml_file, error in files:
+            if error is None:
+                processed.append(yaml_file)
+                print(f"Processed: {yaml_file}", file=sys.stderr)
+            else:
+                errors.append({'file': yaml_file, 'error': error})
+                print(f"Error processing {yaml_file}: {error}", file=sys.stderr)
+            if checkpoint:
+                checkpoint.file_done(analyzer.calculator, processed, errors)
+            if stop:
+                break
+        
+        if checkpoint:
+            checkpoint.write(analyzer.calculator, processed, errors)
+            print(f"Checkpointed {len(processed)} files to {checkpoint.path}", file=sys.stderr)
+    
+    if args.failed_report:
+        write_failed_report(args.failed_report, errors)
+    if errors:
+        retry = ' (rerun with --resume to retry them)' if checkpoint else ''
+        print(f"{len(errors)} files failed{retry}", file=sys.stderr)
+    if stop:
+        print("Stopped by SIGTERM; continue with --resume", file=sys.stderr)
+        sys.exit(128 + signal.SIGTERM)
+    
+    if args.emit_partials:
+        write_partials(args.emit_partials, analyzer.calculator, processed, errors)
+        print(f"Wrote partials for {len(analyzer.calculator.players)} players "
+              f"from {len(processed)} files to {args.emit_partials}", file=sys.stderr)
+        return analyzer
+    
+    display(analyzer, args)
+    return analyzer
+
+
+def display(analyzer: CricketAnalyzer, args):
+    """Generate and display results, then save every player's scores to prm."""
+    timer = analyzer.timer
+    intervals = None
     try:
-        analyzer.display_results(
-            format_type=args.format,
-            top_n=args.top,
-            include_match_details=args.match_details
-        )
+        if args.ci:
+            with timer.stage('intervals'):
+                intervals = prs_intervals(analyzer.calculator, args.ci, args.confidence, args.ci_samples, args.seed)
+        # Final scores are computed as they are displayed; ndjson and csv write each player
+        # as soon as its scores are ready
+        with timer.stage('display'), open_output(args.output) as out, redirect_stdout(out):
+            analyzer.display_results(
+                format_type=args.format,
+                top_n=args.top,
+                include_match_details=args.match_details,
+                intervals=intervals,
+                sort=args.sort
+            )
     except Exception as e:
         print(f"Error generating results: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if args.shard and not args.no_save:
+        # A shard's scores cover only its share of the files; the all-time prm rows are not replaced
+        print(f"Not saving shard {args.shard} to prm; reduce the shards' --emit-partials files "
+              f"with --reduce-partials to save", file=sys.stderr)
+    elif not args.no_save:
+        # A second lazy pass over the players, so no results dict is kept for the save
+        with timer.stage('save'):
+            report = save_prm_results(analyzer.iter_final_results(intervals), analyzer.calculator.pressure_rows())
+        print(f"Saved {report['players']} players to prm in {report['write_seconds']}s "
+              f"({report['rows']} rows with pressure levels)", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
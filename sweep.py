@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Scores many PRS weight configurations in a single pass and compares them with the current weights.
+
+    python sweep.py sweep.json [path] [--store Data/columnar] [--out sweep.csv]
+
+sweep.json is either a list of partial configurations, e.g.
+    [{"name": "harsh dismissals", "batting_weights": {"dismissal_penalty": -3.0}}]
+or a grid whose cartesian product is swept:
+    {"grid": {"batting_weights.dismissal_penalty": [-1, -2, -3],
+              "factor_weights.run_rate_pressure": [0.2, 0.25, 0.3]}}
+Sections: factor_weights, pressure_weights (VERY_LOW..EXTREME), level_thresholds (0-3),
+batting_weights and bowling_weights. The current weights are always scored as "baseline".
+"""
+
+import sys
+import csv
+import time
+import argparse
+from Package.weight_sweep import SweepData, WeightSweep, load_spec, diagnostics
+from Package.columnar_store import ColumnarStore
+from Package.match_loader import MatchLoader
+from match_cache import find_match_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score many PRS weight configurations in one pass')
+    parser.add_argument('spec', help='JSON file with a list of configurations or a grid')
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='Data/Matches',
+        help='YAML file or directory of YAML files (default: Data/Matches)'
+    )
+    parser.add_argument(
+        '--store',
+        metavar='DIR',
+        help='Read deliveries from a columnar store built by build_store.py instead of YAML'
+    )
+    parser.add_argument(
+        '--out',
+        help='Write the PRS table of every configuration to this CSV file (one row per config and player)'
+    )
+    parser.add_argument(
+        '--min-balls',
+        type=int,
+        default=60,
+        help='Deliveries a player needs in a discipline to count in the diagnostics (default: 60)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        help='Size of the top-N list compared with the baseline (default: 20)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=16,
+        help='Configurations evaluated per matrix batch (default: 16)'
+    )
+    args = parser.parse_args()
+
+    try:
+        configs = load_spec(args.spec)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    if args.store:
+        data = SweepData.from_store(ColumnarStore.load(args.store))
+    else:
+        yaml_files = sorted(find_match_files(args.path))
+        if not yaml_files:
+            print(f"No YAML files found in: {args.path}", file=sys.stderr)
+            sys.exit(1)
+        data = SweepData.from_files(yaml_files, MatchLoader())
+    collected = time.perf_counter()
+
+    result = WeightSweep(data, args.batch_size).run(configs)
+    finished = time.perf_counter()
+    print(f"Scored {len(configs)} configurations over {len(data)} deliveries and {len(data.players)} players "
+          f"(collect {collected - started:.1f}s, sweep {finished - collected:.1f}s)", file=sys.stderr)
+
+    if args.out:
+        with open(args.out, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(['config', 'player_name', 'batting_prs', 'bowling_prs', 'bat_balls', 'bowl_balls'])
+            for k, config in enumerate(configs):
+                for i, player_name in enumerate(data.players):
+                    writer.writerow([config['name'], player_name, result['batting_prs'][i, k],
+                                     result['bowling_prs'][i, k], result['bat_balls'][i], result['bowl_balls'][i]])
+        print(f"Wrote PRS tables to {args.out}", file=sys.stderr)
+
+    rows = diagnostics(configs, result, args.min_balls, args.top)
+    overlap = f'top{args.top}_overlap'
+    print(f"{'Config':<50} {'Discipline':<10} {'Players':<8} {'Spearman':<9} {'Top-' + str(args.top):<7} {'Mean PRS':<8}")
+    print("-" * 96)
+    for row in rows:
+        print(f"{row['config'][:50]:<50} {row['discipline']:<10} {row['players']:<8} {row['spearman']:<9} "
+              f"{row[overlap]:<7} {row['mean_prs']:<8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Generates a synthetic corpus of Cricsheet-format match files for load and memory testing.
+
+    python synth.py --count 100000 --seed 7 [--out Data/Synthetic] [--source Data/Matches]
+
+Player pools, run distributions and wicket rates are calibrated from the source corpus.
+The same seed and count always produce the same files.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from multiprocessing import Pool
+from Package.synthetic import CorpusProfile, MatchGenerator
+from match_cache import find_match_files
+
+_generator = None
+
+
+def _init_worker(profile_data):
+    global _generator
+    _generator = MatchGenerator(CorpusProfile(profile_data))
+
+
+def _write_one(task):
+    out_dir, seed, index = task
+    return _generator.write(out_dir, seed, index)
+
+
+def load_profile(source: str, profile_path: str = None) -> CorpusProfile:
+    """The calibration profile, read from profile_path when it exists, else measured from source
+    (and saved to profile_path when one is given)."""
+    if profile_path:
+        profile = CorpusProfile.load(profile_path)
+        if profile is not None:
+            print(f"Using calibration from {profile_path}", file=sys.stderr)
+            return profile
+
+    yaml_files = find_match_files(source)
+    if not yaml_files:
+        print(f"No YAML files found in: {source}", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    profile = CorpusProfile.calibrate(yaml_files)
+    print(f"Calibrated from {len(yaml_files)} files in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    if profile_path:
+        profile.save(profile_path)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic match files calibrated from a real corpus')
+    parser.add_argument('--count', type=int, required=True, help='Number of matches to generate')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--out', default='Data/Synthetic', help='Output directory (default: Data/Synthetic)')
+    parser.add_argument(
+        '--source',
+        default='Data/Matches',
+        help='Corpus the distributions are calibrated from (default: Data/Matches)'
+    )
+    parser.add_argument(
+        '--profile',
+        help='Calibration file: read when it exists, otherwise written after calibrating'
+    )
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1)')
+    args = parser.parse_args()
+
+    profile = load_profile(args.source, args.profile)
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    tasks = [(args.out, args.seed, index) for index in range(args.count)]
+    if args.workers > 1:
+        with Pool(args.workers, initializer=_init_worker, initargs=(profile.data,)) as pool:
+            written = sum(1 for _ in pool.imap_unordered(_write_one, tasks, chunksize=64))
+    else:
+        _init_worker(profile.data)
+        written = sum(1 for _ in map(_write_one, tasks))
+
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Wrote {written} matches to {args.out} in {elapsed:.1f}s ({rate:.0f} matches/sec)")
+
+
+if __name__ == "__main__":
+    main()